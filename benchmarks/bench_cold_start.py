@@ -0,0 +1,106 @@
+"""
+Benchmark de arranque en frío del servicio de predicción.
+
+Uso (desde la raíz del repo):
+    python -m benchmarks.bench_cold_start --repeats 5
+
+Entrena un modelo sobre datos sintéticos en un directorio temporal y mide, en
+procesos nuevos, el tiempo hasta tener el modelo listo para predecir:
+- anterior: import de MLflow + resolución de `models:/.../Production` con
+  fallback a joblib (lo que hacía `app.py` al importarse).
+- bundle: import de la app + carga del bundle de serving (sin MLflow).
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import joblib
+from sklearn.ensemble import RandomForestClassifier
+from benchmarks.synthetic import generate_raw_data, write_csv
+
+REPO_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+STARTUP_SCRIPTS = {
+    "anterior": """
+import fastapi, joblib, pandas
+from mlflow import sklearn as mlflow_sklearn
+from src.features.feature_engineering import load_serving_pipeline
+from src.models.model_utils import load_model_threshold
+try:
+    model = mlflow_sklearn.load_model("models:/membresia_premium_best_model/Production")
+except Exception:
+    model = joblib.load("models/local_best_model.pkl")
+feature_pipeline = load_serving_pipeline()
+threshold = load_model_threshold("models/local_best_model.pkl")
+import sys; print("mlflow" in sys.modules)
+""",
+    "bundle": """
+from src.deployment.api.app import model_manager
+model_manager.load_latest()
+import sys; print("mlflow" in sys.modules)
+""",
+}
+
+
+def _prepare_workspace(workdir, train_rows):
+    from src.data.preprocess_data import preprocess_data
+    from src.deployment.bundle import build_serving_bundle
+    from src.features.feature_engineering import build_feature_pipeline
+
+    os.chdir(workdir)
+    raw_path = write_csv(
+        generate_raw_data(train_rows), "data/raw/base_datos_restaurantes_USA_v2.csv"
+    )
+    preprocess_data(input_path=raw_path)
+    X_train, _ = build_feature_pipeline()
+
+    model = RandomForestClassifier(n_estimators=200, random_state=42)
+    model.fit(X_train.drop(columns=["target"]), X_train["target"])
+    joblib.dump(model, "models/local_best_model.pkl")
+    build_serving_bundle()
+
+
+def _time_startup(script, workdir):
+    env = dict(os.environ, PYTHONPATH=REPO_DIR)
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=workdir,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return time.perf_counter() - start, result.stdout.strip().splitlines()[-1] == "True"
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument("--repeats", type=int, default=5, help="Arranques medidos por variante.")
+    parser.add_argument(
+        "--train-rows", type=int, default=20_000, help="Filas para entrenar el modelo."
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        _prepare_workspace(workdir, args.train_rows)
+
+        print(f"\n{'arranque':<10} {'mediana (s)':>12} {'mín (s)':>9} {'mlflow importado':>17}")
+        for name, script in STARTUP_SCRIPTS.items():
+            # Un arranque previo descartado: caché de disco caliente para ambas variantes
+            _time_startup(script, workdir)
+            runs = [_time_startup(script, workdir) for _ in range(args.repeats)]
+            times = [elapsed for elapsed, _ in runs]
+            print(
+                f"{name:<10} {statistics.median(times):>12.2f} {min(times):>9.2f} "
+                f"{'sí' if runs[0][1] else 'no':>17}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Benchmark de escalabilidad de la predicción batch con varios workers.
+
+Uso (desde la raíz del repo):
+    python -m benchmarks.bench_parallel_predict --rows 2000000 --chunksize 100000
+
+Entrena un modelo rápido sobre datos sintéticos en un directorio temporal,
+genera un archivo grande de clientes nuevos y mide `run_prediction_pipeline`
+con 1, 2, 4, ... workers hasta el número de núcleos de la máquina.
+"""
+import argparse
+import os
+import tempfile
+import time
+import joblib
+from sklearn.ensemble import RandomForestClassifier
+from benchmarks.synthetic import generate_new_clients, generate_raw_data, write_csv
+
+
+def _prepare_workspace(workdir, n_rows, train_rows):
+    from src.data.preprocess_data import preprocess_data
+    from src.features.feature_engineering import build_feature_pipeline
+
+    os.chdir(workdir)
+    raw_path = write_csv(
+        generate_raw_data(train_rows), "data/raw/base_datos_restaurantes_USA_v2.csv"
+    )
+    preprocess_data(input_path=raw_path)
+    X_train, _ = build_feature_pipeline()
+
+    model = RandomForestClassifier(n_estimators=200, random_state=42)
+    model.fit(X_train.drop(columns=["target"]), X_train["target"])
+    os.makedirs("models", exist_ok=True)
+    joblib.dump(model, "models/local_best_model.pkl")
+
+    return write_csv(generate_new_clients(n_rows), "data/new_data.csv")
+
+
+def _worker_counts(max_workers):
+    counts, n = [], 1
+    while n < max_workers:
+        counts.append(n)
+        n *= 2
+    return counts + [max_workers]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Filas del archivo a puntuar.")
+    parser.add_argument(
+        "--train-rows", type=int, default=20_000, help="Filas para entrenar el modelo."
+    )
+    parser.add_argument("--chunksize", type=int, default=50_000, help="Filas por bloque.")
+    parser.add_argument(
+        "--max-workers", type=int, default=os.cpu_count(), help="Máximo de workers."
+    )
+    args = parser.parse_args()
+
+    from src.pipelines.pipeline_predict import run_prediction_pipeline
+
+    with tempfile.TemporaryDirectory() as workdir:
+        data_path = _prepare_workspace(workdir, args.rows, args.train_rows)
+
+        results = []
+        for workers in _worker_counts(args.max_workers):
+            start = time.perf_counter()
+            run_prediction_pipeline(
+                data_path=data_path,
+                output_path="data/predictions.csv",
+                chunksize=args.chunksize,
+                workers=workers,
+            )
+            results.append((workers, time.perf_counter() - start))
+
+    base = results[0][1]
+    print(f"\nFilas: {args.rows:,} | bloque: {args.chunksize:,} | núcleos: {os.cpu_count()}")
+    print(f"{'workers':>8} {'tiempo (s)':>11} {'filas/s':>12} {'speedup':>8} {'eficiencia':>11}")
+    for workers, elapsed in results:
+        speedup = base / elapsed
+        print(
+            f"{workers:>8} {elapsed:>11.2f} {args.rows / elapsed:>12,.0f} "
+            f"{speedup:>8.2f} {speedup / workers:>11.0%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
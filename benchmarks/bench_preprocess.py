@@ -0,0 +1,104 @@
+"""
+Benchmark del preprocesamiento: implementación anterior vs motor vectorizado
+(en memoria y out-of-core por bloques).
+
+Uso (desde la raíz del repo):
+    python -m benchmarks.bench_preprocess --rows 10000000
+
+Genera un CSV raw sintético por bloques (sin tenerlo entero en memoria) y ejecuta
+cada implementación en un proceso aparte, midiendo tiempo y memoria pico (RSS).
+"""
+import argparse
+import multiprocessing as mp
+import os
+import resource
+import tempfile
+import time
+import warnings
+import pandas as pd
+from benchmarks.synthetic import write_raw_data
+
+# Filas por bloque del modo out-of-core
+CHUNKSIZE = 500_000
+
+
+def _legacy_preprocess(input_path, output_path):
+    """Copia de `preprocess_data` previa al motor vectorizado (referencia)."""
+    from src.data.preprocess_data import DROP_COLS, IMPUTATION_RULES, OUTLIER_RULES
+
+    df = pd.read_csv(input_path)
+    df.drop(columns=[col for col in DROP_COLS if col in df.columns], inplace=True)
+    for col in df.select_dtypes(include="object").columns:
+        df[col] = df[col].astype("category")
+    for col, method in IMPUTATION_RULES.items():
+        value = df[col].mode()[0] if method == "mode" else getattr(df[col], method)()
+        df[col].fillna(value, inplace=True)
+    rule = OUTLIER_RULES["edad"]
+    df = df[(df["edad"] >= rule["min"]) & (df["edad"] <= rule["max"])]
+    df.to_csv(output_path, index=False)
+
+
+def _vectorized_preprocess(input_path, output_path):
+    from src.data.preprocess_data import preprocess_data
+
+    preprocess_data(input_path=input_path, output_path=output_path, data_format="csv")
+
+
+def _chunked_preprocess(input_path, output_path):
+    from src.data.preprocess_data import preprocess_data
+
+    preprocess_data(
+        input_path=input_path, output_path=output_path, data_format="csv", chunksize=CHUNKSIZE
+    )
+
+
+IMPLEMENTATIONS = {
+    "anterior": _legacy_preprocess,
+    "vectorizado": _vectorized_preprocess,
+    "bloques": _chunked_preprocess,
+}
+
+
+def _run(name, input_path, output_path, queue):
+    warnings.simplefilter("ignore", FutureWarning)
+    start = time.perf_counter()
+    IMPLEMENTATIONS[name](input_path, output_path)
+    elapsed = time.perf_counter() - start
+    # ru_maxrss está en KB en Linux
+    queue.put((elapsed, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument("--rows", type=int, default=10_000_000, help="Filas del dataset sintético.")
+    parser.add_argument(
+        "--only", choices=list(IMPLEMENTATIONS), help="Ejecuta solo una implementación."
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        raw_path = os.path.join(workdir, "raw.csv")
+        write_raw_data(raw_path, args.rows)
+        print(f"\nFilas: {args.rows:,} | CSV raw: {os.path.getsize(raw_path) / 1024**2:.0f} MB")
+        print(
+            f"{'implementación':<15} {'tiempo (s)':>11} {'RSS pico (MB)':>14} {'filas salida':>13}"
+        )
+
+        for name in [args.only] if args.only else IMPLEMENTATIONS:
+            output_path = os.path.join(workdir, f"{name}.csv")
+            queue = mp.Queue()
+            process = mp.Process(target=_run, args=(name, raw_path, output_path, queue))
+            process.start()
+            process.join()
+            if process.exitcode != 0:
+                print(f"{name:<15} {'falló (exit code ' + str(process.exitcode) + ')':>40}")
+                continue
+            elapsed, peak_mb = queue.get()
+            n_out = sum(1 for _ in open(output_path, encoding="utf-8")) - 1
+            print(f"{name:<15} {elapsed:>11.2f} {peak_mb:>14.0f} {n_out:>13,}")
+
+
+if __name__ == "__main__":
+    main()
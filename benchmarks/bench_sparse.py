@@ -0,0 +1,67 @@
+"""
+Benchmark de features one-hot densas vs dispersas (CSR).
+
+Uso (desde la raíz del repo):
+    python -m benchmarks.bench_sparse --rows 200000 --cities 2000
+
+Compara memoria de la matriz de features, tiempo de transformación y tiempo de
+ajuste de los modelos de `get_model_dict`. `--cities` reemplaza
+`ciudad_residencia` por una columna de alta cardinalidad para simular el caso
+en el que el one-hot denso explota en memoria.
+"""
+import argparse
+import time
+import numpy as np
+from scipy import sparse as sp
+from benchmarks.synthetic import generate_new_clients
+from src.features.feature_engineering import make_preprocessor
+from src.models.model_utils import get_model_dict
+
+
+def _matrix_mb(X):
+    if sp.issparse(X):
+        return (X.data.nbytes + X.indices.nbytes + X.indptr.nbytes) / 1024**2
+    return X.nbytes / 1024**2
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument("--rows", type=int, default=200_000, help="Filas del dataset sintético.")
+    parser.add_argument("--cities", type=int, default=0, help="Cardinalidad de ciudad_residencia.")
+    parser.add_argument(
+        "--models", nargs="+", default=["logistic_regression", "random_forest"],
+        help="Modelos de get_model_dict a ajustar.",
+    )
+    args = parser.parse_args()
+
+    df = generate_new_clients(args.rows)
+    if args.cities:
+        rng = np.random.default_rng(0)
+        df["ciudad_residencia"] = [f"ciudad_{i}" for i in rng.integers(0, args.cities, args.rows)]
+    y = (df["estrato_socioeconomico"].isin(["Alto", "Muy Alto"])).astype(int).to_numpy()
+
+    print(f"\nFilas: {args.rows:,} | ciudades: {df['ciudad_residencia'].nunique():,}")
+    print(f"{'modo':<8} {'columnas':>9} {'memoria (MB)':>13} {'transform (s)':>14}  ajuste (s)")
+    for sparse in (False, True):
+        start = time.perf_counter()
+        X = make_preprocessor(sparse=sparse).fit_transform(df)
+        transform_time = time.perf_counter() - start
+
+        fit_times = []
+        for name in args.models:
+            model = get_model_dict()[name]
+            start = time.perf_counter()
+            model.fit(X, y)
+            fit_times.append(f"{name}={time.perf_counter() - start:.2f}")
+
+        mode = "sparse" if sparse else "denso"
+        print(
+            f"{mode:<8} {X.shape[1]:>9,} {_matrix_mb(X):>13.1f} {transform_time:>14.2f}  "
+            f"{' '.join(fit_times)}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Benchmark de almacenamiento intermedio: CSV vs Parquet vs Feather.
+
+Uso (desde la raíz del repo):
+    python -m benchmarks.bench_storage --rows 1000000
+
+Mide tiempo de escritura, tiempo de lectura y tamaño en disco para las dos
+tablas que circulan entre etapas: el dataset limpio (con columnas category)
+y la matriz densa de features one-hot.
+"""
+import argparse
+import os
+import tempfile
+import time
+import pandas as pd
+from benchmarks.synthetic import generate_raw_data
+from src.utils.storage import TABLE_FORMATS, read_table, write_table
+from src.utils.validators import CATEGORICAL_FEATURES, NUMERIC_FEATURES
+
+
+def _clean_table(n_rows):
+    df = generate_raw_data(n_rows)
+    df = df[NUMERIC_FEATURES + CATEGORICAL_FEATURES + ["membresia_premium"]].dropna()
+    return df.astype({col: "category" for col in CATEGORICAL_FEATURES + ["membresia_premium"]})
+
+
+def _feature_table(df_clean):
+    features = pd.get_dummies(df_clean[CATEGORICAL_FEATURES], dtype="float64")
+    features[NUMERIC_FEATURES] = df_clean[NUMERIC_FEATURES].astype("float64")
+    features["target"] = (df_clean["membresia_premium"] == "Sí").astype(int)
+    return features.reset_index(drop=True)
+
+
+def _measure(df, path, fmt):
+    start = time.perf_counter()
+    write_table(df, path, fmt)
+    write_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    df_read = read_table(path, fmt)
+    read_time = time.perf_counter() - start
+
+    dtypes_ok = (df_read.dtypes.astype(str).values == df.dtypes.astype(str).values).all()
+    return write_time, read_time, os.path.getsize(path) / 1024**2, dtypes_ok
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Filas del dataset sintético.")
+    args = parser.parse_args()
+
+    df_clean = _clean_table(args.rows)
+    tables = {"limpio": df_clean, "features": _feature_table(df_clean)}
+
+    print(f"\nFilas: {len(df_clean):,}")
+    print(
+        f"{'tabla':<9} {'formato':<8} {'escritura (s)':>14} {'lectura (s)':>12} "
+        f"{'disco (MB)':>11} {'dtypes':>7}"
+    )
+    with tempfile.TemporaryDirectory() as workdir:
+        for table_name, df in tables.items():
+            for fmt in TABLE_FORMATS:
+                path = os.path.join(workdir, f"{table_name}.{fmt}")
+                write_time, read_time, size_mb, dtypes_ok = _measure(df, path, fmt)
+                print(
+                    f"{table_name:<9} {fmt:<8} {write_time:>14.2f} {read_time:>12.2f} "
+                    f"{size_mb:>11.1f} {'ok' if dtypes_ok else 'perdidos':>7}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,313 @@
+"""
+Suite de benchmarks del pipeline completo con seguimiento de regresiones.
+
+Uso (desde la raíz del repo):
+    python -m benchmarks.suite --scale small --output benchmarks/results/base.json
+    python -m benchmarks.suite --scale small --baseline benchmarks/results/base.json --threshold 0.2
+    python -m benchmarks.suite compare benchmarks/results/base.json benchmarks/results/nuevo.json
+
+En un directorio temporal genera datos sintéticos con el esquema de restaurantes
+y mide, en orden:
+    preprocess        preprocess_data sobre el CSV raw
+    features          build_feature_pipeline
+    models            fit / predict_proba de cada modelo de get_model_dict
+    predict_pipeline  run_prediction_pipeline sobre clientes nuevos
+    api               latencia de /predict (uno a uno) y /predict_batch (TestClient)
+
+Cada medición es el mínimo de `--repeat` ejecuciones. Los resultados se guardan
+en JSON; con `--baseline`, el proceso termina con código 1 si alguna medición es
+más lenta que la línea base en más de `--threshold` (fracción).
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+import numpy as np
+
+SCALES = {"small": 10_000, "medium": 1_000_000, "large": 10_000_000}
+STAGES = ["preprocess", "features", "models", "predict_pipeline", "api"]
+
+# El fit de los ensambles no escala a 10M filas en una suite: se entrena sobre una muestra
+MAX_FIT_ROWS = 200_000
+PREDICTION_CHUNKSIZE = 100_000
+API_SINGLE_REQUESTS = 200
+API_BATCH_ROWS = 1_000
+
+DEFAULT_THRESHOLD = 0.2
+# Diferencias absolutas menores (s) se consideran ruido aunque superen el umbral relativo
+MIN_REGRESSION_SEC = 0.005
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _best_of(fn, repeat):
+    """Ejecuta `fn` `repeat` veces; devuelve (mínimo en segundos, resultado de la última)."""
+    times, result = [], None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=REPO_ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _bench_preprocess(ctx, record):
+    from src.data.preprocess_data import preprocess_data
+
+    seconds, _ = _best_of(lambda: preprocess_data(chunksize=ctx["chunksize"]), ctx["repeat"])
+    record("preprocess.preprocess_data", seconds)
+
+
+def _bench_features(ctx, record):
+    from src.features.feature_engineering import build_feature_pipeline
+
+    seconds, (train, test) = _best_of(lambda: build_feature_pipeline(sparse=False), ctx["repeat"])
+    record("features.build_feature_pipeline", seconds)
+    ctx["train"], ctx["test"] = train, test
+
+
+def _bench_models(ctx, record):
+    import joblib
+    from src.models.model_utils import get_model_dict
+
+    train = ctx["train"]
+    if len(train) > ctx["fit_rows"]:
+        train = train.sample(ctx["fit_rows"], random_state=42)
+    X_train, y_train = train.drop(columns=["target"]), train["target"]
+    X_test = ctx["test"].drop(columns=["target"])
+
+    fitted = {}
+    for name, model in get_model_dict().items():
+        seconds, fitted[name] = _best_of(lambda: model.fit(X_train, y_train), ctx["repeat"])
+        record(f"models.{name}.fit", seconds)
+        seconds, _ = _best_of(lambda: fitted[name].predict_proba(X_test), ctx["repeat"])
+        record(f"models.{name}.predict_proba", seconds)
+
+    # El modelo más rápido se usa para la predicción batch y la API
+    os.makedirs("models", exist_ok=True)
+    joblib.dump(fitted["logistic_regression"], "models/local_best_model.pkl")
+
+
+def _bench_predict_pipeline(ctx, record):
+    from benchmarks.synthetic import write_raw_data
+    from src.pipelines.pipeline_predict import run_prediction_pipeline
+
+    data_path = write_raw_data("data/new_data.csv", ctx["rows"], new_clients=True)
+    seconds, _ = _best_of(
+        lambda: run_prediction_pipeline(
+            data_path=data_path, output_path="data/predictions.csv", chunksize=PREDICTION_CHUNKSIZE
+        ),
+        ctx["repeat"],
+    )
+    record("predict_pipeline.run_prediction_pipeline", seconds)
+
+
+def _bench_api(ctx, record):
+    # La app se importa aquí: lee la configuración del entorno al importarse
+    os.environ.update(
+        USE_MLFLOW_REGISTRY="false", MODEL_RELOAD_INTERVAL_SEC="0", PREDICTION_CACHE_SIZE="0"
+    )
+    from fastapi.testclient import TestClient
+    from benchmarks.synthetic import client_payloads
+    from src.deployment.api.app import app
+
+    payloads = client_payloads(max(API_SINGLE_REQUESTS, API_BATCH_ROWS), seed=3).to_dict(
+        orient="records"
+    )
+    with TestClient(app) as client:
+        client.post("/predict", json=payloads[0])  # calentamiento
+
+        latencies = []
+        for payload in payloads[:API_SINGLE_REQUESTS]:
+            start = time.perf_counter()
+            client.post("/predict", json=payload).raise_for_status()
+            latencies.append(time.perf_counter() - start)
+        p50, p95 = np.percentile(latencies, [50, 95])
+        record("api.predict.p50", p50)
+        record("api.predict.p95", p95)
+
+        batch = payloads[:API_BATCH_ROWS]
+        seconds, _ = _best_of(
+            lambda: client.post("/predict_batch", json=batch).raise_for_status(), ctx["repeat"]
+        )
+        record(f"api.predict_batch.{API_BATCH_ROWS}_rows", seconds)
+
+        ndjson = "".join(json.dumps(payload) + "\n" for payload in batch)
+        headers = {"Content-Type": "application/x-ndjson"}
+        seconds, _ = _best_of(
+            lambda: client.post(
+                "/predict_batch", content=ndjson, headers=headers
+            ).raise_for_status(),
+            ctx["repeat"],
+        )
+        record(f"api.predict_batch_ndjson.{API_BATCH_ROWS}_rows", seconds)
+
+
+BENCHMARKS = {
+    "preprocess": _bench_preprocess,
+    "features": _bench_features,
+    "models": _bench_models,
+    "predict_pipeline": _bench_predict_pipeline,
+    "api": _bench_api,
+}
+
+
+def run_suite(rows, stages=STAGES, repeat=1, fit_rows=MAX_FIT_ROWS, chunksize=None, scale=None):
+    """
+    Ejecuta la suite en un directorio temporal y devuelve los resultados.
+
+    Las etapas dependen de las anteriores (p. ej. `api` necesita el modelo de
+    `models`), así que siempre se ejecutan todas hasta la última pedida; solo se
+    registran las de `stages`.
+
+    Returns:
+        dict: {"meta": {...}, "results": {nombre: segundos}}
+    """
+    from benchmarks.synthetic import write_raw_data
+
+    last = max(STAGES.index(stage) for stage in stages)
+    ctx = {"rows": rows, "repeat": repeat, "fit_rows": fit_rows, "chunksize": chunksize}
+    results = {}
+    cwd = os.getcwd()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        try:
+            write_raw_data("data/raw/base_datos_restaurantes_USA_v2.csv", rows)
+            for stage in STAGES[: last + 1]:
+                def record(name, seconds, stage=stage):
+                    if stage in stages:
+                        results[name] = round(seconds, 6)
+                        print(f"  {name:<45} {seconds:>10.4f} s", flush=True)
+
+                BENCHMARKS[stage](ctx, record)
+        finally:
+            os.chdir(cwd)
+
+    meta = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "git_commit": _git_commit(),
+        "scale": scale,
+        "rows": rows,
+        "repeat": repeat,
+        "fit_rows": min(fit_rows, rows),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+    return {"meta": meta, "results": results}
+
+
+def compare(current, baseline, threshold=DEFAULT_THRESHOLD, min_delta=MIN_REGRESSION_SEC):
+    """
+    Compara dos ejecuciones. Devuelve las mediciones que empeoraron más que
+    `threshold` (y más de `min_delta` segundos): [(nombre, base, actual, cambio)].
+    """
+    if current["meta"].get("rows") != baseline["meta"].get("rows"):
+        raise ValueError(
+            f"Las ejecuciones no son comparables: {baseline['meta'].get('rows')} vs "
+            f"{current['meta'].get('rows')} filas."
+        )
+
+    regressions = []
+    for name, value in current["results"].items():
+        base = baseline["results"].get(name)
+        if not base:
+            continue
+        change = value / base - 1
+        if change > threshold and value - base > min_delta:
+            regressions.append((name, base, value, change))
+    return regressions
+
+
+def _print_comparison(current, baseline, regressions):
+    regressed = {name for name, *_ in regressions}
+    print(f"\n{'medición':<45} {'base (s)':>10} {'actual (s)':>11} {'cambio':>8}")
+    for name, value in current["results"].items():
+        base = baseline["results"].get(name)
+        if base is None:
+            print(f"{name:<45} {'-':>10} {value:>11.4f} {'nuevo':>8}")
+            continue
+        flag = "  ❌" if name in regressed else ""
+        print(f"{name:<45} {base:>10.4f} {value:>11.4f} {value / base - 1:>+8.1%}{flag}")
+
+
+def _load(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _check(current, baseline_path, threshold):
+    baseline = _load(baseline_path)
+    regressions = compare(current, baseline, threshold)
+    _print_comparison(current, baseline, regressions)
+    if regressions:
+        print(f"\n{len(regressions)} regresiones superan el umbral de {threshold:.0%}.")
+        return 1
+    print(f"\nSin regresiones (umbral {threshold:.0%}).")
+    return 0
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ["compare"]:
+        parser = argparse.ArgumentParser(prog="benchmarks.suite compare")
+        parser.add_argument("baseline")
+        parser.add_argument("current")
+        parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+        args = parser.parse_args(argv[1:])
+        return _check(_load(args.current), args.baseline, args.threshold)
+
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument("--scale", choices=list(SCALES), default="small")
+    parser.add_argument("--rows", type=int, default=None, help="Filas (reemplaza --scale).")
+    parser.add_argument(
+        "--only", nargs="+", choices=STAGES, default=STAGES, help="Etapas a registrar."
+    )
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument(
+        "--fit-rows", type=int, default=MAX_FIT_ROWS, help="Filas máximas para entrenar."
+    )
+    parser.add_argument("--chunksize", type=int, default=None, help="preprocess_data por bloques.")
+    parser.add_argument("--output", default=None, help="JSON de resultados.")
+    parser.add_argument("--baseline", default=None, help="JSON de una ejecución anterior.")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    args = parser.parse_args(argv)
+
+    rows = args.rows or SCALES[args.scale]
+    scale = None if args.rows else args.scale
+    print(f"Benchmarks: {rows:,} filas | etapas: {', '.join(args.only)}")
+    current = run_suite(rows, args.only, args.repeat, args.fit_rows, args.chunksize, scale)
+
+    output = args.output or os.path.join(
+        "benchmarks", "results", f"{scale or rows}-{datetime.now():%Y%m%dT%H%M%S}.json"
+    )
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(current, f, indent=2)
+    print(f"\nResultados guardados en {output}")
+
+    return _check(current, args.baseline, args.threshold) if args.baseline else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,10 @@
+# Los generadores viven en src.data.synthetic (también los usa la prueba de carga)
+from src.data.synthetic import (  # noqa: F401
+    CATEGORIES,
+    PREMIUM_RATE,
+    client_payloads,
+    generate_new_clients,
+    generate_raw_data,
+    write_csv,
+    write_raw_data,
+)
@@ -1,40 +1,260 @@
+import argparse
+import datetime
+import glob
 import json
-from google.cloud import bigquery
+import os
+import shutil
+import uuid
 import pandas as pd
 from src.utils.logger import get_logger
-import os
+from src.utils.storage import read_table
 
 logger = get_logger(__name__)
 
-def load_from_bigquery(config_path: str) -> pd.DataFrame:
+# Destino de la extracción: directorio con archivos Parquet `part-<ejecución>-XXXXX.parquet`
+RAW_PARQUET_DIR = "data/raw/base_datos_restaurantes_USA_v2"
+# CSV local original (se usa si no hay extracción Parquet)
+RAW_CSV_PATH = "data/raw/base_datos_restaurantes_USA_v2.csv"
+# Estado de la extracción incremental (pyarrow ignora archivos que empiezan con "_")
+WATERMARK_FILE = "_watermark.json"
+
+# Filas por página de resultados y por archivo Parquet
+PAGE_SIZE = int(os.getenv("BQ_PAGE_SIZE", "100000"))
+ROWS_PER_FILE = int(os.getenv("BQ_ROWS_PER_FILE", "1000000"))
+
+
+def default_raw_path():
     """
-    Carga datos desde BigQuery usando las credenciales activas.
+    Dataset raw por defecto: `RAW_DATA_PATH` si está definido; si no, el
+    directorio Parquet de la última extracción o, en su defecto, el CSV local.
+    """
+    path = os.getenv("RAW_DATA_PATH")
+    if path:
+        return path
+    return RAW_PARQUET_DIR if os.path.isdir(RAW_PARQUET_DIR) else RAW_CSV_PATH
+
+
+def _load_config(config_path):
+    with open(config_path, "r") as f:
+        config = json.load(f)
+
+    if not config.get("project_id") or not config.get("query"):
+        raise ValueError("El JSON debe contener 'project_id' y 'query' válidos.")
+    return config
+
+
+def _watermark_path(output_dir):
+    return os.path.join(output_dir, WATERMARK_FILE)
+
+
+def load_watermark(output_dir=RAW_PARQUET_DIR):
+    """Última marca de agua extraída ({"column", "value", "type"}) o None."""
+    path = _watermark_path(output_dir)
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _save_watermark(output_dir, watermark):
+    path = _watermark_path(output_dir)
+    with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+        json.dump(watermark, f, indent=2)
+    os.replace(f"{path}.tmp", path)
+
+
+def _bigquery_type(arrow_type):
+    """Tipo de parámetro de BigQuery equivalente a un tipo de Arrow."""
+    import pyarrow as pa
+
+    if pa.types.is_integer(arrow_type):
+        return "INT64"
+    if pa.types.is_floating(arrow_type):
+        return "FLOAT64"
+    if pa.types.is_timestamp(arrow_type):
+        return "TIMESTAMP"
+    if pa.types.is_date(arrow_type):
+        return "DATE"
+    return "STRING"
+
+
+def _to_json_value(value):
+    return value.isoformat() if isinstance(value, (datetime.date, datetime.datetime)) else value
+
+
+def _from_json_value(value, bq_type):
+    if bq_type == "TIMESTAMP":
+        return datetime.datetime.fromisoformat(value)
+    if bq_type == "DATE":
+        return datetime.date.fromisoformat(value)
+    return value
+
+
+def build_query(query, watermark=None):
+    """
+    Consulta a ejecutar y su configuración. Con marca de agua, solo se piden
+    las filas con `columna > @watermark` (parámetro de consulta, no texto interpolado).
+    """
+    if watermark is None:
+        return query, None
+
+    from google.cloud import bigquery
+
+    incremental_query = f"SELECT * FROM ({query}) WHERE {watermark['column']} > @watermark"
+    job_config = bigquery.QueryJobConfig(
+        query_parameters=[
+            bigquery.ScalarQueryParameter(
+                "watermark",
+                watermark["type"],
+                _from_json_value(watermark["value"], watermark["type"]),
+            )
+        ]
+    )
+    return incremental_query, job_config
+
+
+class _PartitionWriter:
+    """
+    Acumula record batches de Arrow y los escribe en archivos Parquet de hasta
+    `rows_per_file` filas, sin convertirlos a pandas.
+    """
+
+    def __init__(self, directory, run_id, rows_per_file=ROWS_PER_FILE):
+        self.directory = directory
+        self.run_id = run_id
+        self.rows_per_file = rows_per_file
+        self.files = []
+        self.rows = 0
+        self._pending = []
+        self._pending_rows = 0
+
+    def write(self, batch):
+        self._pending.append(batch)
+        self._pending_rows += batch.num_rows
+        self.rows += batch.num_rows
+        if self._pending_rows >= self.rows_per_file:
+            self.flush()
+
+    def flush(self):
+        if not self._pending_rows:
+            return
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        path = os.path.join(self.directory, f"part-{self.run_id}-{len(self.files):05d}.parquet")
+        pq.write_table(pa.Table.from_batches(self._pending), path)
+        self.files.append(path)
+        self._pending, self._pending_rows = [], 0
+
+
+def extract_from_bigquery(
+    config_path,
+    output_dir=RAW_PARQUET_DIR,
+    client=None,
+    full_refresh=False,
+    rows_per_file=ROWS_PER_FILE,
+):
+    """
+    Extrae el resultado de una consulta de BigQuery a Parquet particionado,
+    página a página (record batches de Arrow), sin materializarlo en memoria.
+
+    Si la configuración define `watermark_column`, cada ejecución solo extrae las
+    filas con valor mayor al máximo ya extraído y agrega nuevos archivos al
+    directorio. Los archivos de una ejecución se escriben primero en un directorio
+    temporal y la marca de agua se actualiza al final: una extracción interrumpida
+    no deja filas a medias ni duplicadas.
 
     Args:
-        config_path (str): Ruta al archivo JSON con 'project_id' y 'query'.
+        config_path (str): JSON con 'project_id', 'query' y opcionalmente
+            'watermark_column' y 'page_size'.
+        output_dir (str): Directorio de salida (legible con `read_table`).
+        client: Cliente de BigQuery (por defecto `bigquery.Client(project=project_id)`).
+        full_refresh (bool): Ignora la marca de agua y reemplaza todos los archivos.
+    Returns:
+        dict: Filas extraídas, archivos escritos y marca de agua resultante.
     """
+    config = _load_config(config_path)
+    watermark_column = config.get("watermark_column")
+    watermark = None if full_refresh or not watermark_column else load_watermark(output_dir)
+
+    if client is None:
+        from google.cloud import bigquery
+
+        client = bigquery.Client(project=config["project_id"])
+
+    import pyarrow.compute as pc
+
+    query, job_config = build_query(config["query"], watermark)
+    mode = f"incremental desde {watermark['value']}" if watermark else "completa"
+    logger.info(
+        f"Ejecutando consulta en BigQuery ({mode}) para el proyecto: {config['project_id']}"
+    )
+
+    run_id = (
+        datetime.datetime.now(datetime.timezone.utc).strftime("%Y%m%dT%H%M%S")
+        + uuid.uuid4().hex[:6]
+    )
+    tmp_dir = os.path.join(output_dir, f".tmp-{run_id}")
+    os.makedirs(tmp_dir)
+
     try:
-        with open(config_path, "r") as f:
-            config = json.load(f)
+        rows = client.query(query, job_config=job_config).result(
+            page_size=config.get("page_size", PAGE_SIZE)
+        )
+        writer = _PartitionWriter(tmp_dir, run_id, rows_per_file)
+        new_max, watermark_type = None, None
+        for batch in rows.to_arrow_iterable():
+            if not batch.num_rows:
+                continue
+            writer.write(batch)
+            if watermark_column:
+                column = batch.column(watermark_column)
+                batch_max = pc.max(column).as_py()
+                if batch_max is not None and (new_max is None or batch_max > new_max):
+                    new_max, watermark_type = batch_max, _bigquery_type(column.type)
+            logger.info(f"Filas extraídas: {writer.rows}")
+        writer.flush()
 
-        project_id = config.get("project_id")
-        query = config.get("query")
+        # --- Publicación: archivos nuevos al directorio final y luego la marca de agua ---
+        if full_refresh or not watermark_column or watermark is None:
+            for old_file in glob.glob(os.path.join(output_dir, "part-*.parquet")):
+                os.remove(old_file)
+        for path in writer.files:
+            os.replace(path, os.path.join(output_dir, os.path.basename(path)))
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
 
-        if not project_id or not query:
-            raise ValueError("El JSON debe contener 'project_id' y 'query' válidos.")
+    if new_max is not None:
+        watermark = {
+            "column": watermark_column,
+            "value": _to_json_value(new_max),
+            "type": watermark_type,
+        }
+        _save_watermark(output_dir, watermark)
+    elif full_refresh and os.path.exists(_watermark_path(output_dir)):
+        os.remove(_watermark_path(output_dir))
 
-        client = bigquery.Client(project=project_id)
+    logger.info(
+        f"Extracción completada: {writer.rows} filas en {len(writer.files)} archivos ({output_dir})"
+    )
+    return {"rows": writer.rows, "files": len(writer.files), "watermark": watermark}
 
-        logger.info(f"Ejecutando consulta en BigQuery para el proyecto: {project_id}")
-        df = client.query(query).to_dataframe()
-        logger.info(f"Datos cargados correctamente: {df.shape[0]} filas, {df.shape[1]} columnas")
 
-        # Guardar localmente
-        raw_path = "data/raw/base_datos_restaurantes_USA_v2.csv"
-        os.makedirs(os.path.dirname(raw_path), exist_ok=True)
-        df.to_csv(raw_path, index=False)
-        logger.info(f"Datos guardados en {raw_path}")
+def load_from_bigquery(config_path: str, output_dir=RAW_PARQUET_DIR, client=None) -> pd.DataFrame:
+    """
+    Carga datos desde BigQuery usando las credenciales activas.
+
+    Extrae a Parquet particionado con `extract_from_bigquery` y devuelve el
+    dataset leído desde disco. Para datasets grandes, usar directamente
+    `extract_from_bigquery` y apuntar el pipeline al directorio de salida.
 
+    Args:
+        config_path (str): Ruta al archivo JSON con 'project_id' y 'query'.
+    """
+    try:
+        extract_from_bigquery(config_path, output_dir=output_dir, client=client)
+        df = read_table(output_dir)
+        logger.info(f"Datos cargados correctamente: {df.shape[0]} filas, {df.shape[1]} columnas")
         return df
 
     except Exception as e:
@@ -43,5 +263,12 @@ def load_from_bigquery(config_path: str) -> pd.DataFrame:
 
 
 if __name__ == "__main__":
-    config_path = "config/credentials.json"
-    load_from_bigquery(config_path)
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Extracción de datos desde BigQuery a Parquet.")
+    parser.add_argument(
+        "--config", default="config/credentials.json", help="JSON con project_id y query."
+    )
+    parser.add_argument("--output", default=RAW_PARQUET_DIR, help="Directorio Parquet de salida.")
+    parser.add_argument("--full-refresh", action="store_true", help="Ignora la marca de agua.")
+    args = parser.parse_args()
+
+    extract_from_bigquery(args.config, output_dir=args.output, full_refresh=args.full_refresh)
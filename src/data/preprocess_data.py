@@ -1,11 +1,23 @@
+import argparse
 import os
+import shutil
 import pandas as pd
 import numpy as np
+from src.data.load_data import default_raw_path
+from src.data.sketches import ValueSketch
 from src.utils.logger import get_logger
+from src.utils.storage import (
+    ChunkedTableWriter,
+    infer_format,
+    iter_table_chunks,
+    read_table,
+    table_columns,
+    with_format,
+    write_table,
+)
 
 logger = get_logger(__name__)
 
-RAW_PATH = "data/raw/base_datos_restaurantes_USA_v2.csv"
 PROCESSED_PATH = "data/processed/restaurantes_USA_clean.csv"
 
 # Columnas a eliminar (irrelevantes para entrenamiento)
@@ -24,61 +36,272 @@ OUTLIER_RULES = {
     "frecuencia_visita": {"min": 0, "max": 20},
 }
 
+# Filas de muestra para inferir qué columnas del CSV son texto
+DTYPE_SAMPLE_ROWS = 10_000
 
-def preprocess_data(input_path=RAW_PATH, output_path=PROCESSED_PATH):
+# Filas por bloque del modo out-of-core (0 = todo el dataset en memoria)
+PREPROCESS_CHUNKSIZE = int(os.getenv("PREPROCESS_CHUNKSIZE", "0")) or None
+
+
+def _mode(series: pd.Series):
+    """Moda de una columna; los empates se resuelven con el menor valor."""
+    counts = series.value_counts(sort=False)
+    counts = counts[counts > 0]
+    if counts.empty:
+        return np.nan
+    return min(counts.index[counts.to_numpy() == counts.max()])
+
+
+IMPUTATION_METHODS = {
+    "mode": _mode,
+    "mean": lambda series: series.mean(),
+    "median": lambda series: series.median(),
+}
+
+
+def _raw_read_options(input_path):
+    """
+    Columnas a leer del dataset raw (sin las descartadas) y, para CSV, las
+    columnas de texto a parsear directamente como 'category'.
+    """
+    if infer_format(input_path) == "csv" and not os.path.isdir(input_path):
+        sample = pd.read_csv(input_path, nrows=DTYPE_SAMPLE_ROWS)
+        columns = [col for col in sample.columns if col not in DROP_COLS]
+        return columns, {col: "category" for col in columns if sample[col].dtype == object}
+
+    return [col for col in table_columns(input_path) if col not in DROP_COLS], {}
+
+
+def _text_to_category(df: pd.DataFrame) -> pd.DataFrame:
+    # Columnas de texto que la muestra no detectó (p. ej. solo nulos al inicio) o Parquet
+    for col in df.columns[df.dtypes == object]:
+        df[col] = df[col].astype("category")
+    return df
+
+
+def _read_raw(input_path) -> pd.DataFrame:
+    """
+    Lee el dataset raw sin cargar las columnas descartadas y con las columnas
+    de texto directamente como 'category' (sin materializar strings por fila).
+    """
+    columns, text_dtypes = _raw_read_options(input_path)
+    if text_dtypes:
+        df = pd.read_csv(input_path, usecols=columns, dtype=text_dtypes)
+    else:
+        df = read_table(input_path, columns=columns)
+    return _text_to_category(df)
+
+
+def compute_imputation_values(df: pd.DataFrame, rules=IMPUTATION_RULES) -> dict:
+    """
+    Calcula en una sola pasada los valores de imputación de todas las reglas,
+    antes de modificar el DataFrame.
+
+    Returns:
+        dict: {columna: valor de imputación} para las columnas presentes en `df`.
+    """
+    values = {}
+    for col, method in rules.items():
+        if method not in IMPUTATION_METHODS:
+            raise ValueError(f"Método de imputación desconocido: {method}")
+        if col in df.columns:
+            values[col] = IMPUTATION_METHODS[method](df[col])
+    return values
+
+
+def outlier_mask(df: pd.DataFrame, rules=OUTLIER_RULES):
+    """
+    Combina todas las reglas de outliers en una sola máscara booleana.
+    Los valores faltantes no se consideran outliers.
+
+    Returns:
+        tuple: (máscara de filas a conservar, {columna: filas fuera de rango}).
+    """
+    keep = np.ones(len(df), dtype=bool)
+    counts = {}
+    for col, bounds in rules.items():
+        if col not in df.columns:
+            continue
+        values = df[col].to_numpy(dtype=np.float64, na_value=np.nan)
+        outside = (values < bounds.get("min", -np.inf)) | (values > bounds.get("max", np.inf))
+        counts[col] = int(outside.sum())
+        keep &= ~outside
+    return keep, counts
+
+
+def clean_frame(df: pd.DataFrame, imputation_values: dict, outlier_rules=OUTLIER_RULES):
+    """
+    Aplica imputaciones y filtros de outliers a un DataFrame (completo o un bloque).
+    Las columnas imputadas se reemplazan en `df` sin copiar el resto del DataFrame.
+
+    Returns:
+        tuple: (DataFrame limpio, reporte con filas imputadas y eliminadas por regla).
+    """
+    imputed = {}
+    for col, value in imputation_values.items():
+        missing = df[col].isna()
+        imputed[col] = int(missing.sum())
+        if imputed[col]:
+            values = df[col]
+            # En un bloque la categoría imputada puede no haber aparecido todavía
+            if isinstance(values.dtype, pd.CategoricalDtype) and value not in values.cat.categories:
+                values = values.cat.add_categories([value])
+            # Se reemplaza la columna completa: sin fillna(inplace) sobre vistas
+            df[col] = values.fillna(value)
+
+    keep, outliers = outlier_mask(df, outlier_rules)
+    removed = int(len(keep) - keep.sum())
+    if removed:
+        df = df.loc[keep]
+
+    return df, {"imputed": imputed, "outliers": outliers, "removed": removed}
+
+
+def _collect_statistics(input_path, chunksize, columns, text_dtypes):
+    """
+    Primera pasada del modo out-of-core: resume las columnas a imputar con
+    `ValueSketch` y unifica el dtype de las columnas numéricas entre bloques
+    (un bloque sin nulos se lee como int aunque la columna completa sea float).
+    """
+    numeric_cols = [col for col in columns if col not in text_dtypes]
+    rule_cols = [col for col in IMPUTATION_RULES if col in columns]
+    read_cols = [col for col in columns if col in numeric_cols or col in rule_cols]
+
+    sketches = {col: ValueSketch() for col in rule_cols}
+    dtypes = {}
+    n_rows = 0
+    for chunk in iter_table_chunks(
+        input_path, chunksize, columns=read_cols, dtype=text_dtypes or None
+    ):
+        n_rows += len(chunk)
+        for col, sketch in sketches.items():
+            sketch.update(chunk[col])
+        for col in numeric_cols:
+            if chunk[col].dtype != object:
+                dtype = chunk[col].dtype
+                dtypes[col] = np.result_type(dtypes[col], dtype) if col in dtypes else dtype
+
+    values = {}
+    for col, sketch in sketches.items():
+        method = IMPUTATION_RULES[col]
+        if method not in IMPUTATION_METHODS:
+            raise ValueError(f"Método de imputación desconocido: {method}")
+        values[col] = getattr(sketch, method)()
+        if not sketch.exact:
+            logger.warning(f"Estadístico aproximado para '{col}' (demasiados valores distintos).")
+
+    logger.info(f"Primera pasada completada: {n_rows} filas")
+    return values, dtypes
+
+
+def _preprocess_chunked(input_path, output_path, chunksize):
+    """
+    Preprocesamiento en dos pasadas sin cargar el dataset completo en memoria:
+    1. Estadísticos de imputación por bloques (resúmenes mergeables).
+    2. Limpieza por bloques con escritura incremental.
+    """
+    columns, text_dtypes = _raw_read_options(input_path)
+    imputation_values, dtypes = _collect_statistics(input_path, chunksize, columns, text_dtypes)
+
+    writer = ChunkedTableWriter(output_path)
+    if os.path.isfile(output_path) and writer.fmt == "parquet":
+        # Salida previa del modo en memoria (archivo único en vez de directorio)
+        os.remove(output_path)
+    writer.reset()
+    report = {"imputed": dict.fromkeys(imputation_values, 0), "outliers": {}, "removed": 0}
+    missing_cols = set()
+    n_rows, chunk_index = 0, -1
+
+    chunks = iter_table_chunks(input_path, chunksize, columns=columns, dtype=text_dtypes or None)
+    for chunk_index, chunk in enumerate(chunks):
+        chunk = _text_to_category(chunk.astype(dtypes))
+        chunk, chunk_report = clean_frame(chunk, imputation_values)
+        writer.write(chunk, chunk_index)
+
+        n_rows += len(chunk)
+        report["removed"] += chunk_report["removed"]
+        for key in ("imputed", "outliers"):
+            for col, count in chunk_report[key].items():
+                report[key][col] = report[key].get(col, 0) + count
+        missing_cols.update(chunk.columns[chunk.isna().any()])
+
+    logger.info(f"Segunda pasada completada: {n_rows} filas escritas en {chunk_index + 1} bloques")
+    return imputation_values, report, sorted(missing_cols)
+
+
+def _log_report(imputation_values, report):
+    for col, value in imputation_values.items():
+        logger.info(
+            f"Columna '{col}' imputada por {IMPUTATION_RULES[col]}: {value} "
+            f"({report['imputed'][col]} filas)"
+        )
+    for col, count in report["outliers"].items():
+        rule = OUTLIER_RULES[col]
+        logger.info(
+            f"Regla de outliers '{col}' [{rule.get('min')}, {rule.get('max')}]: {count} filas"
+        )
+    logger.info(f"Filas eliminadas por outliers: {report['removed']}")
+
+
+def preprocess_data(
+    input_path=None, output_path=PROCESSED_PATH, data_format=None, chunksize=PREPROCESS_CHUNKSIZE
+):
     """
     Limpieza e imputación de datos para el dataset de membresías premium.
+
+    Args:
+        input_path (str): Dataset raw (CSV, Parquet o directorio Parquet particionado).
+            Por defecto `default_raw_path()` (extracción Parquet o CSV local).
+        output_path (str): Ruta del dataset limpio; la extensión se ajusta a `data_format`.
+        data_format (str): 'csv', 'parquet' o 'feather'. Por defecto DATA_FORMAT.
+        chunksize (int): Si se indica, procesa el dataset en dos pasadas por bloques
+            de `chunksize` filas (datasets más grandes que la RAM). En Parquet la
+            salida es un directorio particionado.
+    Returns:
+        pd.DataFrame: Dataset limpio, o None en modo por bloques (solo se escribe a disco).
     """
     logger.info("=== Iniciando preprocesamiento de datos ===")
 
+    input_path = input_path or default_raw_path()
     if not os.path.exists(input_path):
         raise FileNotFoundError(f"No se encontró el archivo raw en {input_path}")
 
-    df = pd.read_csv(input_path)
+    if chunksize:
+        output_path = with_format(output_path, data_format)
+        logger.info(f"Modo out-of-core: bloques de {chunksize} filas")
+        imputation_values, report, missing_cols = _preprocess_chunked(
+            input_path, output_path, chunksize
+        )
+        _log_report(imputation_values, report)
+        if missing_cols:
+            logger.warning(f"Aún existen valores faltantes en: {missing_cols}")
+        logger.info(f"Datos procesados guardados en {output_path}")
+        logger.info("=== Preprocesamiento completado exitosamente ===")
+        return None
+
+    # --- 1️⃣ Carga sin columnas irrelevantes y con texto como 'category' ---
+    df = _read_raw(input_path)
     logger.info(f"Datos cargados correctamente: {df.shape[0]} filas, {df.shape[1]} columnas")
+    logger.info(f"Columnas eliminadas: {DROP_COLS}")
 
-    # --- 1️⃣ Eliminar columnas irrelevantes ---
-    existing_drop = [col for col in DROP_COLS if col in df.columns]
-    df.drop(columns=existing_drop, inplace=True)
-    logger.info(f"Columnas eliminadas: {existing_drop}")
+    # --- 2️⃣ Estadísticos de imputación (una sola pasada) ---
+    imputation_values = compute_imputation_values(df)
 
-    # --- 2️⃣ Convertir object a category (opcional pero eficiente) ---
-    for col in df.select_dtypes(include="object").columns:
-        df[col] = df[col].astype("category")
-    logger.info("Columnas tipo 'object' convertidas a 'category'.")
+    # --- 3️⃣ Imputación + outliers (una sola máscara para todas las reglas) ---
+    df, report = clean_frame(df, imputation_values)
+    _log_report(imputation_values, report)
 
-    # --- 3️⃣ Imputación de valores faltantes ---
-    for col, method in IMPUTATION_RULES.items():
-        if col in df.columns:
-            if method == "mode":
-                value = df[col].mode()[0]
-            elif method == "mean":
-                value = df[col].mean()
-            elif method == "median":
-                value = df[col].median()
-            else:
-                raise ValueError(f"Método de imputación desconocido: {method}")
-
-            df[col].fillna(value, inplace=True)
-            logger.info(f"Columna '{col}' imputada por {method}: {value}")
-
-    # --- 4️⃣ Eliminar outliers de edad ---
-    if "edad" in df.columns:
-        min_val = OUTLIER_RULES["edad"]["min"]
-        max_val = OUTLIER_RULES["edad"]["max"]
-        before = df.shape[0]
-        df = df[(df["edad"] >= min_val) & (df["edad"] <= max_val)]
-        after = df.shape[0]
-        logger.info(f"Filas eliminadas por outliers en 'edad': {before - after}")
-
-    # --- 5️⃣ Validación de datos post-procesamiento ---
+    # --- 4️⃣ Validación de datos post-procesamiento ---
     if df.isna().sum().any():
         missing_cols = df.columns[df.isna().any()].tolist()
         logger.warning(f"Aún existen valores faltantes en: {missing_cols}")
 
-    # --- 6️⃣ Guardar dataset limpio ---
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    df.to_csv(output_path, index=False)
+    # --- 5️⃣ Guardar dataset limpio ---
+    output_path = with_format(output_path, data_format)
+    if os.path.isdir(output_path):
+        # Salida previa del modo por bloques (directorio particionado)
+        shutil.rmtree(output_path)
+    write_table(df, output_path)
     logger.info(f"Datos procesados guardados en {output_path}")
     logger.info("=== Preprocesamiento completado exitosamente ===")
 
@@ -86,4 +309,22 @@ def preprocess_data(input_path=RAW_PATH, output_path=PROCESSED_PATH):
 
 
 if __name__ == "__main__":
-    preprocess_data()
+    parser = argparse.ArgumentParser(
+        description="Preprocesamiento del dataset de membresías premium."
+    )
+    parser.add_argument(
+        "--input",
+        default=None,
+        help="Dataset raw (por defecto, la extracción Parquet o el CSV local).",
+    )
+    parser.add_argument("--output", default=PROCESSED_PATH, help="Ruta del dataset limpio.")
+    parser.add_argument("--format", default=None, choices=["csv", "parquet", "feather"])
+    parser.add_argument(
+        "--chunksize",
+        type=int,
+        default=PREPROCESS_CHUNKSIZE,
+        help="Filas por bloque (modo out-of-core).",
+    )
+    args = parser.parse_args()
+
+    preprocess_data(args.input, args.output, data_format=args.format, chunksize=args.chunksize)
@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+
+# Máximo de valores distintos que se guardan con conteo exacto antes de comprimir
+MAX_BINS = 200_000
+
+
+class ValueSketch:
+    """
+    Resumen mergeable de una columna para calcular estadísticos de imputación
+    recorriendo los datos por bloques.
+
+    Guarda el conteo exacto de cada valor distinto, por lo que moda, media y
+    mediana coinciden con las de pandas sobre la columna completa. Si una columna
+    numérica supera `max_bins` valores distintos, los conteos se comprimen en
+    centroides ponderados de peso similar (la mediana pasa a ser aproximada, con
+    error acotado por el ancho de cada centroide).
+    """
+
+    def __init__(self, max_bins=MAX_BINS):
+        self.max_bins = max_bins
+        self.counts = None
+        self.n = 0
+        self.total = 0.0
+        self.exact = True
+
+    def update(self, series: pd.Series):
+        """Agrega los valores no nulos de un bloque."""
+        counts = series.value_counts(sort=False)
+        counts = counts[counts > 0]
+        if isinstance(counts.index, pd.CategoricalIndex):
+            counts.index = counts.index.astype(object)
+        if pd.api.types.is_numeric_dtype(series):
+            self.total += float(series.sum())
+        self._merge_counts(counts.astype(np.float64), int(counts.sum()))
+        return self
+
+    def merge(self, other: "ValueSketch"):
+        """Combina otro resumen (p. ej. calculado en otro bloque o proceso)."""
+        if other.counts is not None:
+            self.total += other.total
+            self.exact &= other.exact
+            self._merge_counts(other.counts, other.n)
+        return self
+
+    def _merge_counts(self, counts: pd.Series, n: int):
+        self.n += n
+        self.counts = counts if self.counts is None else self.counts.add(counts, fill_value=0)
+        if len(self.counts) > self.max_bins and pd.api.types.is_numeric_dtype(self.counts.index):
+            self._compress()
+
+    def _compress(self):
+        """Agrupa valores consecutivos en max_bins // 2 centroides de peso similar."""
+        counts = self.counts.sort_index()
+        values = counts.index.to_numpy(dtype=np.float64)
+        weights = counts.to_numpy()
+        n_groups = self.max_bins // 2
+
+        midpoints = np.cumsum(weights) - weights / 2
+        groups = np.minimum((midpoints / weights.sum() * n_groups).astype(np.intp), n_groups - 1)
+        group_weights = np.bincount(groups, weights=weights, minlength=n_groups)
+        group_sums = np.bincount(groups, weights=weights * values, minlength=n_groups)
+        used = group_weights > 0
+
+        self.counts = pd.Series(group_weights[used], index=group_sums[used] / group_weights[used])
+        self.exact = False
+
+    def _sorted_counts(self):
+        if self.counts is None or self.n == 0:
+            return None
+        return self.counts.sort_index()
+
+    def mode(self):
+        """Valor más frecuente; los empates se resuelven con el menor valor."""
+        counts = self._sorted_counts()
+        if counts is None:
+            return np.nan
+        return counts.index[np.argmax(counts.to_numpy())]
+
+    def mean(self):
+        return self.total / self.n if self.n else np.nan
+
+    def median(self):
+        """Mediana con la misma convención que pandas (promedio de los dos centrales)."""
+        counts = self._sorted_counts()
+        if counts is None:
+            return np.nan
+        values = counts.index.to_numpy(dtype=np.float64)
+        cumulative = np.cumsum(counts.to_numpy())
+        lower = values[np.searchsorted(cumulative, (self.n - 1) // 2, side="right")]
+        upper = values[np.searchsorted(cumulative, self.n // 2, side="right")]
+        return (lower + upper) / 2
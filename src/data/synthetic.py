@@ -0,0 +1,123 @@
+import os
+import numpy as np
+import pandas as pd
+from src.utils.validators import CLIENT_FEATURES
+
+# Filas generadas por bloque al escribir datasets grandes
+GENERATION_BLOCK = 1_000_000
+
+# Distribuciones aproximadas observadas en el EDA (notebooks/eda.ipynb)
+CATEGORIES = {
+    "genero": (["Femenino", "Masculino"], [0.50, 0.50]),
+    "ciudad_residencia": (
+        [
+            "Chicago",
+            "NYC",
+            "Miami",
+            "San Diego",
+            "Dallas",
+            "Boston",
+            "Denver",
+            "Houston",
+            "Seattle",
+            "Phoenix",
+        ],
+        [0.18, 0.16, 0.11, 0.10, 0.09, 0.08, 0.08, 0.07, 0.08, 0.05],
+    ),
+    "estrato_socioeconomico": (["Medio", "Alto", "Bajo", "Muy Alto"], [0.31, 0.30, 0.21, 0.18]),
+    "ocio": (["No", "Sí"], [0.50, 0.50]),
+    "consume_licor": (["Sí", "No"], [0.62, 0.38]),
+    "preferencias_alimenticias": (
+        ["Carnes", "Vegetariano", "Mariscos", "Vegano", "Pescado", "Otro"],
+        [0.28, 0.23, 0.18, 0.11, 0.11, 0.09],
+    ),
+    "tipo_de_pago_mas_usado": (
+        ["Efectivo", "Tarjeta", "App", "Criptomoneda"],
+        [0.39, 0.33, 0.26, 0.02],
+    ),
+}
+
+# Probabilidad de membresía premium por estrato (principal señal del dataset real)
+PREMIUM_RATE = {"Bajo": 0.004, "Medio": 0.14, "Alto": 0.70, "Muy Alto": 0.95}
+
+# Rangos válidos de los campos numéricos de un cliente nuevo (payloads de la API)
+CLIENT_DOMAINS = {"edad": (18, 90), "frecuencia_visita": (0, 10)}
+
+
+def generate_raw_data(n_rows: int, seed: int = 42) -> pd.DataFrame:
+    """
+    Genera un dataset sintético con el esquema de `base_datos_restaurantes_USA_v2.csv`,
+    incluyendo nulos y outliers similares a los del dataset real.
+    """
+    rng = np.random.default_rng(seed)
+
+    data = {
+        "id_persona": rng.integers(1_000_000_000, 9_999_999_999, n_rows),
+        "nombre": rng.choice(["Jackson", "Samantha", "Terry", "James", "Susan"], n_rows),
+        "apellido": rng.choice(["Gomez", "Soto", "Adams", "Shannon", "Jones"], n_rows),
+        "edad": rng.normal(50, 18, n_rows).round().clip(-5, 100),
+    }
+    for col, (values, probs) in CATEGORIES.items():
+        data[col] = rng.choice(values, n_rows, p=np.array(probs) / np.sum(probs))
+
+    data["frecuencia_visita"] = rng.integers(-3, 11, n_rows)
+    data["promedio_gasto_comida"] = rng.gamma(1.6, 20, n_rows).clip(0, 150).round(2)
+    data["ingresos_mensuales"] = rng.integers(800, 18_000, n_rows)
+    data["telefono_contacto"] = np.where(rng.random(n_rows) < 0.5, "881-476-1426", None)
+    data["correo_electronico"] = np.where(rng.random(n_rows) < 0.5, "cliente@correo.com", None)
+
+    rates = pd.Series(data["estrato_socioeconomico"]).map(PREMIUM_RATE).to_numpy()
+    data["membresia_premium"] = np.where(rng.random(n_rows) < rates, "Sí", "No")
+
+    df = pd.DataFrame(data)
+
+    # Nulos y outliers (proporciones similares al dataset real)
+    df.loc[rng.random(n_rows) < 0.0035, "edad"] = np.nan
+    df.loc[rng.random(n_rows) < 0.0037, "edad"] = 300
+    df.loc[rng.random(n_rows) < 0.005, "promedio_gasto_comida"] = np.nan
+    df.loc[rng.random(n_rows) < 0.047, "preferencias_alimenticias"] = np.nan
+
+    return df
+
+
+def generate_new_clients(n_rows: int, seed: int = 7) -> pd.DataFrame:
+    """
+    Genera clientes nuevos (sin target, nulos ni outliers) con el formato de `data/new_data.csv`.
+    Los valores fuera de CLIENT_DOMAINS (edades nulas, negativas o de 300, frecuencias
+    negativas del dataset raw) se vuelven a sortear dentro del rango.
+    """
+    df = generate_raw_data(n_rows, seed=seed).drop(columns=["membresia_premium"])
+    rng = np.random.default_rng(seed)
+    for col, (low, high) in CLIENT_DOMAINS.items():
+        invalid = ~df[col].between(low, high)
+        df.loc[invalid, col] = rng.integers(low, high + 1, invalid.sum())
+    df["promedio_gasto_comida"] = df["promedio_gasto_comida"].fillna(25.5)
+    df["preferencias_alimenticias"] = df["preferencias_alimenticias"].fillna("Carnes")
+    return df
+
+
+def client_payloads(n_rows: int, seed: int = 7) -> pd.DataFrame:
+    """Clientes nuevos con solo las columnas de ClientData (payloads de la API)."""
+    return generate_new_clients(n_rows, seed=seed)[CLIENT_FEATURES]
+
+
+def write_csv(df: pd.DataFrame, path: str) -> str:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    df.to_csv(path, index=False)
+    return path
+
+
+def write_raw_data(
+    path: str, n_rows: int, block_rows: int = GENERATION_BLOCK, new_clients=False
+) -> str:
+    """
+    Escribe un CSV sintético de `n_rows` filas por bloques, sin tenerlo entero en
+    memoria (escalas de 10M+ filas). Con `new_clients=True` escribe clientes
+    nuevos (sin target) en lugar del dataset raw.
+    """
+    generate = generate_new_clients if new_clients else generate_raw_data
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    for i, start in enumerate(range(0, n_rows, block_rows)):
+        block = generate(min(block_rows, n_rows - start), seed=i)
+        block.to_csv(path, mode="w" if i == 0 else "a", header=i == 0, index=False)
+    return path
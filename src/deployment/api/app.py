@@ -1,25 +1,132 @@
-from fastapi import FastAPI
-from pydantic import BaseModel
+import json
+import os
+import time
+from contextlib import asynccontextmanager
+from fastapi import Depends, FastAPI, HTTPException, Request
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import Response, StreamingResponse
+from pydantic import BaseModel, ValidationError
+from starlette.concurrency import run_in_threadpool
 import pandas as pd
-import joblib
 import uvicorn
-from mlflow import sklearn as mlflow_sklearn
+from src.deployment.api import metrics
+from src.deployment.api.batcher import MicroBatcher
+from src.deployment.api.model_manager import ModelManager
+from src.deployment.api.prediction_cache import PredictionCache
+from src.features.compiled_transformer import CompiledFeatureTransformer
+from src.utils.validators import PayloadValidationError, ndjson_to_frame, payload_to_frame
 
-app = FastAPI(title="Membresías Premium API", version="1.0.0")
+# Filas por bloque en las respuestas NDJSON de /predict_batch
+STREAM_CHUNK_SIZE = int(os.getenv("STREAM_CHUNK_SIZE", "5000"))
+# Tamaño máximo del cuerpo de /predict_batch (413 si se supera)
+MAX_BATCH_BODY_BYTES = int(float(os.getenv("MAX_BATCH_BODY_MB", "100")) * 1024 * 1024)
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
 
-# === Cargar modelo y pipeline ===
-MODEL_URI = "models:/membresia_premium_best_model/Production"
-LOCAL_MODEL_PATH = "models/local_best_model.pkl"
-PIPELINE_PATH = "models/feature_pipeline.pkl"
+# === Modelo y pipeline: se cargan al iniciar la app y se recargan en caliente ===
+model_manager = ModelManager()
 
-try:
-    model = mlflow_sklearn.load_model(MODEL_URI)
-    print("✅ Modelo cargado desde MLflow Registry.")
-except Exception:
-    model = joblib.load(LOCAL_MODEL_PATH)
-    print("⚠️  No se pudo acceder a MLflow. Usando modelo local.")
-    
-feature_pipeline = joblib.load(PIPELINE_PATH)
+
+def predict_frame(input_df, model_version=None):
+    """
+    Ejecuta una sola transformación y una sola inferencia sobre un lote de clientes.
+
+    Returns:
+        tuple: (predicciones, probabilidades). Las probabilidades son None si el
+        modelo no implementa predict_proba.
+    """
+    # Una sola lectura de la versión activa: un cambio de modelo no afecta al lote en curso
+    model_version = model_version or model_manager.active
+    with metrics.STAGE_LATENCY.time(stage="transform"):
+        transformed = model_version.transform(input_df)
+    with metrics.STAGE_LATENCY.time(stage="predict"):
+        preds, probas = model_version.score(transformed)
+    metrics.PREDICTIONS_TOTAL.inc(len(preds), model_version=model_version.version)
+    return preds, probas
+
+
+def format_predictions(preds, probas):
+    if probas is None:
+        probas = [None] * len(preds)
+    return [
+        {
+            "prediction": int(pred),
+            "probability": round(float(proba), 4) if proba is not None else None,
+        }
+        for pred, proba in zip(preds, probas)
+    ]
+
+
+def predict_records(records):
+    """
+    Predice un lote de registros (dicts) con una sola transformación e inferencia.
+    """
+    model_version = model_manager.active
+    metrics.BATCH_SIZE.observe(len(records), source="micro_batch")
+    # El transformador compilado acepta los registros directamente (sin DataFrame)
+    if not isinstance(model_version.feature_pipeline, CompiledFeatureTransformer):
+        with metrics.STAGE_LATENCY.time(stage="dataframe"):
+            records = pd.DataFrame.from_records(records)
+    preds, probas = predict_frame(records, model_version)
+    return format_predictions(preds, probas)
+
+
+def stream_predictions(input_df, chunk_size=STREAM_CHUNK_SIZE, model_version=None):
+    """
+    Genera las predicciones en formato NDJSON por bloques de `chunk_size` filas.
+    Todo el payload se puntúa con la misma versión del modelo.
+    """
+    model_version = model_version or model_manager.active
+    for start in range(0, len(input_df), chunk_size):
+        chunk = input_df.iloc[start:start + chunk_size]
+        metrics.BATCH_SIZE.observe(len(chunk), source="predict_batch")
+        preds, probas = predict_frame(chunk, model_version)
+        lines = [
+            json.dumps({"row": start + i, **result})
+            for i, result in enumerate(format_predictions(preds, probas))
+        ]
+        yield "\n".join(lines) + "\n"
+
+
+batcher = MicroBatcher(predict_records)
+
+# Predicciones recientes por cliente (se invalidan al cambiar el modelo activo)
+prediction_cache = PredictionCache()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    model_manager.start()
+    await batcher.start()
+    yield
+    await batcher.stop()
+    model_manager.stop()
+
+
+app = FastAPI(title="Membresías Premium API", version="1.0.0", lifespan=lifespan)
+
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """
+    Latencia, conteo y solicitudes en curso por endpoint. Se etiqueta con la
+    plantilla de la ruta (p. ej. /models/{version}/activate) para acotar las series.
+    """
+    start = time.perf_counter()
+    status = 500
+    metrics.REQUESTS_IN_FLIGHT.inc()
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        metrics.REQUESTS_IN_FLIGHT.dec()
+        route = request.scope.get("route")
+        endpoint = route.path if route is not None else "unmatched"
+        # En /predict_batch mide hasta el inicio del streaming de la respuesta
+        metrics.REQUEST_LATENCY.observe(
+            time.perf_counter() - start, method=request.method, endpoint=endpoint
+        )
+        metrics.REQUESTS_TOTAL.inc(method=request.method, endpoint=endpoint, status=status)
 
 
 # === Esquema de entrada ===
@@ -42,24 +149,201 @@ def root():
     return {"status": "API Online", "version": "1.0.0"}
 
 
-@app.post("/predict")
-def predict(data: ClientData):
+@app.get("/models")
+def list_models():
+    """
+    Versiones de modelo cargadas en memoria, la activa y su tamaño aproximado.
+    """
+    return {"active": model_manager.active.version, "versions": model_manager.list_versions()}
+
+
+@app.post("/models/{version}/activate")
+def activate_model(version: str):
+    """
+    Activa una versión ya cargada (p. ej. para volver a la anterior).
+    """
+    try:
+        return model_manager.activate(version).describe()
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Versión no cargada: {version}")
+
+
+@app.get("/metrics")
+def prometheus_metrics():
+    """
+    Métricas de latencia y throughput en formato de texto de Prometheus.
+    """
+    return Response(metrics.REGISTRY.render(), media_type=metrics.CONTENT_TYPE)
+
+
+@app.get("/cache/stats")
+def cache_stats():
+    """
+    Aciertos, fallos y desalojos de la caché de predicciones.
+    """
+    return prediction_cache.stats()
+
+
+async def client_record(request: Request) -> dict:
+    """
+    Decodifica y valida el cuerpo de /predict con ClientData, midiendo la etapa
+    "validation" (FastAPI lo haría antes del endpoint, fuera de STAGE_LATENCY).
+    Los errores mantienen el formato 422 de FastAPI.
+    """
+    body = await request.body()
+    with metrics.STAGE_LATENCY.time(stage="validation"):
+        try:
+            return ClientData.model_validate_json(body).model_dump()
+        except ValidationError as e:
+            errors = [
+                {**error, "loc": ("body", *error["loc"])} for error in e.errors(include_url=False)
+            ]
+            raise RequestValidationError(errors, body=body)
+
+
+@app.post(
+    "/predict",
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {"application/json": {"schema": ClientData.model_json_schema()}},
+        }
+    },
+)
+async def predict(record: dict = Depends(client_record)):
     """
     Recibe un cliente en formato JSON y devuelve la predicción de membresía premium.
+    Un mismo cliente con el mismo modelo se responde desde la caché; el resto de
+    solicitudes concurrentes se agrupan en micro-lotes (ver MicroBatcher).
+    """
+    if not prediction_cache.enabled:
+        return await batcher.submit(record)
+
+    model_version = model_manager.active.version
+    key = prediction_cache.make_key(record, model_version)
+    cached = prediction_cache.get(key, model_version)
+    if cached is not None:
+        return cached
+
+    result = await batcher.submit(record)
+    prediction_cache.put(key, result, model_version)
+    return result
+
+
+def _body_too_large():
+    return HTTPException(
+        status_code=413,
+        detail=f"El cuerpo supera el máximo de {MAX_BATCH_BODY_BYTES} bytes (MAX_BATCH_BODY_MB).",
+    )
+
+
+async def read_limited_body(request: Request, limit=MAX_BATCH_BODY_BYTES) -> bytes:
+    """
+    Lee el cuerpo completo cortando con 413 en cuanto supera `limit` bytes.
+    """
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > limit:
+        raise _body_too_large()
+
+    body = bytearray()
+    async for part in request.stream():
+        body.extend(part)
+        if len(body) > limit:
+            raise _body_too_large()
+    return bytes(body)
+
+
+async def ndjson_chunks(request: Request, chunk_size=STREAM_CHUNK_SIZE, limit=MAX_BATCH_BODY_BYTES):
+    """
+    Lee un cuerpo NDJSON en streaming y entrega bloques de hasta `chunk_size` líneas.
+    En memoria solo queda el bloque en curso, no el cuerpo completo.
+    """
+    received = 0
+    pending = b""
+    lines = []
+    async for part in request.stream():
+        received += len(part)
+        if received > limit:
+            raise _body_too_large()
+        *complete, pending = (pending + part).split(b"\n")
+        lines.extend(line for line in complete if line.strip())
+        while len(lines) >= chunk_size:
+            yield lines[:chunk_size]
+            lines = lines[chunk_size:]
+    if pending.strip():
+        lines.append(pending)
+    if lines:
+        yield lines
+
+
+def score_ndjson_chunk(lines, offset, model_version):
+    """
+    Valida y puntúa un bloque NDJSON; devuelve las líneas de respuesta del bloque.
+    """
+    with metrics.STAGE_LATENCY.time(stage="validation"):
+        chunk = ndjson_to_frame(lines, offset=offset)
+    metrics.BATCH_SIZE.observe(len(chunk), source="predict_batch")
+    preds, probas = predict_frame(chunk, model_version)
+    return "".join(
+        json.dumps({"row": offset + i, **result}) + "\n"
+        for i, result in enumerate(format_predictions(preds, probas))
+    )
+
+
+def parse_json_batch(body: bytes) -> pd.DataFrame:
+    """
+    Decodifica y valida un cuerpo JSON (lista de registros o columnar).
+    """
+    payload = json.loads(body)
+    # Construcción del DataFrame y validación vectorizada en un solo paso
+    with metrics.STAGE_LATENCY.time(stage="validation"):
+        return payload_to_frame(payload)
+
+
+@app.post("/predict_batch")
+async def predict_batch(request: Request):
+    """
+    Recibe muchos clientes en una sola llamada y devuelve las predicciones como NDJSON.
+
+    Con `Content-Type: application/x-ndjson` (un registro por línea) el cuerpo se lee
+    en streaming y se valida y puntúa por bloques de STREAM_CHUNK_SIZE filas, sin
+    tener el cuerpo completo en memoria; la respuesta se envía entera al terminar
+    de leerlo (solo se acumulan las líneas de salida, unos bytes por fila), de modo
+    que un error de validación en cualquier fila sigue siendo un 422. Responder
+    mientras se lee el cuerpo bloquearía a los clientes que envían todo el cuerpo
+    antes de leer la respuesta. También acepta JSON: una lista de registros
+    (`[{...}, {...}]`) o un payload columnar (`{"edad": [...], "genero": [...], ...}`).
+    En ambos casos el cuerpo está limitado a MAX_BATCH_BODY_MB y la decodificación,
+    validación e inferencia corren en el threadpool, fuera del event loop que
+    atiende los micro-lotes de /predict.
     """
-    input_df = pd.DataFrame([data.dict()])
+    model_version = model_manager.active
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
 
-    # Aplicar pipeline de features
-    transformed = feature_pipeline.transform(input_df)
+    if content_type == NDJSON_MEDIA_TYPE:
+        # Se puntúa mientras se lee; la respuesta se arma al terminar el cuerpo
+        blocks, offset = [], 0
+        try:
+            async for lines in ndjson_chunks(request, STREAM_CHUNK_SIZE, MAX_BATCH_BODY_BYTES):
+                block = await run_in_threadpool(score_ndjson_chunk, lines, offset, model_version)
+                blocks.append(block)
+                offset += len(lines)
+        except PayloadValidationError as e:
+            raise HTTPException(status_code=422, detail=e.errors)
+        return Response("".join(blocks), media_type=NDJSON_MEDIA_TYPE)
 
-    # Predicciones
-    pred = model.predict(transformed)[0]
-    proba = model.predict_proba(transformed)[0, 1] if hasattr(model, "predict_proba") else None
+    body = await read_limited_body(request, MAX_BATCH_BODY_BYTES)
+    try:
+        input_df = await run_in_threadpool(parse_json_batch, body)
+    except json.JSONDecodeError as e:
+        raise HTTPException(status_code=400, detail=f"JSON inválido: {e}")
+    except PayloadValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors)
 
-    return {
-        "prediction": int(pred),
-        "probability": round(float(proba), 4) if proba is not None else None
-    }
+    # StreamingResponse consume el generador síncrono en el threadpool
+    return StreamingResponse(
+        stream_predictions(input_df, model_version=model_version), media_type=NDJSON_MEDIA_TYPE
+    )
 
 
 if __name__ == "__main__":
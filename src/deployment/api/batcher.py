@@ -0,0 +1,126 @@
+import asyncio
+import os
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.utils.logger import LOG_RATE_LIMIT, get_logger
+
+# Los errores de inferencia se repiten en cada lote mientras dure la falla: se limitan
+logger = get_logger(__name__, rate_limit=LOG_RATE_LIMIT)
+
+# Ventana de agrupación (configurable por variables de entorno en el contenedor)
+MAX_BATCH_SIZE = int(os.getenv("BATCH_MAX_SIZE", "64"))
+MAX_WAIT_MS = float(os.getenv("BATCH_MAX_WAIT_MS", "5"))
+
+
+class MicroBatcher:
+    """
+    Agrupa solicitudes concurrentes en micro-lotes para ejecutar una sola
+    inferencia por lote y devolver a cada solicitud su resultado.
+
+    Args:
+        predict_fn (Callable): Función síncrona que recibe una lista de registros
+            (dicts) y devuelve una lista de resultados en el mismo orden.
+        max_batch_size (int): Tamaño máximo de cada lote.
+        max_wait_ms (float): Tiempo máximo (ms) que espera el primer registro
+            del lote a que lleguen más solicitudes.
+    """
+
+    def __init__(
+        self,
+        predict_fn: Callable[[List[Dict[str, Any]]], List[Any]],
+        max_batch_size: int = MAX_BATCH_SIZE,
+        max_wait_ms: float = MAX_WAIT_MS,
+    ):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size debe ser mayor o igual a 1.")
+        if max_wait_ms < 0:
+            raise ValueError("max_wait_ms no puede ser negativo.")
+
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+
+    async def start(self):
+        """Inicia la tarea que consume la cola de solicitudes."""
+        if self._worker is not None:
+            return
+        self._queue = asyncio.Queue()
+        self._worker = asyncio.create_task(self._run())
+        logger.info(
+            f"Micro-batcher iniciado (max_batch_size={self.max_batch_size}, "
+            f"max_wait_ms={self.max_wait_ms})"
+        )
+
+    async def stop(self):
+        """Detiene la tarea consumidora y cancela las solicitudes pendientes."""
+        if self._worker is None:
+            return
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+
+        while not self._queue.empty():
+            _, future = self._queue.get_nowait()
+            if not future.done():
+                future.cancel()
+        logger.info("Micro-batcher detenido.")
+
+    async def submit(self, record: Dict[str, Any]) -> Any:
+        """
+        Encola un registro y espera el resultado de su lote.
+        """
+        if self._worker is None:
+            raise RuntimeError("El micro-batcher no está iniciado.")
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((record, future))
+        return await future
+
+    async def _collect_batch(self) -> List[Tuple[Dict[str, Any], asyncio.Future]]:
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self.max_wait_ms / 1000
+
+        while len(batch) < self.max_batch_size:
+            # Primero se vacía lo que ya está en cola, sin esperar
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+
+        return batch
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect_batch()
+            records = [record for record, _ in batch]
+
+            try:
+                # La inferencia es CPU-bound: se ejecuta fuera del event loop
+                results = await loop.run_in_executor(None, self.predict_fn, records)
+                if len(results) != len(records):
+                    raise RuntimeError(
+                        f"predict_fn devolvió {len(results)} resultados "
+                        f"para {len(records)} registros."
+                    )
+            except Exception as e:
+                logger.error(f"Error en la inferencia del lote ({len(records)} registros): {e}")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
@@ -0,0 +1,221 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+
+# Formato de exposición de texto de Prometheus
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Segundos: de 0.5 ms (un cliente en caché) a 10 s (un payload grande de /predict_batch)
+LATENCY_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 1000, 5000, 20000, 100000)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+
+class Registry:
+    """Conjunto de métricas que se exponen juntas en /metrics."""
+
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+class _Metric:
+    """
+    Base de las métricas: un valor por combinación de etiquetas.
+
+    Las actualizaciones llegan desde el event loop y desde el hilo del
+    micro-batcher, así que cada métrica usa un lock propio (sección crítica de
+    unas pocas operaciones aritméticas).
+    """
+
+    type = None
+
+    def __init__(self, name, documentation, labelnames=(), registry=REGISTRY):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        if registry is not None:
+            registry.register(self)
+
+    def _key(self, labels):
+        if len(labels) != len(self.labelnames):
+            raise ValueError(
+                f"{self.name} espera las etiquetas {self.labelnames}, recibió {tuple(labels)}"
+            )
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _label_text(self, key, extra=()):
+        pairs = list(zip(self.labelnames, key)) + list(extra)
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+    def get(self, **labels):
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        return [
+            f"{self.name}{self._label_text(key)} {_format_value(value)}" for key, value in items
+        ]
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def inc(self, amount=1.0, **labels):
+        if amount < 0:
+            raise ValueError("Un contador solo puede aumentar.")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+
+class Gauge(_Metric):
+    type = "gauge"
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def inc(self, amount=1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount=1.0, **labels):
+        self.inc(-amount, **labels)
+
+    @contextmanager
+    def track_inprogress(self, **labels):
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+
+class Histogram(_Metric):
+    """
+    Histograma con buckets fijos. Cada observación solo incrementa un bucket
+    (búsqueda binaria); los conteos acumulados `le` se calculan al exponer.
+    """
+
+    type = "histogram"
+
+    def __init__(
+        self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS, registry=REGISTRY
+    ):
+        super().__init__(name, documentation, labelnames, registry)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # [conteo por bucket (+Inf al final), suma, total]
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def get(self, **labels):
+        state = self._values.get(self._key(labels))
+        return {"count": state[2], "sum": state[1]} if state else {"count": 0, "sum": 0.0}
+
+    def samples(self):
+        with self._lock:
+            items = sorted(
+                (key, (list(state[0]), state[1], state[2])) for key, state in self._values.items()
+            )
+
+        lines = []
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                labels = self._label_text(key, [("le", _format_value(bound))])
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            lines.append(f"{self.name}_sum{self._label_text(key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{self._label_text(key)} {count}")
+        return lines
+
+
+# === Métricas de la API ===
+REQUESTS_TOTAL = Counter(
+    "api_requests_total", "Solicitudes HTTP atendidas.", ["method", "endpoint", "status"]
+)
+REQUEST_LATENCY = Histogram(
+    "api_request_duration_seconds",
+    "Latencia de extremo a extremo por endpoint.",
+    ["method", "endpoint"],
+)
+REQUESTS_IN_FLIGHT = Gauge("api_requests_in_flight", "Solicitudes en curso.")
+STAGE_LATENCY = Histogram(
+    "prediction_stage_duration_seconds",
+    "Duración de cada etapa de la predicción (validation, dataframe, transform, predict).",
+    ["stage"],
+)
+BATCH_SIZE = Histogram(
+    "prediction_batch_size",
+    "Filas por inferencia (micro_batch: lotes de /predict; "
+    "predict_batch: bloques de /predict_batch).",
+    ["source"],
+    buckets=BATCH_SIZE_BUCKETS,
+)
+PREDICTIONS_TOTAL = Counter(
+    "predictions_total", "Filas puntuadas por el modelo.", ["model_version"]
+)
@@ -0,0 +1,286 @@
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from src.deployment.bundle import BUNDLE_PATH, load_serving_bundle, model_version_label
+from src.models.model_utils import (
+    get_metadata_path,
+    load_model_metadata,
+    load_model_threshold,
+    score_model,
+)
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+MODEL_NAME = "membresia_premium_best_model"
+MODEL_URI = f"models:/{MODEL_NAME}/Production"
+MLFLOW_TRACKING_URI = "file:./mlruns"
+LOCAL_MODEL_PATH = "models/local_best_model.pkl"
+PIPELINE_PATH = "models/feature_pipeline.pkl"
+COMPILED_PIPELINE_PATH = "models/feature_pipeline_compiled.pkl"
+# Carpeta del Model Registry en el file store de MLflow (cambia al registrar una versión)
+REGISTRY_DIR = os.path.join("mlruns", "models", MODEL_NAME)
+
+# Intervalo de revisión de artefactos nuevos y versiones que se mantienen en memoria
+RELOAD_INTERVAL_SEC = float(os.getenv("MODEL_RELOAD_INTERVAL_SEC", "30"))
+MAX_LOADED_VERSIONS = int(os.getenv("MAX_LOADED_VERSIONS", "3"))
+# Si no hay bundle de serving y es True, intenta cargar la versión Production del Model Registry
+USE_MLFLOW_REGISTRY = os.getenv("USE_MLFLOW_REGISTRY", "true").lower() in ("1", "true", "yes")
+
+
+def _file_state(path):
+    if os.path.isdir(path):
+        return tuple(sorted(os.listdir(path))), os.stat(path).st_mtime_ns
+    if os.path.exists(path):
+        stat = os.stat(path)
+        return stat.st_mtime_ns, stat.st_size
+    return None
+
+
+def _estimate_nbytes(obj):
+    """Tamaño aproximado en memoria (tamaño serializado del objeto)."""
+    try:
+        return len(pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return None
+
+
+class ModelVersion:
+    """
+    Modelo + pipeline de features + umbral de decisión cargados juntos.
+    Una solicitud usa siempre la misma versión de principio a fin.
+    """
+
+    def __init__(self, version, model, feature_pipeline, threshold, source):
+        self.version = version
+        self.model = model
+        self.feature_pipeline = feature_pipeline
+        self.threshold = threshold
+        self.source = source
+        self.loaded_at = time.time()
+        self._memory_bytes = None
+
+    @property
+    def memory_bytes(self):
+        # Se calcula al consultarlo, no al cargar: no retrasa el arranque ni la recarga
+        if self._memory_bytes is None:
+            sizes = [_estimate_nbytes(self.model), _estimate_nbytes(self.feature_pipeline)]
+            self._memory_bytes = sum(sizes) if None not in sizes else None
+        return self._memory_bytes
+
+    def transform(self, X):
+        return self.feature_pipeline.transform(X)
+
+    def score(self, transformed):
+        return score_model(self.model, transformed, self.threshold)
+
+    def predict(self, X):
+        """
+        Transforma y puntúa un lote. Returns: (predicciones, probabilidades | None).
+        """
+        return self.score(self.transform(X))
+
+    def describe(self):
+        memory_bytes = self.memory_bytes
+        return {
+            "version": self.version,
+            "source": self.source,
+            "decision_threshold": self.threshold,
+            "model": type(self.model).__name__,
+            "loaded_at": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.loaded_at)),
+            "memory_bytes": memory_bytes,
+            "memory_mb": round(memory_bytes / 1024**2, 2) if memory_bytes is not None else None,
+        }
+
+
+class ModelManager:
+    """
+    Registro en proceso de versiones de modelo con recarga en caliente.
+
+    Mantiene hasta `max_versions` versiones en memoria. Un hilo en segundo plano
+    revisa cada `poll_interval` segundos los artefactos locales y el Model
+    Registry de MLflow; si cambian, carga la nueva versión en ese hilo y luego
+    reemplaza la referencia activa con una sola asignación. Las solicitudes en
+    curso terminan con la versión que tomaron, así que no se pierde ninguna.
+    """
+
+    def __init__(
+        self,
+        model_path=LOCAL_MODEL_PATH,
+        pipeline_path=PIPELINE_PATH,
+        compiled_path=COMPILED_PIPELINE_PATH,
+        bundle_path=BUNDLE_PATH,
+        registry_dir=REGISTRY_DIR,
+        use_mlflow=USE_MLFLOW_REGISTRY,
+        poll_interval=RELOAD_INTERVAL_SEC,
+        max_versions=MAX_LOADED_VERSIONS,
+    ):
+        self.model_path = model_path
+        self.pipeline_path = pipeline_path
+        self.compiled_path = compiled_path
+        self.bundle_path = bundle_path
+        self.registry_dir = registry_dir
+        self.use_mlflow = use_mlflow
+        self.poll_interval = poll_interval
+        self.max_versions = max_versions
+
+        self.versions = OrderedDict()
+        self._active = None
+        self._fingerprint = None
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._watcher = None
+
+    @property
+    def active(self) -> ModelVersion:
+        if self._active is None:
+            raise RuntimeError("No hay ningún modelo cargado.")
+        return self._active
+
+    def _watched_paths(self):
+        paths = [self.bundle_path, self.model_path, get_metadata_path(self.model_path)]
+        paths += [self.pipeline_path, self.compiled_path]
+        return paths + ([self.registry_dir] if self.use_mlflow else [])
+
+    def _current_fingerprint(self):
+        return tuple(_file_state(path) for path in self._watched_paths())
+
+    def _load_from_mlflow(self):
+        # Import diferido: MLflow solo se importa si se usa el Model Registry
+        import mlflow
+        from mlflow import sklearn as mlflow_sklearn
+        from mlflow.tracking import MlflowClient
+        from src.models.model_registry import run_decision_threshold
+
+        mlflow.set_tracking_uri(MLFLOW_TRACKING_URI)
+        client = MlflowClient()
+        latest = client.get_latest_versions(MODEL_NAME, stages=["Production"])
+        if not latest:
+            raise LookupError(f"No hay versión en Production para {MODEL_NAME}.")
+        model = mlflow_sklearn.load_model(MODEL_URI)
+        # El umbral es el del run de esa versión, no el de la metadata local
+        threshold = run_decision_threshold(client.get_run(latest[0].run_id))
+        return model, f"mlflow-v{latest[0].version}", MODEL_URI, threshold
+
+    def _load_from_disk(self):
+        import joblib
+
+        model = joblib.load(self.model_path)
+        version = model_version_label(load_model_metadata(self.model_path), self.model_path)
+        return model, version, self.model_path, load_model_threshold(self.model_path)
+
+    def _load_bundle(self):
+        bundle = load_serving_bundle(self.bundle_path)
+        return ModelVersion(
+            bundle["version"],
+            bundle["model"],
+            bundle["feature_pipeline"],
+            bundle["decision_threshold"],
+            self.bundle_path,
+        )
+
+    def _load_artifacts(self):
+        model = None
+        if self.use_mlflow:
+            try:
+                model, version, source, threshold = self._load_from_mlflow()
+            except Exception as e:
+                logger.warning(
+                    f"No se pudo cargar desde MLflow Registry ({e}). Usando modelo local."
+                )
+        if model is None:
+            model, version, source, threshold = self._load_from_disk()
+
+        if version in self.versions:
+            return self.versions[version]
+
+        from src.features.feature_engineering import load_serving_pipeline
+
+        return ModelVersion(
+            version,
+            model,
+            load_serving_pipeline(self.pipeline_path, self.compiled_path),
+            threshold,
+            source,
+        )
+
+    def load_latest(self) -> ModelVersion:
+        """
+        Carga la versión más reciente y la activa. Orden de preferencia: bundle de
+        serving (sin importar MLflow), MLflow Registry y modelo local. Si la versión
+        ya estaba en memoria, solo la reactiva.
+        """
+        fingerprint = self._current_fingerprint()
+        if os.path.exists(self.bundle_path):
+            loaded = self._load_bundle()
+        else:
+            loaded = self._load_artifacts()
+
+        if loaded.version in self.versions:
+            self.activate(loaded.version)
+            self._fingerprint = fingerprint
+            return self.versions[loaded.version]
+
+        version, source = loaded.version, loaded.source
+        with self._lock:
+            self.versions[version] = loaded
+            # Referencia activa reemplazada en una sola asignación
+            self._active = loaded
+            self._fingerprint = fingerprint
+            self._evict()
+
+        logger.info(f"Modelo '{version}' cargado y activo (origen: {source}).")
+        return loaded
+
+    def _evict(self):
+        while len(self.versions) > self.max_versions:
+            oldest = next(v for v in self.versions if self.versions[v] is not self._active)
+            del self.versions[oldest]
+            logger.info(f"Versión '{oldest}' descargada de memoria.")
+
+    def activate(self, version):
+        """Activa una versión ya cargada (p. ej. para volver atrás)."""
+        with self._lock:
+            if version not in self.versions:
+                raise KeyError(version)
+            self.versions.move_to_end(version)
+            self._active = self.versions[version]
+        logger.info(f"Versión activa: '{version}'.")
+        return self._active
+
+    def list_versions(self):
+        active = self._active
+        return [dict(v.describe(), active=v is active) for v in self.versions.values()]
+
+    def check_for_updates(self):
+        """Recarga si algún artefacto observado cambió. Devuelve True si hubo recarga."""
+        if self._current_fingerprint() == self._fingerprint:
+            return False
+        logger.info("Cambios detectados en los artefactos del modelo. Recargando...")
+        self.load_latest()
+        return True
+
+    def _watch(self):
+        while not self._stop_event.wait(self.poll_interval):
+            try:
+                self.check_for_updates()
+            except Exception as e:
+                # Un artefacto a medio escribir no debe detener el servicio: se reintenta
+                logger.error(f"Error al recargar el modelo: {e}")
+
+    def start(self):
+        """Carga el modelo (si hace falta) e inicia el hilo de recarga en caliente."""
+        if self._active is None:
+            self.load_latest()
+        if self._watcher is None and self.poll_interval > 0:
+            self._stop_event.clear()
+            self._watcher = threading.Thread(target=self._watch, name="model-watcher", daemon=True)
+            self._watcher.start()
+
+    def stop(self):
+        if self._watcher is not None:
+            self._stop_event.set()
+            self._watcher.join()
+            self._watcher = None
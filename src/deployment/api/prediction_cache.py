@@ -0,0 +1,113 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+# Tamaño máximo (0 desactiva la caché) y vigencia de cada predicción cacheada
+CACHE_MAX_SIZE = int(os.getenv("PREDICTION_CACHE_SIZE", "10000"))
+CACHE_TTL_SEC = float(os.getenv("PREDICTION_CACHE_TTL_SEC", "600"))
+
+
+def _canonical(value):
+    # 40 y 40.0 representan el mismo cliente
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    return value
+
+
+class PredictionCache:
+    """
+    Caché en proceso de predicciones por cliente con desalojo LRU + TTL.
+
+    La clave es un hash canónico del payload (campos ordenados, números como
+    float) junto con la versión del modelo. Cuando llega una consulta con otra
+    versión de modelo, la caché se vacía: nunca se devuelve una predicción de
+    un modelo anterior.
+    """
+
+    def __init__(self, max_size=CACHE_MAX_SIZE, ttl_sec=CACHE_TTL_SEC, clock=time.monotonic):
+        self.max_size = max_size
+        self.ttl_sec = ttl_sec
+        self.clock = clock
+        self.model_version = None
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self):
+        return self.max_size > 0
+
+    @staticmethod
+    def make_key(record, model_version):
+        canonical = {field: _canonical(value) for field, value in record.items()}
+        payload = json.dumps([model_version, canonical], sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _sync_version(self, model_version):
+        if model_version != self.model_version:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self.model_version = model_version
+
+    def get(self, key, model_version):
+        """Predicción cacheada o None (y la marca como usada recientemente)."""
+        with self._lock:
+            self._sync_version(model_version)
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, value = entry
+            if self.clock() >= expires_at:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value, model_version):
+        """Guarda una predicción; se descarta si el modelo activo ya cambió."""
+        if not self.enabled:
+            return
+        with self._lock:
+            if model_version != self.model_version:
+                return
+            self._entries[key] = (self.clock() + self.ttl_sec, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.invalidations += 1
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "model_version": self.model_version,
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_sec": self.ttl_sec,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
@@ -0,0 +1,80 @@
+import argparse
+import os
+import joblib
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+BUNDLE_PATH = "models/serving_bundle.joblib"
+BUNDLE_FORMAT_VERSION = 1
+
+LOCAL_MODEL_PATH = "models/local_best_model.pkl"
+PIPELINE_PATH = "models/feature_pipeline.pkl"
+COMPILED_PIPELINE_PATH = "models/feature_pipeline_compiled.pkl"
+
+
+def model_version_label(metadata, model_path):
+    """Nombre de versión a partir de la metadata del modelo (run de MLflow) o de su fecha."""
+    run_id = metadata.get("run_id")
+    if run_id:
+        return f"{metadata.get('run_name', 'local')}-{run_id[:8]}"
+    return f"local-{os.stat(model_path).st_mtime_ns}"
+
+
+def build_serving_bundle(
+    model_path=LOCAL_MODEL_PATH,
+    pipeline_path=PIPELINE_PATH,
+    compiled_path=COMPILED_PIPELINE_PATH,
+    output_path=BUNDLE_PATH,
+):
+    """
+    Empaqueta en un solo artefacto todo lo necesario para servir: modelo, pipeline
+    de features (compilado si existe), esquema de entrada, umbral y metadata.
+
+    Se guarda con joblib sin compresión para que los arreglos NumPy grandes se
+    puedan mapear en memoria al cargar (`mmap_mode`).
+    """
+    from src.features.feature_engineering import load_serving_pipeline
+    from src.models.model_utils import load_model_metadata, load_model_threshold
+    from src.utils.validators import CATEGORICAL_FEATURES, NUMERIC_FEATURES
+
+    metadata = load_model_metadata(model_path)
+    bundle = {
+        "format_version": BUNDLE_FORMAT_VERSION,
+        "version": model_version_label(metadata, model_path),
+        "model": joblib.load(model_path),
+        "feature_pipeline": load_serving_pipeline(pipeline_path, compiled_path),
+        "schema": {"numeric": NUMERIC_FEATURES, "categorical": CATEGORICAL_FEATURES},
+        "decision_threshold": load_model_threshold(model_path),
+        "metadata": metadata,
+    }
+
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    # Escritura atómica: el servicio puede estar observando el archivo para recargarlo
+    joblib.dump(bundle, f"{output_path}.tmp")
+    os.replace(f"{output_path}.tmp", output_path)
+    logger.info(f"Bundle de serving '{bundle['version']}' guardado en {output_path}")
+    return output_path
+
+
+def load_serving_bundle(path=BUNDLE_PATH, mmap_mode="r"):
+    """
+    Carga un bundle de serving sin importar MLflow.
+
+    Args:
+        mmap_mode (str): Modo de mapeo en memoria de joblib para los arreglos
+            (None para cargarlos completos).
+    """
+    bundle = joblib.load(path, mmap_mode=mmap_mode)
+    if bundle.get("format_version") != BUNDLE_FORMAT_VERSION:
+        raise ValueError(f"Versión de bundle no soportada: {bundle.get('format_version')}")
+    return bundle
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Genera el bundle de serving del mejor modelo.")
+    parser.add_argument("--model", default=LOCAL_MODEL_PATH)
+    parser.add_argument("--output", default=BUNDLE_PATH)
+    args = parser.parse_args()
+
+    build_serving_bundle(model_path=args.model, output_path=args.output)
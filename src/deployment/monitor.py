@@ -1,53 +1,270 @@
-import requests
-import pandas as pd
-import numpy as np
+import argparse
+import asyncio
+import csv
+import os
 import time
 from datetime import datetime
+import httpx
+import numpy as np
+from src.data.synthetic import client_payloads
 from src.utils.logger import get_logger
+from src.utils.storage import read_table
+from src.utils.validators import CLIENT_FEATURES
 
 logger = get_logger(__name__)
 
-API_URL = "http://localhost:8000/predict"
+API_URL = os.getenv("API_URL", "http://localhost:8000/predict")
 REPORT_PATH = "reports/monitoring_log.csv"
+CSV_FIELDS = ["timestamp", "status", "status_code", "latency"]
+
+# Resultados que se acumulan antes de agregarlos al CSV
+FLUSH_EVERY = 500
+
+
+class PayloadGenerator:
+    """
+    Genera payloads de ClientData para las pruebas de carga.
+
+    Por defecto usa clientes sintéticos (src.data.synthetic), generados por bloques
+    de `pool_size` a medida que se necesitan: un cliente nuevo nunca repite uno ya
+    enviado. Con `source` toma filas de un dataset real en orden aleatorio (solo se
+    repiten si la prueba supera las filas del dataset). `repeat_ratio` es la fracción
+    de solicitudes que repiten un cliente ya enviado (p. ej. para medir la caché de
+    predicciones) y es la única fuente de repetidos.
+    """
+
+    def __init__(self, seed=None, source=None, repeat_ratio=0.0, pool_size=10_000):
+        self.rng = np.random.default_rng(seed)
+        self.pool_size = pool_size
+        self.repeat_ratio = repeat_ratio
+        self._source = None
+        if source:
+            frame = read_table(source, columns=CLIENT_FEATURES).dropna()
+            self._source = frame.sample(frac=1, random_state=seed).to_dict(orient="records")
+        self.sent = []
+        self._pool = []
+        self._next = 0
+
+    def _new_client(self):
+        if self._next == len(self._pool):
+            self._pool, self._next = self._next_block(), 0
+        payload = self._pool[self._next]
+        self._next += 1
+        return payload
+
+    def _next_block(self):
+        if self._source is None:
+            block_seed = int(self.rng.integers(2**32))
+            return client_payloads(self.pool_size, seed=block_seed).to_dict(orient="records")
+        if len(self.sent) == len(self._source):
+            logger.warning(f"Se agotaron las {len(self._source)} filas de la fuente; se repiten.")
+        return self._source
+
+    def __call__(self):
+        # Los repetidos salen de los clientes ya enviados; el resto son clientes nuevos
+        if self.sent and self.rng.random() < self.repeat_ratio:
+            return self.sent[self.rng.integers(len(self.sent))]
+        payload = self._new_client()
+        self.sent.append(payload)
+        return payload
+
+
+class _ResultWriter:
+    """Agrega resultados al CSV por bloques, sin reescribir el historial."""
+
+    def __init__(self, path, flush_every=FLUSH_EVERY):
+        self.path = path
+        self.flush_every = flush_every
+        self._rows = []
+        if path:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    def write(self, row):
+        if self.path:
+            self._rows.append(row)
+            if len(self._rows) >= self.flush_every:
+                self.flush()
+
+    def flush(self):
+        if not self._rows:
+            return
+        new_file = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+        with open(self.path, "a", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
+            if new_file:
+                writer.writeheader()
+            writer.writerows(self._rows)
+        self._rows = []
+
 
-def simulate_request():
-    """Simula una predicción aleatoria para verificar rendimiento."""
-    payload = {
-        "edad": np.random.randint(18, 70),
-        "frecuencia_visita": np.random.randint(1, 10),
-        "promedio_gasto_comida": np.random.uniform(20, 80),
-        "ingresos_mensuales": np.random.uniform(1000, 18000),
-        "genero": "Masculino",
-        "ciudad_residencia": "NYC",
-        "estrato_socioeconomico": "Medio",
-        "ocio": "Si",
-        "consume_licor": "No",
-        "preferencias_alimenticias": "Carnes",
-        "tipo_de_pago_mas_usado": "Tarjeta"
+def summarize(latencies, errors, elapsed):
+    """Latencias p50/p95/p99 (ms) y throughput (solicitudes/s) de una prueba."""
+    latencies = np.asarray(latencies, dtype=float) * 1000
+    total = len(latencies) + errors
+    summary = {
+        "requests": total,
+        "ok": len(latencies),
+        "errors": errors,
+        "elapsed_sec": round(elapsed, 3),
     }
+    summary["throughput_rps"] = round(total / elapsed, 2) if elapsed > 0 else None
+    if len(latencies):
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+        summary.update(
+            p50_ms=round(p50, 2),
+            p95_ms=round(p95, 2),
+            p99_ms=round(p99, 2),
+            mean_ms=round(latencies.mean(), 2),
+            max_ms=round(latencies.max(), 2),
+        )
+    return summary
 
-    response = requests.post(API_URL, json=payload)
-    latency = response.elapsed.total_seconds()
 
-    if response.status_code == 200:
-        result = response.json()
-        logger.info(f"Predicción OK - Latencia: {latency:.3f}s - Prob: {result['probability']}")
-        return {"timestamp": datetime.now(), "status": "OK", "latency": latency}
-    else:
-        logger.warning(f"Error en API: {response.status_code}")
-        return {"timestamp": datetime.now(), "status": "FAIL", "latency": None}
+async def run_load_test(
+    url=API_URL,
+    n_requests=1000,
+    duration_sec=None,
+    concurrency=10,
+    rate=None,
+    generator=None,
+    report_path=REPORT_PATH,
+    timeout=10.0,
+    client=None,
+):
+    """
+    Envía solicitudes concurrentes a /predict y reporta latencia y throughput.
+
+    Args:
+        n_requests (int): Total de solicitudes (None para limitar solo por duración).
+        duration_sec (float): Duración máxima de la prueba.
+        concurrency (int): Solicitudes simultáneas como máximo.
+        rate (float): Solicitudes por segundo (None para enviar tan rápido como se pueda).
+            Con tasa fija, la latencia se mide desde el instante programado de
+            envío, así un servidor lento no oculta su propia cola (coordinated omission).
+        generator (Callable): Devuelve el payload de cada solicitud.
+        report_path (str): CSV donde se agrega cada resultado (None para no guardar).
+        client (httpx.AsyncClient): Cliente a usar (por defecto uno con `concurrency` conexiones).
+    Returns:
+        dict: Resumen de la prueba (ver `summarize`).
+    """
+    if n_requests is None and duration_sec is None:
+        raise ValueError("Se requiere n_requests o duration_sec.")
+
+    generator = generator or PayloadGenerator()
+    writer = _ResultWriter(report_path)
+    latencies, errors = [], 0
+    next_index = 0
+
+    own_client = client is None
+    if own_client:
+        limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+        client = httpx.AsyncClient(timeout=timeout, limits=limits)
+
+    start = time.perf_counter()
+
+    def _claim():
+        # Un solo hilo (event loop): no se necesita lock para el contador
+        nonlocal next_index
+        index = next_index
+        if n_requests is not None and index >= n_requests:
+            return None
+        if duration_sec is not None and time.perf_counter() - start >= duration_sec:
+            return None
+        next_index += 1
+        return index
+
+    async def _worker():
+        nonlocal errors
+        while (index := _claim()) is not None:
+            sent_at = time.perf_counter()
+            if rate:
+                scheduled = start + index / rate
+                if scheduled > sent_at:
+                    await asyncio.sleep(scheduled - sent_at)
+                sent_at = scheduled
+
+            status_code = None
+            try:
+                response = await client.post(url, json=generator())
+                status_code = response.status_code
+            except httpx.HTTPError as e:
+                logger.warning(f"Error de conexión: {e}")
+            latency = time.perf_counter() - sent_at
 
-def monitor_loop(interval_sec=60):
-    """Ejecuta monitoreo continuo."""
+            ok = status_code == 200
+            if ok:
+                latencies.append(latency)
+            else:
+                errors += 1
+            writer.write(
+                {
+                    "timestamp": datetime.now().isoformat(timespec="milliseconds"),
+                    "status": "OK" if ok else "FAIL",
+                    "status_code": status_code,
+                    "latency": round(latency, 6) if ok else None,
+                }
+            )
+
+    try:
+        await asyncio.gather(*(_worker() for _ in range(concurrency)))
+    finally:
+        writer.flush()
+        if own_client:
+            await client.aclose()
+
+    summary = summarize(latencies, errors, time.perf_counter() - start)
+    logger.info(f"Prueba de carga: {summary}")
+    return summary
+
+
+def monitor_loop(interval_sec=60, n_requests=20, concurrency=2, url=API_URL):
+    """Ejecuta monitoreo continuo: una ráfaga corta de solicitudes cada `interval_sec`."""
     logger.info("=== Iniciando monitorización de API ===")
-    os.makedirs("reports", exist_ok=True)
-    history = []
+    generator = PayloadGenerator()
 
     while True:
-        record = simulate_request()
-        history.append(record)
-        pd.DataFrame(history).to_csv(REPORT_PATH, index=False)
+        asyncio.run(
+            run_load_test(url, n_requests=n_requests, concurrency=concurrency, generator=generator)
+        )
         time.sleep(interval_sec)
 
+
 if __name__ == "__main__":
-    monitor_loop(interval_sec=300)  # cada 5 minutos
+    parser = argparse.ArgumentParser(
+        description="Prueba de carga y monitoreo de la API de predicción."
+    )
+    parser.add_argument("--url", default=API_URL)
+    parser.add_argument(
+        "--requests", type=int, default=1000, help="Total de solicitudes (0 = sin límite)."
+    )
+    parser.add_argument("--duration", type=float, default=None, help="Duración máxima en segundos.")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--rate", type=float, default=None, help="Solicitudes por segundo.")
+    parser.add_argument("--payloads", default=None, help="Dataset del que se toman los clientes.")
+    parser.add_argument(
+        "--repeat-ratio", type=float, default=0.0, help="Fracción de clientes repetidos."
+    )
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--report", default=REPORT_PATH)
+    parser.add_argument(
+        "--interval", type=float, default=None, help="Modo monitoreo: segundos entre ráfagas."
+    )
+    args = parser.parse_args()
+
+    if args.interval:
+        monitor_loop(interval_sec=args.interval, url=args.url)
+    else:
+        payloads = PayloadGenerator(
+            seed=args.seed, source=args.payloads, repeat_ratio=args.repeat_ratio
+        )
+        asyncio.run(
+            run_load_test(
+                args.url,
+                n_requests=args.requests or None,
+                duration_sec=args.duration,
+                concurrency=args.concurrency,
+                rate=args.rate,
+                generator=payloads,
+                report_path=args.report,
+            )
+        )
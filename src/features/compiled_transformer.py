@@ -0,0 +1,221 @@
+import numpy as np
+import pandas as pd
+
+# sklearn y scipy se importan solo al compilar o al generar salida dispersa:
+# cargar el transformador para servir requiere únicamente NumPy y pandas
+
+
+def _unwrap(transformer):
+    """Devuelve el estimador final si el transformador es un Pipeline de un solo paso."""
+    from sklearn.pipeline import Pipeline
+
+    if isinstance(transformer, Pipeline):
+        if len(transformer.steps) != 1:
+            raise NotImplementedError("Solo se soportan Pipelines de un único paso.")
+        return transformer.steps[0][1]
+    return transformer
+
+
+class CompiledFeatureTransformer:
+    """
+    Versión compilada (solo NumPy) de un ColumnTransformer ajustado con
+    StandardScaler + OneHotEncoder.
+
+    Guarda las medias/escalas del scaler y las tablas de categorías del encoder
+    como diccionarios `categoría -> índice de columna`, y escribe el resultado en
+    una matriz de salida reservada una sola vez por llamada. Produce exactamente
+    la misma salida que `ColumnTransformer.transform` sin su validación por llamada.
+
+    Si el ColumnTransformer original produce salida dispersa, la salida es una
+    matriz CSR construida directamente a partir de los índices one-hot.
+    """
+
+    # Los transformadores exportados antes de soportar salida dispersa no tienen el atributo
+    sparse = False
+
+    def __init__(
+        self, numeric_blocks, categorical_blocks, n_features_out, dtype=np.float64, sparse=False
+    ):
+        self.numeric_blocks = numeric_blocks
+        self.categorical_blocks = categorical_blocks
+        self.n_features_out = n_features_out
+        self.dtype = dtype
+        self.sparse = sparse
+
+    @classmethod
+    def from_column_transformer(cls, preprocessor):
+        """
+        Compila un ColumnTransformer ya ajustado.
+        """
+        from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+        numeric_blocks = []
+        categorical_blocks = []
+
+        for name, transformer, columns in preprocessor.transformers_:
+            if name == "remainder":
+                if transformer != "drop":
+                    raise NotImplementedError("Solo se soporta remainder='drop'.")
+                continue
+
+            estimator = _unwrap(transformer)
+            out_slice = preprocessor.output_indices_[name]
+            columns = list(columns)
+
+            if isinstance(estimator, StandardScaler):
+                numeric_blocks.append(
+                    {
+                        "columns": columns,
+                        "start": out_slice.start,
+                        "stop": out_slice.stop,
+                        "mean": estimator.mean_.copy() if estimator.with_mean else None,
+                        "scale": estimator.scale_.copy() if estimator.with_std else None,
+                    }
+                )
+            elif isinstance(estimator, OneHotEncoder):
+                if estimator.drop is not None or estimator._infrequent_enabled:
+                    raise NotImplementedError("No se soportan 'drop' ni categorías infrecuentes.")
+                offset = out_slice.start
+                for col, categories in zip(columns, estimator.categories_):
+                    table = {}
+                    nan_index = None
+                    for i, category in enumerate(categories):
+                        if pd.isna(category):
+                            nan_index = offset + i
+                        else:
+                            table[category] = offset + i
+                    categorical_blocks.append(
+                        {
+                            "column": col,
+                            "table": table,
+                            "categories": list(table.keys()),
+                            "positions": np.fromiter(
+                                table.values(), dtype=np.intp, count=len(table)
+                            ),
+                            "nan_index": nan_index,
+                            "handle_unknown": estimator.handle_unknown,
+                        }
+                    )
+                    offset += len(categories)
+            else:
+                raise NotImplementedError(
+                    f"Transformador no soportado en '{name}': {type(estimator).__name__}"
+                )
+
+        n_features_out = max(out_slice.stop for out_slice in preprocessor.output_indices_.values())
+        return cls(
+            numeric_blocks,
+            categorical_blocks,
+            n_features_out,
+            sparse=bool(getattr(preprocessor, "sparse_output_", False)),
+        )
+
+    def get_feature_columns(self):
+        """Columnas de entrada requeridas, en el orden del ColumnTransformer original."""
+        columns = [col for block in self.numeric_blocks for col in block["columns"]]
+        return columns + [block["column"] for block in self.categorical_blocks]
+
+    def _lookup(self, block, value):
+        index = block["table"].get(value)
+        if index is None and block["nan_index"] is not None and pd.isna(value):
+            index = block["nan_index"]
+        if index is None and block["handle_unknown"] == "error":
+            raise ValueError(f"Categoría desconocida {value!r} en la columna '{block['column']}'.")
+        return index
+
+    def transform(self, X):
+        """
+        Transforma un DataFrame, un registro (dict) o una lista de registros.
+
+        Returns:
+            np.ndarray | scipy.sparse.csr_matrix: Matriz de forma (n_filas, n_features_out).
+        """
+        if isinstance(X, dict):
+            X = [X]
+        if isinstance(X, list):
+            return self._transform_records(X)
+        return self._transform_frame(X)
+
+    @staticmethod
+    def _scale(block, values):
+        if block["mean"] is not None:
+            values -= block["mean"]
+        if block["scale"] is not None:
+            values /= block["scale"]
+        return values
+
+    def _transform_frame(self, df):
+        numeric = [
+            self._scale(block, df[block["columns"]].to_numpy(dtype=np.float64))
+            for block in self.numeric_blocks
+        ]
+
+        categorical = []
+        for block in self.categorical_blocks:
+            values = df[block["column"]]
+            codes = pd.Categorical(values, categories=block["categories"]).codes
+            indices = np.full(len(df), -1, dtype=np.intp)
+            matched = codes >= 0
+            indices[matched] = block["positions"][codes[matched]]
+
+            if not matched.all():
+                missing = ~matched & values.isna().to_numpy()
+                if block["nan_index"] is not None:
+                    indices[missing] = block["nan_index"]
+                unknown = ~matched & ~missing
+                if unknown.any() and block["handle_unknown"] == "error":
+                    self._lookup(block, values.to_numpy()[np.argmax(unknown)])
+            categorical.append(indices)
+
+        return self._assemble(len(df), numeric, categorical)
+
+    def _transform_records(self, records):
+        numeric = []
+        for block in self.numeric_blocks:
+            values = [[record[col] for col in block["columns"]] for record in records]
+            numeric.append(self._scale(block, np.array(values, dtype=np.float64)))
+
+        categorical = []
+        for block in self.categorical_blocks:
+            indices = np.full(len(records), -1, dtype=np.intp)
+            for row, record in enumerate(records):
+                index = self._lookup(block, record[block["column"]])
+                if index is not None:
+                    indices[row] = index
+            categorical.append(indices)
+
+        return self._assemble(len(records), numeric, categorical)
+
+    def _assemble(self, n_rows, numeric, categorical):
+        """
+        Escribe los bloques numéricos y los índices one-hot en la matriz de salida.
+        """
+        if not self.sparse:
+            out = np.zeros((n_rows, self.n_features_out), dtype=self.dtype)
+            for block, values in zip(self.numeric_blocks, numeric):
+                out[:, block["start"]:block["stop"]] = values
+            for indices in categorical:
+                rows = np.flatnonzero(indices >= 0)
+                out[rows, indices[rows]] = 1
+            return out
+
+        from scipy import sparse as sp
+
+        # Salida CSR: solo se almacenan los valores distintos de cero (igual que sklearn)
+        all_rows, all_cols, all_data = [], [], []
+        for block, values in zip(self.numeric_blocks, numeric):
+            rows, cols = np.nonzero(values)
+            all_rows.append(rows)
+            all_cols.append(cols + block["start"])
+            all_data.append(values[rows, cols])
+        for indices in categorical:
+            rows = np.flatnonzero(indices >= 0)
+            all_rows.append(rows)
+            all_cols.append(indices[rows])
+            all_data.append(np.ones(len(rows), dtype=self.dtype))
+
+        return sp.csr_matrix(
+            (np.concatenate(all_data), (np.concatenate(all_rows), np.concatenate(all_cols))),
+            shape=(n_rows, self.n_features_out),
+            dtype=self.dtype,
+        )
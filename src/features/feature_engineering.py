@@ -1,11 +1,22 @@
 import os
+import numpy as np
 import pandas as pd
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler, OneHotEncoder
 from sklearn.compose import ColumnTransformer
 from sklearn.pipeline import Pipeline
 import joblib
+from src.features.compiled_transformer import CompiledFeatureTransformer
 from src.utils.logger import get_logger
+from src.utils.storage import (
+    SPARSE_FEATURES,
+    features_path,
+    read_table,
+    with_format,
+    write_sparse_features,
+    write_table,
+)
+from src.utils.validators import CATEGORICAL_FEATURES, NUMERIC_FEATURES
 
 logger = get_logger(__name__)
 
@@ -13,40 +24,125 @@ PROCESSED_PATH = "data/processed/restaurantes_USA_clean.csv"
 TRAIN_PATH = "data/processed/train_features.csv"
 TEST_PATH = "data/processed/test_features.csv"
 PIPELINE_PATH = "models/feature_pipeline.pkl"
+COMPILED_PIPELINE_PATH = "models/feature_pipeline_compiled.pkl"
 
 
-def build_feature_pipeline():
+def make_preprocessor(
+    numeric_features=NUMERIC_FEATURES, categorical_features=CATEGORICAL_FEATURES, sparse=False
+):
+    """
+    Crea el ColumnTransformer (sin ajustar): escala numéricas y codifica categóricas.
+
+    Args:
+        sparse (bool): Si True, el one-hot se mantiene disperso y la salida es CSR.
+    """
+    numeric_transformer = Pipeline(steps=[("scaler", StandardScaler())])
+    categorical_transformer = Pipeline(
+        steps=[("encoder", OneHotEncoder(handle_unknown="ignore", sparse_output=sparse))]
+    )
+
+    return ColumnTransformer(
+        transformers=[
+            ("num", numeric_transformer, list(numeric_features)),
+            ("cat", categorical_transformer, list(categorical_features)),
+        ],
+        # Con sparse=True se fuerza salida CSR sin importar la densidad resultante
+        sparse_threshold=1.0 if sparse else 0.3,
+    )
+
+
+def export_compiled_pipeline(
+    preprocessor=None, pipeline_path=PIPELINE_PATH, output_path=COMPILED_PIPELINE_PATH
+):
+    """
+    Compila el ColumnTransformer ajustado a un transformador NumPy para inferencia.
+
+    Args:
+        preprocessor: ColumnTransformer ajustado. Si es None se carga desde `pipeline_path`.
+        pipeline_path (str): Ruta del pipeline sklearn serializado.
+        output_path (str): Ruta donde se guarda el transformador compilado.
+    """
+    if preprocessor is None:
+        preprocessor = joblib.load(pipeline_path)
+
+    compiled = CompiledFeatureTransformer.from_column_transformer(preprocessor)
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    joblib.dump(compiled, output_path)
+    logger.info(f"Pipeline de features compilado guardado en {output_path}")
+    return compiled
+
+
+def load_serving_pipeline(pipeline_path=PIPELINE_PATH, compiled_path=COMPILED_PIPELINE_PATH):
+    """
+    Carga el transformador compilado si existe; si no, el ColumnTransformer de sklearn.
+    """
+    if os.path.exists(compiled_path):
+        return joblib.load(compiled_path)
+    logger.warning(f"No se encontró {compiled_path}, usando el pipeline sklearn.")
+    return joblib.load(pipeline_path)
+
+
+def _save_preprocessor(preprocessor):
+    os.makedirs(os.path.dirname(PIPELINE_PATH), exist_ok=True)
+    joblib.dump(preprocessor, PIPELINE_PATH)
+    logger.info(f"Pipeline de features guardado en {PIPELINE_PATH}")
+
+    # Exportar versión compilada para inferencia
+    export_compiled_pipeline(preprocessor)
+
+
+def load_feature_categories(pipeline_path=PIPELINE_PATH):
+    """
+    Categorías del OneHotEncoder ajustado, {variable: [categorías]} en el orden de
+    las columnas one-hot. None si todavía no hay pipeline de features guardado.
+    """
+    if not os.path.exists(pipeline_path):
+        return None
+    preprocessor = joblib.load(pipeline_path)
+    encoder = preprocessor.named_transformers_["cat"]["encoder"]
+    columns = next(cols for name, _, cols in preprocessor.transformers_ if name == "cat")
+    return {
+        feature: [str(value) for value in values]
+        for feature, values in zip(columns, encoder.categories_)
+    }
+
+
+def build_feature_pipeline(data_format=None, sparse=SPARSE_FEATURES):
     """
     Construye el pipeline de ingeniería de características.
     Escala las variables numéricas y codifica las categóricas.
+
+    Args:
+        data_format (str): Formato de las tablas de entrada/salida
+            ('csv', 'parquet' o 'feather'). Por defecto DATA_FORMAT.
+        sparse (bool): Si True, las features se mantienen como matrices CSR y se guardan
+            en `.npz` (+ `.columns.json`). Por defecto SPARSE_FEATURES.
+    Returns:
+        tuple: (train, test). DataFrames densos con la columna `target`, o si
+        `sparse=True`, dicts `{"X": csr_matrix, "y": np.ndarray, "columns": list}`.
     """
     logger.info("=== Iniciando feature engineering ===")
 
     # Cargar datos limpios
-    if not os.path.exists(PROCESSED_PATH):
-        raise FileNotFoundError(f"No se encontró el archivo procesado en {PROCESSED_PATH}")
+    processed_path = with_format(PROCESSED_PATH, data_format)
+    train_path = features_path(TRAIN_PATH, sparse, data_format)
+    test_path = features_path(TEST_PATH, sparse, data_format)
+    if not os.path.exists(processed_path):
+        raise FileNotFoundError(f"No se encontró el archivo procesado en {processed_path}")
 
-    df = pd.read_csv(PROCESSED_PATH)
+    df = read_table(processed_path)
     logger.info(f"Datos cargados correctamente: {df.shape[0]} filas, {df.shape[1]} columnas")
 
     # --- 1️⃣ Separar target y features ---
     if "membresia_premium" not in df.columns:
         raise ValueError("La columna 'membresia_premium' no existe en el dataset limpio.")
 
-    y = df["membresia_premium"].apply(lambda x: 1 if str(x).lower() in ["sí"] else 0)
+    y = df["membresia_premium"].astype(str).str.lower().eq("sí").astype(int)
     X = df.drop(columns=["membresia_premium"])
 
     # --- 2️⃣ Definir columnas ---
-    numeric_features = ["edad", "frecuencia_visita", "promedio_gasto_comida", "ingresos_mensuales"]
-    categorical_features = [
-        "genero",
-        "ciudad_residencia",
-        "estrato_socioeconomico",
-        "ocio",
-        "consume_licor",
-        "preferencias_alimenticias",
-        "tipo_de_pago_mas_usado",
-    ]
+    numeric_features = NUMERIC_FEATURES
+    categorical_features = CATEGORICAL_FEATURES
 
     # --- 3️⃣ Dividir datos antes de transformar ---
     X_train, X_test, y_train, y_test = train_test_split(
@@ -55,17 +151,7 @@ def build_feature_pipeline():
     logger.info(f"División de datos: Train {X_train.shape}, Test {X_test.shape}")
 
     # --- 4️⃣ Crear transformadores ---
-    numeric_transformer = Pipeline(steps=[("scaler", StandardScaler())])
-    categorical_transformer = Pipeline(
-        steps=[("encoder", OneHotEncoder(handle_unknown="ignore", sparse_output=False))]
-    )
-
-    preprocessor = ColumnTransformer(
-        transformers=[
-            ("num", numeric_transformer, numeric_features),
-            ("cat", categorical_transformer, categorical_features),
-        ]
-    )
+    preprocessor = make_preprocessor(numeric_features, categorical_features, sparse=sparse)
 
     # --- 5️⃣ Ajustar con training set (para evitar leakage) ---
     logger.info("Entrenando transformador con training set...")
@@ -76,6 +162,21 @@ def build_feature_pipeline():
     encoded_cat_cols = preprocessor.named_transformers_["cat"]["encoder"].get_feature_names_out(categorical_features)
     final_cols = numeric_features + list(encoded_cat_cols)
 
+    if sparse:
+        # --- 6️⃣b Guardar matrices dispersas sin densificar ---
+        write_sparse_features(X_train_transformed, y_train.values, final_cols, train_path)
+        write_sparse_features(X_test_transformed, y_test.values, final_cols, test_path)
+        logger.info(
+            f"Features dispersas guardadas en {train_path} y {test_path} "
+            f"(densidad: {X_train_transformed.nnz / np.prod(X_train_transformed.shape):.1%})"
+        )
+        _save_preprocessor(preprocessor)
+        logger.info("=== Feature engineering completado exitosamente ===")
+        return (
+            {"X": X_train_transformed, "y": y_train.values, "columns": final_cols},
+            {"X": X_test_transformed, "y": y_test.values, "columns": final_cols},
+        )
+
     X_train_final = pd.DataFrame(X_train_transformed, columns=final_cols)
     X_test_final = pd.DataFrame(X_test_transformed, columns=final_cols)
 
@@ -83,17 +184,13 @@ def build_feature_pipeline():
     X_test_final["target"] = y_test.values
 
     # --- 7️⃣ Guardar datasets procesados ---
-    os.makedirs(os.path.dirname(TRAIN_PATH), exist_ok=True)
-    os.makedirs(os.path.dirname(TEST_PATH), exist_ok=True)
-    X_train_final.to_csv(TRAIN_PATH, index=False)
-    X_test_final.to_csv(TEST_PATH, index=False)
-    logger.info(f"Datos de entrenamiento guardados en {TRAIN_PATH}")
-    logger.info(f"Datos de prueba guardados en {TEST_PATH}")
-
-    # --- 8️⃣ Guardar el pipeline ---
-    os.makedirs(os.path.dirname(PIPELINE_PATH), exist_ok=True)
-    joblib.dump(preprocessor, PIPELINE_PATH)
-    logger.info(f"Pipeline de features guardado en {PIPELINE_PATH}")
+    write_table(X_train_final, train_path)
+    write_table(X_test_final, test_path)
+    logger.info(f"Datos de entrenamiento guardados en {train_path}")
+    logger.info(f"Datos de prueba guardados en {test_path}")
+
+    # --- 8️⃣ Guardar el pipeline (y su versión compilada) ---
+    _save_preprocessor(preprocessor)
 
     logger.info("=== Feature engineering completado exitosamente ===")
 
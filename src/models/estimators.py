@@ -0,0 +1,224 @@
+import warnings
+import numpy as np
+import pandas as pd
+from sklearn.base import BaseEstimator, ClassifierMixin, TransformerMixin
+from src.utils.logger import get_logger
+from src.utils.validators import CATEGORICAL_FEATURES
+
+logger = get_logger(__name__)
+
+
+class OneHotToCategorical(TransformerMixin, BaseEstimator):
+    """
+    Convierte cada bloque one-hot de la matriz de features en una sola columna
+    pandas 'category' (faltante si la categoría no se vio al entrenar).
+
+    Permite que HistGradientBoosting (`categorical_features="from_dtype"`) use sus
+    splits categóricos nativos sobre la misma matriz que producen el pipeline de
+    features y serving: las categorías y su orden son los del OneHotEncoder, que
+    a su vez vienen de las columnas 'category' de preprocess_data. La salida es
+    un DataFrame compacto: una columna por variable categórica y luego las numéricas.
+
+    Args:
+        categorical_features (list): Variables categóricas, codificadas en la matriz
+            como `<variable>_<categoría>`.
+        feature_columns (list): Nombres de columna de la matriz; solo hace falta si
+            `fit` recibe una matriz sin nombres (p. ej. CSR, ver `bind_feature_columns`).
+            Sin nombres ni `categories`, todas las columnas se tratan como numéricas.
+        categories (dict): {variable: categorías} del OneHotEncoder ajustado (ver
+            `bind_feature_categories`). Ubica cada bloque por nombre exacto de columna
+            (o por posición, al final de la matriz, si no hay nombres); sin él se
+            deduce por prefijo, que es ambiguo si una variable es prefijo de otra.
+        max_categories (int): Bloques con más categorías se dejan one-hot (numéricos):
+            HistGradientBoosting admite a lo sumo `max_bins` (255) categorías.
+    """
+
+    def __init__(
+        self,
+        categorical_features=CATEGORICAL_FEATURES,
+        feature_columns=None,
+        categories=None,
+        max_categories=255,
+    ):
+        self.categorical_features = categorical_features
+        self.feature_columns = feature_columns
+        self.categories = categories
+        self.max_categories = max_categories
+
+    def fit(self, X, y=None):
+        columns = list(X.columns) if hasattr(X, "columns") else self.feature_columns
+        named = columns is not None
+        if not named:
+            columns = [f"x{index}" for index in range(X.shape[1])]
+        if len(columns) != X.shape[1]:
+            raise ValueError(
+                f"Se esperaban {X.shape[1]} nombres de columna y se recibieron {len(columns)}."
+            )
+
+        if self.categories is not None:
+            blocks = self._blocks_from_categories(columns, named)
+        else:
+            blocks = self._blocks_from_prefixes(columns)
+
+        self.category_blocks_ = []
+        self.one_hot_features_ = []
+        categorical_columns = set()
+        for feature, indices in blocks:
+            if not indices:
+                continue
+            if len(indices) > self.max_categories:
+                # Demasiadas categorías para los splits nativos: el bloque queda one-hot
+                self.one_hot_features_.append(feature)
+                continue
+            labels = [columns[i][len(feature) + 1:] for i in indices]
+            self.category_blocks_.append((feature, np.asarray(indices, dtype=np.intp), labels))
+            categorical_columns.update(indices)
+        if self.one_hot_features_:
+            logger.warning(
+                f"Más de {self.max_categories} categorías en {self.one_hot_features_}: "
+                "se mantienen one-hot en lugar de splits categóricos."
+            )
+
+        numeric = [index for index in range(len(columns)) if index not in categorical_columns]
+        self.numeric_columns_ = np.asarray(numeric, dtype=np.intp)
+        self.numeric_names_ = [columns[i] for i in numeric]
+        self.n_features_in_ = X.shape[1]
+        return self
+
+    def _blocks_from_categories(self, columns, named):
+        sizes = [len(self.categories.get(feature, [])) for feature in self.categorical_features]
+        if not named:
+            # Sin nombres: los bloques van al final, en el orden del ColumnTransformer
+            start = len(columns) - sum(sizes)
+            for feature, size in zip(self.categorical_features, sizes):
+                columns[start:start + size] = [
+                    f"{feature}_{label}" for label in self.categories.get(feature, [])
+                ]
+                start += size
+
+        position = {column: index for index, column in enumerate(columns)}
+        blocks = []
+        for feature in self.categorical_features:
+            names = [f"{feature}_{label}" for label in self.categories.get(feature, [])]
+            missing = [name for name in names if name not in position]
+            if missing:
+                raise ValueError(
+                    f"Columnas one-hot de '{feature}' ausentes en la matriz: {missing}"
+                )
+            blocks.append((feature, [position[name] for name in names]))
+        return blocks
+
+    def _blocks_from_prefixes(self, columns):
+        # Cada columna va a la variable con el prefijo más largo (evita ambigüedades entre nombres)
+        prefixes = sorted(self.categorical_features, key=len, reverse=True)
+        groups = {feature: [] for feature in self.categorical_features}
+        for index, column in enumerate(columns):
+            owner = next(
+                (feature for feature in prefixes if column.startswith(f"{feature}_")), None
+            )
+            if owner:
+                groups[owner].append(index)
+        return list(groups.items())
+
+    def transform(self, X):
+        if hasattr(X, "iloc"):
+            X = X.to_numpy(dtype=float)
+        out = {}
+        for feature, indices, categories in self.category_blocks_:
+            block = X[:, indices]
+            block = block.toarray() if hasattr(block, "toarray") else block
+            codes = block.argmax(axis=1)
+            # Fila sin ningún 1: categoría desconocida (handle_unknown="ignore")
+            codes[block.max(axis=1) <= 0] = -1
+            out[feature] = pd.Categorical.from_codes(codes, categories=categories)
+        numeric = X[:, self.numeric_columns_]
+        numeric = numeric.toarray() if hasattr(numeric, "toarray") else np.asarray(numeric)
+        for position, name in enumerate(self.numeric_names_):
+            out[name] = numeric[:, position]
+        return pd.DataFrame(out)
+
+
+class WarmStartForestClassifier(ClassifierMixin, BaseEstimator):
+    """
+    Random forest que crece de a `step` árboles (warm start) y se detiene cuando el
+    log loss out-of-bag deja de mejorar más de `tol` durante `n_iter_no_change`
+    pasos, o al llegar a `max_estimators`. Cada paso solo entrena los árboles nuevos.
+    Al terminar se descartan los árboles posteriores al mejor paso.
+    """
+
+    def __init__(
+        self,
+        max_estimators=500,
+        step=25,
+        n_iter_no_change=2,
+        tol=1e-3,
+        max_depth=None,
+        min_samples_leaf=1,
+        max_features="sqrt",
+        n_jobs=None,
+        random_state=None,
+    ):
+        self.max_estimators = max_estimators
+        self.step = step
+        self.n_iter_no_change = n_iter_no_change
+        self.tol = tol
+        self.max_depth = max_depth
+        self.min_samples_leaf = min_samples_leaf
+        self.max_features = max_features
+        self.n_jobs = n_jobs
+        self.random_state = random_state
+
+    def fit(self, X, y):
+        from sklearn.ensemble import RandomForestClassifier
+
+        forest = RandomForestClassifier(
+            n_estimators=0,
+            warm_start=True,
+            oob_score=True,
+            max_depth=self.max_depth,
+            min_samples_leaf=self.min_samples_leaf,
+            max_features=self.max_features,
+            n_jobs=self.n_jobs,
+            random_state=self.random_state,
+        )
+        y = np.asarray(y)
+        best, best_n, stalled = np.inf, 0, 0
+        self.oob_loss_curve_ = []
+        while forest.n_estimators < self.max_estimators and stalled < self.n_iter_no_change:
+            forest.set_params(
+                n_estimators=min(forest.n_estimators + self.step, self.max_estimators)
+            )
+            with warnings.catch_warnings():
+                # Con pocos árboles algunas filas aún no tienen predicción out-of-bag
+                warnings.simplefilter("ignore", UserWarning)
+                forest.fit(X, y)
+            loss = self._oob_log_loss(forest, y)
+            self.oob_loss_curve_.append(loss)
+            if loss < best - self.tol:
+                best, best_n, stalled = loss, forest.n_estimators, 0
+            else:
+                stalled += 1
+
+        # Los árboles de un warm start se agregan al final: basta con recortar la lista
+        # (los atributos oob_* del bosque quedan como los del último paso)
+        best_n = best_n or forest.n_estimators
+        forest.estimators_ = forest.estimators_[:best_n]
+        forest.n_estimators = best_n
+        self.forest_ = forest
+        self.classes_ = forest.classes_
+        self.n_estimators_ = forest.n_estimators
+        self.n_features_in_ = forest.n_features_in_
+        return self
+
+    @staticmethod
+    def _oob_log_loss(forest, y):
+        proba = forest.oob_decision_function_
+        seen = ~np.isnan(proba).any(axis=1)
+        true_proba = proba[seen, np.searchsorted(forest.classes_, y[seen])]
+        return float(-np.mean(np.log(np.clip(true_proba, 1e-15, None))))
+
+    def predict_proba(self, X):
+        return self.forest_.predict_proba(X)
+
+    def predict(self, X):
+        return self.forest_.predict(X)
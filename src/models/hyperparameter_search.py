@@ -0,0 +1,528 @@
+import argparse
+import hashlib
+import json
+import math
+import os
+import time
+import numpy as np
+from joblib import Parallel, delayed
+from src.features.feature_engineering import load_feature_categories
+from src.models.model_utils import (
+    DECISION_THRESHOLD,
+    N_JOBS,
+    bind_feature_categories,
+    bind_feature_columns,
+    calculate_metrics,
+    get_model_dict,
+    score_model,
+)
+from src.utils.logger import get_logger
+from src.utils.storage import SPARSE_FEATURES, features_path, read_feature_columns, read_features
+
+logger = get_logger(__name__)
+
+TRAIN_PATH = "data/processed/train_features.csv"
+MLFLOW_TRACKING_URI = "file:./mlruns"
+# Experimento aparte: los trials no deben competir en el registro del mejor modelo
+SEARCH_EXPERIMENT = "membresias_premium_search"
+
+# Bitácora de trials (para reanudar) y mejores parámetros por modelo
+SEARCH_DIR = "reports/search"
+JOURNAL_PATH = os.path.join(SEARCH_DIR, "journal.jsonl")
+BEST_PARAMS_PATH = os.path.join(SEARCH_DIR, "best_params.json")
+
+# Estrategia: "halving" (un solo bracket) o "hyperband" (varios brackets)
+SEARCH_STRATEGY = os.getenv("SEARCH_STRATEGY", "hyperband")
+SEARCH_ETA = int(os.getenv("SEARCH_ETA", "3"))
+# Candidatos del bracket más agresivo (en halving, del único bracket)
+SEARCH_N_CANDIDATES = int(os.getenv("SEARCH_N_CANDIDATES", "27"))
+# Presupuesto mínimo como fracción del máximo (n_estimators o filas)
+SEARCH_MIN_BUDGET = float(os.getenv("SEARCH_MIN_BUDGET", str(1 / 27)))
+SEARCH_MAX_ESTIMATORS = int(os.getenv("SEARCH_MAX_ESTIMATORS", "400"))
+# Filas máximas de train usadas en la búsqueda (0 = todas)
+SEARCH_MAX_ROWS = int(os.getenv("SEARCH_MAX_ROWS", "200000"))
+SEARCH_METRIC = os.getenv("SEARCH_METRIC", "f1_score")
+SEARCH_VALIDATION_SIZE = 0.2
+SEARCH_SEED = 42
+
+# Espacio de búsqueda por modelo de `get_model_dict`. El recurso es lo que crece
+# entre rondas: el número de árboles o la cantidad de filas de entrenamiento.
+SEARCH_SPACES = {
+    "logistic_regression": {
+        "resource": "n_samples",
+        "params": {
+            "C": [0.01, 0.03, 0.1, 0.3, 1.0, 3.0, 10.0],
+            "class_weight": [None, "balanced"],
+        },
+    },
+    "random_forest": {
+        "resource": "n_estimators",
+        "params": {
+            "max_depth": [None, 8, 12, 16, 24],
+            "min_samples_leaf": [1, 2, 5, 10],
+            "max_features": ["sqrt", 0.3, 0.5],
+        },
+    },
+    "gradient_boosting": {
+        "resource": "n_estimators",
+        "params": {
+            "learning_rate": [0.03, 0.05, 0.1, 0.2],
+            "max_depth": [2, 3, 4, 5],
+            "subsample": [0.7, 0.85, 1.0],
+        },
+    },
+    # Con early stopping propio: el número de iteraciones no es el recurso
+    "hist_gradient_boosting": {
+        "resource": "n_samples",
+        "params": {
+            "model__learning_rate": [0.03, 0.05, 0.1, 0.2],
+            "model__max_leaf_nodes": [15, 31, 63],
+            "model__min_samples_leaf": [10, 20, 50],
+            "model__l2_regularization": [0.0, 0.1, 1.0],
+        },
+    },
+}
+
+
+def _rows(X, idx):
+    return X.iloc[idx] if hasattr(X, "iloc") else X[idx]
+
+
+def _stratified_order(y, seed):
+    """
+    Orden de filas en el que todo prefijo conserva la proporción de clases.
+
+    Cada clase se baraja por separado y sus filas se intercalan según su posición
+    relativa dentro de la clase (rango / tamaño de la clase): un prefijo de n filas
+    tiene, por clase, la parte proporcional redondeada como mucho en una fila, y
+    las primeras filas cubren todas las clases.
+    """
+    rng = np.random.default_rng(seed)
+    y = np.asarray(y)
+    position = np.empty(len(y))
+    for label in np.unique(y):
+        members = rng.permutation(np.flatnonzero(y == label))
+        position[members] = np.arange(len(members)) / len(members)
+    # El desempate aleatorio evita que una clase quede siempre primera
+    return np.lexsort((rng.random(len(y)), position))
+
+
+def _data_fingerprint(X, y):
+    """Huella barata del dataset: invalida la bitácora si cambian los datos."""
+    total = X.sum() if hasattr(X, "nnz") else X.to_numpy(dtype=float).sum()
+    return f"{X.shape[0]}x{X.shape[1]}:{int(np.asarray(y).sum())}:{float(total):.6g}"
+
+
+def _trial_key(name, params, resource, fingerprint, metric):
+    payload = json.dumps([name, params, resource, fingerprint, metric], sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def sample_candidates(space, n_candidates, seed):
+    """Muestrea `n_candidates` combinaciones distintas (o todas si el espacio es menor)."""
+    names = sorted(space)
+    grid_size = math.prod(len(space[name]) for name in names)
+    rng = np.random.default_rng(seed)
+    if grid_size <= n_candidates:
+        flat = np.arange(grid_size)
+    else:
+        flat = rng.choice(grid_size, size=n_candidates, replace=False)
+
+    candidates = []
+    for index in flat:
+        params = {}
+        for name in reversed(names):
+            index, pos = divmod(int(index), len(space[name]))
+            params[name] = space[name][pos]
+        candidates.append({name: params[name] for name in names})
+    return candidates
+
+
+def hyperband_brackets(n_candidates, min_budget, eta, strategy=SEARCH_STRATEGY):
+    """
+    Rondas de cada bracket como listas de (candidatos, fracción de presupuesto).
+
+    Successive halving usa un solo bracket: `n_candidates` con el presupuesto
+    mínimo y, en cada ronda, sobrevive 1/eta con eta veces más presupuesto, hasta
+    llegar al máximo. Hyperband agrega brackets menos agresivos (menos candidatos
+    que arrancan con más presupuesto) que cubren el caso en que el presupuesto
+    bajo no anticipa bien el resultado final.
+    """
+    s_max = max(0, int(math.floor(math.log(1 / min_budget, eta) + 1e-9)))
+    brackets = []
+    for s in range(s_max, -1 if strategy == "hyperband" else s_max - 1, -1):
+        if s == s_max:
+            n = n_candidates
+        else:
+            n = int(math.ceil(n_candidates / eta**s_max * (s_max + 1) / (s + 1) * eta**s))
+        rungs = []
+        for i in range(s + 1):
+            rungs.append((max(1, int(n * eta**-i)), min(1.0, eta ** (i - s))))
+        brackets.append(rungs)
+    return brackets
+
+
+def _resource_value(kind, budget, n_rows):
+    if kind == "n_estimators":
+        return max(1, int(round(budget * SEARCH_MAX_ESTIMATORS)))
+    return max(2, int(round(budget * n_rows)))
+
+
+def _run_trial(key, estimator, params, kind, resource, X_train, y_train, X_val, y_val, metric):
+    from sklearn.base import clone
+
+    model = clone(estimator).set_params(**params)
+    if kind == "n_estimators":
+        model.set_params(n_estimators=resource)
+    else:
+        # Las filas vienen en orden estratificado: cada ronda usa un prefijo más largo
+        X_train, y_train = _rows(X_train, np.arange(resource)), y_train[:resource]
+
+    start_time = time.time()
+    model.fit(X_train, y_train)
+    fit_time = time.time() - start_time
+    y_pred, y_proba = score_model(model, X_val, DECISION_THRESHOLD)
+    score = calculate_metrics(y_val, y_pred, y_proba)[metric]
+    return key, float(score), fit_time
+
+
+class _Journal:
+    """
+    Bitácora JSONL: un registro por trial terminado, escrito apenas termina, y uno
+    por cada run padre de MLflow con la huella de los datos con que se abrió.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.trials = {}
+        self.parent_run_id = None
+        self.parent_fingerprint = None
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        # Última línea truncada por una interrupción
+                        continue
+                    self._add(record)
+
+    def _add(self, record):
+        if record.get("type") == "run":
+            self.parent_run_id = record["run_id"]
+            self.parent_fingerprint = record.get("fingerprint")
+        else:
+            self.trials[record["key"]] = record
+
+    def append(self, record):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, default=str) + "\n")
+        self._add(record)
+
+
+class _MlflowLogger:
+    """Un run padre por búsqueda y un run anidado por trial (desde el proceso principal)."""
+
+    def __init__(self, tracking_uri, journal, settings, fingerprint):
+        self.enabled = tracking_uri is not None
+        if not self.enabled:
+            return
+        import mlflow
+
+        self.mlflow = mlflow
+        mlflow.set_tracking_uri(tracking_uri)
+        mlflow.set_experiment(SEARCH_EXPERIMENT)
+        if journal.parent_fingerprint == fingerprint and self._run_exists(journal.parent_run_id):
+            # Reanudación: los trials nuevos cuelgan del mismo run padre
+            self.parent = mlflow.start_run(run_id=journal.parent_run_id)
+        else:
+            # Primera búsqueda, datos distintos o run padre borrado (p. ej. mlruns/ limpio)
+            self.parent = mlflow.start_run(run_name="hyperparameter_search")
+            mlflow.log_params(settings)
+            journal.append(
+                {"type": "run", "run_id": self.parent.info.run_id, "fingerprint": fingerprint}
+            )
+
+    def _run_exists(self, run_id):
+        if not run_id:
+            return False
+        from mlflow.exceptions import MlflowException
+
+        try:
+            run = self.mlflow.tracking.MlflowClient().get_run(run_id)
+        except MlflowException:
+            return False
+        return run.info.lifecycle_stage == "active"
+
+    def log_trial(self, record):
+        if not self.enabled:
+            return
+        with self.mlflow.start_run(
+            run_name=f"{record['model']}_b{record['bracket']}_r{record['rung']}", nested=True
+        ):
+            self.mlflow.log_params(
+                {
+                    **record["params"],
+                    "model": record["model"],
+                    record["resource_kind"]: record["resource"],
+                }
+            )
+            self.mlflow.log_metrics(
+                {"score": record["score"], "fit_time_sec": record["fit_time_sec"]}
+            )
+
+    def log_best(self, best):
+        if not self.enabled:
+            return
+        for name, result in best.items():
+            self.mlflow.log_metric(f"{name}_best_score", result["score"])
+
+    def close(self):
+        if self.enabled:
+            self.mlflow.end_run()
+
+
+def _best_per_model(records):
+    """Mejor trial por modelo entre los del mayor presupuesto evaluado."""
+    best = {}
+    for record in records:
+        current = best.get(record["model"])
+        rank = (record["budget"], record["score"])
+        if current is None or rank > (current["budget"], current["score"]):
+            best[record["model"]] = record
+    return best
+
+
+def run_search(
+    X,
+    y,
+    model_names=None,
+    strategy=SEARCH_STRATEGY,
+    n_candidates=SEARCH_N_CANDIDATES,
+    eta=SEARCH_ETA,
+    min_budget=SEARCH_MIN_BUDGET,
+    metric=SEARCH_METRIC,
+    n_jobs=N_JOBS,
+    journal_path=JOURNAL_PATH,
+    output_path=BEST_PARAMS_PATH,
+    tracking_uri=MLFLOW_TRACKING_URI,
+    resume=True,
+    seed=SEARCH_SEED,
+    columns=None,
+    categories=None,
+):
+    """
+    Búsqueda de hiperparámetros por successive halving / Hyperband sobre los
+    modelos de `get_model_dict`.
+
+    Cada ronda evalúa sus candidatos en paralelo (un trial por worker) sobre un
+    holdout estratificado de train y conserva el mejor 1/eta para la ronda
+    siguiente, con eta veces más árboles (o filas). Cada trial terminado se
+    agrega a la bitácora `journal_path`; al reanudar, los trials ya registrados
+    no se vuelven a entrenar.
+
+    Args:
+        X, y: Features y target de entrenamiento.
+        model_names (list): Modelos a buscar (por defecto, todos los de SEARCH_SPACES).
+        strategy (str): 'halving' o 'hyperband'.
+        n_candidates (int): Candidatos del bracket más agresivo.
+        eta (int): Factor de reducción entre rondas.
+        min_budget (float): Presupuesto de la primera ronda como fracción del máximo.
+        metric (str): Métrica de `calculate_metrics` a maximizar en validación.
+        n_jobs (int): Workers para los trials de cada ronda (-1 = todos los núcleos).
+        tracking_uri (str): URI de MLflow; None desactiva el logging de trials.
+        resume (bool): Si False, descarta la bitácora anterior.
+        columns (list): Nombres de columna si `X` es una matriz CSR (ver `bind_feature_columns`).
+        categories (dict): Categorías del OneHotEncoder ajustado (ver `bind_feature_categories`).
+    Returns:
+        dict: {modelo: {"params", "score", "resource_kind", "resource"}}, también
+        guardado en `output_path`.
+    """
+    from sklearn.model_selection import train_test_split
+
+    model_names = model_names or list(SEARCH_SPACES)
+    estimators = get_model_dict()
+    if columns is not None:
+        bind_feature_columns(estimators, columns)
+    if categories:
+        bind_feature_categories(estimators, categories)
+
+    logger.info(f"=== Iniciando búsqueda de hiperparámetros ({strategy}, eta={eta}) ===")
+    if SEARCH_MAX_ROWS and X.shape[0] > SEARCH_MAX_ROWS:
+        keep, _ = train_test_split(
+            np.arange(X.shape[0]), train_size=SEARCH_MAX_ROWS, stratify=y, random_state=seed
+        )
+        X, y = _rows(X, keep), np.asarray(y)[keep]
+    train_idx, val_idx = train_test_split(
+        np.arange(X.shape[0]), test_size=SEARCH_VALIDATION_SIZE, stratify=y, random_state=seed
+    )
+    # Orden fijo para que los subconjuntos por filas estén anidados y estratificados
+    y = np.asarray(y)
+    train_idx = train_idx[_stratified_order(y[train_idx], seed)]
+    X_train, y_train = _rows(X, train_idx), y[train_idx]
+    X_val, y_val = _rows(X, val_idx), y[val_idx]
+    fingerprint = _data_fingerprint(X, y)
+
+    if not resume and os.path.exists(journal_path):
+        os.remove(journal_path)
+    journal = _Journal(journal_path)
+    if journal.trials:
+        logger.info(
+            f"Reanudando búsqueda: {len(journal.trials)} trials ya registrados en {journal_path}"
+        )
+
+    settings = {
+        "strategy": strategy,
+        "eta": eta,
+        "n_candidates": n_candidates,
+        "min_budget": min_budget,
+        "metric": metric,
+    }
+    tracker = _MlflowLogger(tracking_uri, journal, settings, fingerprint)
+    brackets = hyperband_brackets(n_candidates, min_budget, eta, strategy)
+    results = []
+
+    try:
+        for name in model_names:
+            kind = SEARCH_SPACES[name]["resource"]
+            for b, rungs in enumerate(brackets):
+                candidates = sample_candidates(SEARCH_SPACES[name]["params"], rungs[0][0], seed + b)
+                for r, (n_keep, budget) in enumerate(rungs):
+                    candidates = candidates[:n_keep]
+                    resource = _resource_value(kind, budget, len(train_idx))
+                    keys = [
+                        _trial_key(name, params, resource, fingerprint, metric)
+                        for params in candidates
+                    ]
+                    pending = [
+                        (key, params)
+                        for key, params in zip(keys, candidates)
+                        if key not in journal.trials
+                    ]
+                    logger.info(
+                        f"{name} | bracket {b} ronda {r}: {len(candidates)} candidatos con "
+                        f"{kind}={resource} ({len(candidates) - len(pending)} ya evaluados)"
+                    )
+
+                    params_by_key = dict(pending)
+                    finished = Parallel(n_jobs=n_jobs, return_as="generator")(
+                        delayed(_run_trial)(
+                            key,
+                            estimators[name],
+                            params,
+                            kind,
+                            resource,
+                            X_train,
+                            y_train,
+                            X_val,
+                            y_val,
+                            metric,
+                        )
+                        for key, params in pending
+                    )
+                    for key, score, fit_time in finished:
+                        record = {
+                            "type": "trial",
+                            "key": key,
+                            "model": name,
+                            "bracket": b,
+                            "rung": r,
+                            "params": params_by_key[key],
+                            "budget": budget,
+                            "resource_kind": kind,
+                            "resource": resource,
+                            "score": score,
+                            "fit_time_sec": fit_time,
+                        }
+                        journal.append(record)
+                        tracker.log_trial(record)
+
+                    rung_records = [journal.trials[key] for key in keys]
+                    results.extend(rung_records)
+                    # Sobreviven los mejores (orden estable ante empates)
+                    ranking = sorted(
+                        range(len(candidates)), key=lambda i: -rung_records[i]["score"]
+                    )
+                    candidates = [candidates[i] for i in ranking]
+
+        best = {}
+        for name, record in _best_per_model(results).items():
+            params = dict(record["params"])
+            if record["resource_kind"] == "n_estimators":
+                params["n_estimators"] = record["resource"]
+            best[name] = {
+                "params": params,
+                "score": record["score"],
+                "resource_kind": record["resource_kind"],
+                "resource": record["resource"],
+            }
+            logger.info(
+                f"Mejores parámetros para {name} ({metric}={record['score']:.4f}): {params}"
+            )
+        tracker.log_best(best)
+    finally:
+        tracker.close()
+
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump(best, f, indent=2, default=str)
+    logger.info(f"Mejores parámetros guardados en {output_path}")
+    return best
+
+
+def load_best_params(path=BEST_PARAMS_PATH):
+    """
+    Parámetros encontrados por la búsqueda, listos para `get_model_dict(params=...)`.
+    Devuelve un dict vacío si no hay búsqueda previa.
+    """
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return {name: result["params"] for name, result in json.load(f).items()}
+
+
+def search_hyperparameters(sparse=SPARSE_FEATURES, n_jobs=N_JOBS, **kwargs):
+    """Ejecuta `run_search` sobre las features de entrenamiento ya generadas."""
+    train_path = features_path(TRAIN_PATH, sparse)
+    if not os.path.exists(train_path):
+        raise FileNotFoundError(f"No se encontraron las features de entrenamiento en {train_path}")
+    X, y = read_features(train_path)
+    columns = read_feature_columns(train_path) if sparse else None
+    categories = load_feature_categories()
+    return run_search(X, y, n_jobs=n_jobs, columns=columns, categories=categories, **kwargs)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Búsqueda de hiperparámetros por successive halving / Hyperband."
+    )
+    parser.add_argument("--strategy", choices=["halving", "hyperband"], default=SEARCH_STRATEGY)
+    parser.add_argument(
+        "--models",
+        nargs="+",
+        choices=list(SEARCH_SPACES),
+        help="Modelos a buscar (por defecto, todos).",
+    )
+    parser.add_argument(
+        "--candidates",
+        type=int,
+        default=SEARCH_N_CANDIDATES,
+        help="Candidatos del bracket más agresivo.",
+    )
+    parser.add_argument(
+        "--eta", type=int, default=SEARCH_ETA, help="Factor de reducción entre rondas."
+    )
+    parser.add_argument(
+        "--fresh", action="store_true", help="Ignora la bitácora y empieza de cero."
+    )
+    args = parser.parse_args()
+
+    best_params = search_hyperparameters(
+        model_names=args.models,
+        strategy=args.strategy,
+        n_candidates=args.candidates,
+        eta=args.eta,
+        resume=not args.fresh,
+    )
+    logger.info(f"Búsqueda terminada:\n{json.dumps(best_params, indent=2, default=str)}")
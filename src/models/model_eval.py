@@ -1,54 +1,237 @@
+import json
+import joblib
 import mlflow
+import numpy as np
 import pandas as pd
-from sklearn.model_selection import cross_val_score
-from src.models.model_utils import calculate_metrics, get_model_dict
+from src.models.model_utils import (
+    N_JOBS,
+    calculate_metrics,
+    cross_val_predict_parallel,
+    get_model_dict,
+    load_model_metadata,
+    load_model_threshold,
+    score_model,
+)
+from src.models.model_metrics import (
+    LABEL_METRICS,
+    N_BOOTSTRAP,
+    THRESHOLD_OBJECTIVE,
+    best_threshold,
+    bootstrap_metrics,
+    expected_cost,
+    threshold_sweep,
+)
 from src.utils.logger import get_logger
-import time
+from src.utils.storage import SPARSE_FEATURES, features_path, read_features
 import os
 
 logger = get_logger(__name__)
 
 TRAIN_PATH = "data/processed/train_features.csv"
 TEST_PATH = "data/processed/test_features.csv"
+MLFLOW_TRACKING_URI = "file:./mlruns"
 
+# Umbral elegido por modelo (también queda en su run de MLflow) y curvas por umbral
+THRESHOLDS_PATH = "reports/decision_thresholds.json"
+CURVES_DIR = "reports/threshold_curves"
+# Puntos máximos de cada curva guardada (se conserva siempre el umbral elegido)
+CURVE_MAX_POINTS = 1000
+# Folds de la validación cruzada sobre train (F1 de consistencia y umbral out-of-fold)
+CV_FOLDS = int(os.getenv("CV_FOLDS", "5"))
+# Cómo se eligió el umbral: el registro solo compara runs evaluados de la misma forma
+THRESHOLD_SELECTION = "oof_cv"
 
-def evaluate_models():
+
+def load_trained_models(model_names=None):
+    """
+    Carga los modelos ya entrenados desde `models/*.pkl` junto con sus metadatos.
+
+    Returns:
+        dict: Mismo formato que devuelve `train_and_log_models`.
+    """
+    model_names = model_names or list(get_model_dict())
+    trained = {}
+    for name in model_names:
+        model_path = f"models/{name}.pkl"
+        if not os.path.exists(model_path):
+            raise FileNotFoundError(f"No se encontró el modelo entrenado en {model_path}")
+        meta = load_model_metadata(model_path)
+        trained[name] = {
+            "model": joblib.load(model_path),
+            "metrics": meta.get("metrics"),
+            "train_time_sec": meta.get("train_time_sec"),
+            "predict_time_sec": meta.get("predict_time_sec"),
+            "decision_threshold": load_model_threshold(model_path),
+            "run_id": meta.get("run_id"),
+        }
+    return trained
+
+
+def cross_validate_models(n_jobs=N_JOBS, cv=CV_FOLDS, sparse=SPARSE_FEATURES, models=None):
+    """
+    Validación cruzada sobre train de cada modelo base (o de `models`, que se
+    clonan sin ajustar), con todos los pares (modelo, fold) repartidos en el
+    pool de workers. Da el F1 de consistencia y las probabilidades out-of-fold
+    con las que se elige el umbral de decisión sin tocar el test set.
+
+    Returns:
+        tuple: (y_train, {nombre: (probabilidades out-of-fold | None, F1 de cada fold)}).
+    """
+    X_train, y_train = read_features(features_path(TRAIN_PATH, sparse))
+    logger.info(f"Ejecutando validación cruzada ({cv} folds, n_jobs={n_jobs})...")
+    models = models or get_model_dict()
+    return np.asarray(y_train), cross_val_predict_parallel(
+        models, X_train, y_train, cv=cv, n_jobs=n_jobs
+    )
+
+
+def _fitted_trees(model):
+    """Árboles realmente ajustados por los ensambles (con early stopping pueden ser menos)."""
+    model = model.steps[-1][1] if hasattr(model, "steps") else model
+    for attribute in ("n_iter_", "n_estimators_", "n_estimators"):
+        # El n_iter_ de LogisticRegression es un arreglo de iteraciones del solver, no árboles
+        value = getattr(model, attribute, None)
+        if value is not None and np.ndim(value) == 0:
+            return int(value)
+    return None
+
+
+def _save_curve(name, sweep, chosen):
+    """Guarda la curva por umbral (submuestreada) en CSV y devuelve su ruta."""
+    n_points = len(sweep["threshold"])
+    keep = np.unique(
+        np.r_[np.linspace(0, n_points - 1, min(n_points, CURVE_MAX_POINTS)).round(), chosen]
+    )
+    curve = pd.DataFrame({key: values[keep.astype(int)] for key, values in sweep.items()})
+    os.makedirs(CURVES_DIR, exist_ok=True)
+    path = os.path.join(CURVES_DIR, f"{name}.csv")
+    curve.to_csv(path, index=False)
+    return path
+
+
+def _log_threshold_to_mlflow(run_id, threshold, metrics, curve_path):
+    """
+    Agrega al run de entrenamiento el umbral elegido, las métricas de test a ese
+    umbral y la curva out-of-fold.
+    """
+    mlflow.set_tracking_uri(MLFLOW_TRACKING_URI)
+    with mlflow.start_run(run_id=run_id):
+        mlflow.set_tag("threshold_selection", THRESHOLD_SELECTION)
+        mlflow.log_metric("decision_threshold_tuned", threshold)
+        mlflow.log_metrics({f"{metric}_tuned": metrics[metric] for metric in LABEL_METRICS})
+        mlflow.log_metric("expected_cost_tuned", metrics["expected_cost"])
+        mlflow.log_artifact(curve_path, artifact_path="threshold_curves")
+
+
+def evaluate_models(
+    trained=None,
+    run_cv=True,
+    n_jobs=N_JOBS,
+    sparse=SPARSE_FEATURES,
+    n_bootstrap=N_BOOTSTRAP,
+    threshold_objective=THRESHOLD_OBJECTIVE,
+    cv_folds=CV_FOLDS,
+):
     """
     Evalúa performance, consistencia y escalabilidad de cada modelo.
+
+    No vuelve a entrenar: reutiliza los modelos y métricas de `train_and_log_models`
+    (en memoria) o, si no se reciben, los modelos persistidos en `models/*.pkl`.
+    Cada modelo puntúa el test set una sola vez (predict_proba) para las
+    métricas y los intervalos de confianza.
+
+    Args:
+        trained (dict): Resultado de `train_and_log_models`. Si es None se carga de disco.
+        run_cv (bool): Si True, agrega el F1 de validación cruzada.
+        n_jobs (int): Workers para los folds de CV (-1 = todos los núcleos).
+        sparse (bool): Si True, lee las matrices CSR guardadas en `.npz`.
+        n_bootstrap (int): Remuestreos bootstrap para los IC de cada métrica
+            (columnas `<métrica>_ci_low` / `<métrica>_ci_high`). 0 los desactiva.
+        threshold_objective (str): 'f1' o 'cost' para elegir el umbral de cada modelo
+            con un barrido completo de umbrales; 'none' conserva el del entrenamiento.
+            El barrido usa las probabilidades out-of-fold de train (mismos folds
+            que la CV), así que las métricas de test a ese umbral no están sesgadas.
+            El umbral elegido se guarda en THRESHOLDS_PATH y en el run de MLflow.
+        cv_folds (int): Folds de la validación cruzada sobre train.
     """
     logger.info("=== Iniciando evaluación de modelos ===")
 
-    df_train = pd.read_csv(TRAIN_PATH)
-    df_test = pd.read_csv(TEST_PATH)
-    X_train, y_train = df_train.drop(columns=["target"]), df_train["target"]
-    X_test, y_test = df_test.drop(columns=["target"]), df_test["target"]
+    if trained is None:
+        logger.info("Cargando modelos entrenados desde models/ ...")
+        trained = load_trained_models()
 
-    models = get_model_dict()
+    tune_threshold = threshold_objective not in (None, "", "none")
     eval_results = []
+    thresholds = {}
+    X_test = y_test = None
 
-    for name, model in models.items():
-        logger.info(f"Evaluando modelo: {name}")
+    # Consistencia (CV) y probabilidades out-of-fold: una sola pasada de folds para ambas,
+    # con la misma configuración que los modelos evaluados (incluye hiperparámetros buscados)
+    cv_predictions = {}
+    if run_cv or tune_threshold:
+        models = {name: result["model"] for name, result in trained.items()}
+        y_train, cv_predictions = cross_validate_models(
+            n_jobs=n_jobs, cv=cv_folds, sparse=sparse, models=models
+        )
 
-        start_time = time.time()
-        model.fit(X_train, y_train)
-        train_time = time.time() - start_time
+    for name, result in trained.items():
+        logger.info(f"Evaluando modelo: {name}")
 
-        # Performance
-        y_pred = model.predict(X_test)
-        y_proba = model.predict_proba(X_test)[:, 1] if hasattr(model, "predict_proba") else None
-        metrics = calculate_metrics(y_test, y_pred, y_proba)
+        # Performance (se reutilizan las métricas del entrenamiento si existen)
+        metrics = dict(result.get("metrics") or {})
+        threshold = result.get("decision_threshold")
+        oof_proba = cv_predictions.get(name, (None, None))[0]
+        sweep = None
+        if tune_threshold and oof_proba is not None:
+            # Barrido de todos los umbrales sobre las probabilidades out-of-fold de train
+            sweep = threshold_sweep(y_train, oof_proba)
+            chosen = best_threshold(sweep, threshold_objective)
+            threshold = float(sweep["threshold"][chosen])
+            logger.info(
+                f"Umbral óptimo ({threshold_objective}, out-of-fold) para {name}: {threshold:.4f}"
+            )
 
-        # Consistencia (CV)
-        cv_score = cross_val_score(model, X_train, y_train, cv=5, scoring="f1").mean()
-        metrics["cross_val_f1"] = cv_score
+        if not metrics or n_bootstrap or sweep is not None:
+            if X_test is None:
+                X_test, y_test = read_features(features_path(TEST_PATH, sparse))
+            y_pred, y_proba = score_model(result["model"], X_test, threshold)
+            metrics = calculate_metrics(y_test, y_pred, y_proba)
+            if sweep is not None:
+                metrics["expected_cost"] = expected_cost(y_test, y_pred)
+                thresholds[name] = {
+                    "decision_threshold": threshold,
+                    "objective": threshold_objective,
+                }
+                curve_path = _save_curve(name, sweep, chosen)
+                if result.get("run_id"):
+                    _log_threshold_to_mlflow(result["run_id"], threshold, metrics, curve_path)
+            if n_bootstrap:
+                intervals = bootstrap_metrics(y_test, y_pred, y_proba, n_resamples=n_bootstrap)
+                for metric, (low, high) in intervals.items():
+                    metrics[f"{metric}_ci_low"] = low
+                    metrics[f"{metric}_ci_high"] = high
+        metrics["decision_threshold"] = threshold
 
-        # Escalabilidad (tiempo de entrenamiento)
-        metrics["train_time_sec"] = round(train_time, 3)
+        # Escalabilidad (tiempo de entrenamiento y de predicción sobre el test set)
+        if result.get("train_time_sec") is not None:
+            metrics["train_time_sec"] = round(result["train_time_sec"], 3)
+        if result.get("predict_time_sec") is not None:
+            metrics["predict_time_sec"] = round(result["predict_time_sec"], 4)
+        n_trees = _fitted_trees(result["model"])
+        if n_trees is not None:
+            metrics["n_trees"] = n_trees
+        if run_cv:
+            metrics["cross_val_f1"] = float(np.mean(cv_predictions[name][1]))
 
         eval_results.append({"modelo": name, **metrics})
 
-    df_results = pd.DataFrame(eval_results)
     os.makedirs("reports", exist_ok=True)
+    if thresholds:
+        with open(THRESHOLDS_PATH, "w", encoding="utf-8") as f:
+            json.dump(thresholds, f, indent=2)
+        logger.info(f"Umbrales de decisión guardados en {THRESHOLDS_PATH}")
+
+    df_results = pd.DataFrame(eval_results)
     df_results.to_csv("reports/model_evaluation.csv", index=False)
     logger.info("Resultados de evaluación guardados en reports/model_evaluation.csv")
 
@@ -60,12 +243,17 @@ def evaluate_models():
         f.write(f"**Mejor modelo:** {best_model['modelo']}\n\n")
         f.write("### Métricas principales:\n")
         for metric, value in best_model.items():
-            if metric != "modelo":
-                f.write(f"- **{metric}:** {round(value, 4)}\n")
+            # Columnas que no aplican a este modelo (p. ej. n_trees de la regresión logística)
+            if metric == "modelo" or "_ci_" in metric or pd.isna(value):
+                continue
+            line = f"- **{metric}:** {round(value, 4)}"
+            if f"{metric}_ci_low" in best_model:
+                low, high = best_model[f"{metric}_ci_low"], best_model[f"{metric}_ci_high"]
+                line += f" (IC 95%: {low:.4f} – {high:.4f})"
+            f.write(line + "\n")
 
     logger.info(f"Resumen de evaluación guardado en {summary_path}")
 
-
     return df_results
 
 
@@ -0,0 +1,203 @@
+import os
+import numpy as np
+
+# Remuestreos bootstrap para los intervalos de confianza de evaluate_models (0 = sin IC)
+N_BOOTSTRAP = int(os.getenv("N_BOOTSTRAP", "1000"))
+CONFIDENCE_LEVEL = 0.95
+# Máximo de elementos de la matriz de índices por bloque de remuestreos (~80 MB en int64)
+BOOTSTRAP_BLOCK_ELEMENTS = 10_000_000
+
+LABEL_METRICS = ["accuracy", "precision", "recall", "f1_score"]
+
+# Selección del umbral de decisión: "f1" (máximo F1), "cost" (mínimo costo esperado) o "none"
+THRESHOLD_OBJECTIVE = os.getenv("THRESHOLD_OBJECTIVE", "f1").lower()
+# Costo de ofrecer la membresía a quien no la toma (FP) y de no ofrecerla a quien sí (FN)
+FALSE_POSITIVE_COST = float(os.getenv("FALSE_POSITIVE_COST", "1"))
+FALSE_NEGATIVE_COST = float(os.getenv("FALSE_NEGATIVE_COST", "1"))
+
+
+def _ratio(numerator, denominator):
+    # zero_division=0, como en sklearn
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(denominator > 0, numerator / np.where(denominator > 0, denominator, 1), 0.0)
+
+
+def confusion_counts(y_true, y_pred):
+    """(tn, fp, fn, tp) en una sola pasada sobre los arreglos."""
+    y_true = np.asarray(y_true).astype(np.int64)
+    y_pred = np.asarray(y_pred).astype(np.int64)
+    return np.bincount(2 * y_true + y_pred, minlength=4)
+
+
+def metrics_from_counts(tn, fp, fn, tp):
+    """
+    Accuracy, precision, recall y F1 a partir de la matriz de confusión.
+    Acepta escalares o arreglos (una matriz de confusión por remuestreo).
+    """
+    tn, fp, fn, tp = (np.asarray(v, dtype=float) for v in (tn, fp, fn, tp))
+    return {
+        "accuracy": _ratio(tp + tn, tp + tn + fp + fn),
+        "precision": _ratio(tp, tp + fp),
+        "recall": _ratio(tp, tp + fn),
+        "f1_score": _ratio(2 * tp, 2 * tp + fp + fn),
+    }
+
+
+def _score_groups(y_true, y_score):
+    """
+    Ordena los scores una sola vez y agrupa los empates.
+
+    Returns:
+        tuple: (orden, inicio de cada grupo de empate, es_positivo en el orden).
+    """
+    order = np.argsort(y_score, kind="mergesort")
+    sorted_scores = np.asarray(y_score)[order]
+    starts = np.flatnonzero(np.r_[True, sorted_scores[1:] != sorted_scores[:-1]])
+    return order, starts, np.asarray(y_true)[order].astype(bool)
+
+
+def _auc_from_groups(pos, neg):
+    """
+    ROC AUC a partir de los pesos de positivos y negativos por grupo de score
+    (ordenados de menor a mayor). Un par positivo-negativo empatado cuenta 0.5.
+    Acepta una fila por remuestreo (matrices B x grupos).
+    """
+    neg_below = np.cumsum(neg, axis=-1) - neg
+    wins = (pos * (neg_below + 0.5 * neg)).sum(axis=-1)
+    total = pos.sum(axis=-1) * neg.sum(axis=-1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(total > 0, wins / np.where(total > 0, total, 1), np.nan)
+
+
+def roc_auc(y_true, y_score):
+    """ROC AUC con un solo ordenamiento (equivalente a sklearn.metrics.roc_auc_score)."""
+    order, starts, positive = _score_groups(y_true, y_score)
+    if positive.all() or not positive.any():
+        raise ValueError("Solo hay una clase en y_true: el ROC AUC no está definido.")
+    pos = np.add.reduceat(positive.astype(float), starts)
+    neg = np.add.reduceat((~positive).astype(float), starts)
+    return float(_auc_from_groups(pos, neg))
+
+
+def threshold_sweep(y_true, y_score, fp_cost=FALSE_POSITIVE_COST, fn_cost=FALSE_NEGATIVE_COST):
+    """
+    Curvas de precision/recall/F1/costo para todos los umbrales con un solo ordenamiento.
+
+    Con la regla de `score_model` (positivo si probabilidad > umbral), las
+    predicciones solo cambian en los scores observados: cada score único es un
+    umbral candidato, más uno por debajo del mínimo (todos positivos). Los
+    conteos de la matriz de confusión salen de sumas acumuladas por grupo de empate.
+
+    Returns:
+        dict: Arreglos alineados (umbral ascendente): threshold, tp, fp, fn, tn,
+        accuracy, precision, recall, f1_score y cost (costo promedio por cliente).
+    """
+    order, starts, positive = _score_groups(y_true, y_score)
+    scores = np.asarray(y_score, dtype=float)[order][starts]
+    pos = np.add.reduceat(positive.astype(np.int64), starts)
+    neg = np.add.reduceat((~positive).astype(np.int64), starts)
+    n_pos, n_neg = pos.sum(), neg.sum()
+
+    # Positivos predichos con umbral = scores[k]: los grupos k+1 en adelante
+    tp = np.r_[n_pos, n_pos - np.cumsum(pos)]
+    fp = np.r_[n_neg, n_neg - np.cumsum(neg)]
+    fn, tn = n_pos - tp, n_neg - fp
+    sweep = {
+        "threshold": np.r_[np.nextafter(scores[0], -np.inf), scores],
+        "tp": tp,
+        "fp": fp,
+        "fn": fn,
+        "tn": tn,
+    }
+    sweep.update(metrics_from_counts(tn, fp, fn, tp))
+    sweep["cost"] = (fp_cost * fp + fn_cost * fn) / (n_pos + n_neg)
+    return sweep
+
+
+def expected_cost(y_true, y_pred, fp_cost=FALSE_POSITIVE_COST, fn_cost=FALSE_NEGATIVE_COST):
+    """Costo promedio por cliente de unas predicciones (misma escala que `threshold_sweep`)."""
+    tn, fp, fn, tp = confusion_counts(y_true, y_pred)
+    return float((fp_cost * fp + fn_cost * fn) / (tn + fp + fn + tp))
+
+
+def best_threshold(sweep, objective=THRESHOLD_OBJECTIVE):
+    """Índice del umbral óptimo de un `threshold_sweep` según `objective` ('f1' o 'cost')."""
+    if objective == "f1":
+        return int(np.argmax(sweep["f1_score"]))
+    if objective == "cost":
+        return int(np.argmin(sweep["cost"]))
+    raise ValueError(f"Objetivo de umbral no soportado: {objective}")
+
+
+def classification_metrics(y_true, y_pred, y_proba=None):
+    """Métricas de clasificación a partir de una sola matriz de confusión."""
+    tn, fp, fn, tp = confusion_counts(y_true, y_pred)
+    metrics = {name: float(value) for name, value in metrics_from_counts(tn, fp, fn, tp).items()}
+    if y_proba is not None:
+        metrics["roc_auc"] = roc_auc(y_true, y_proba)
+    return metrics
+
+
+def bootstrap_metrics(
+    y_true,
+    y_pred,
+    y_proba=None,
+    n_resamples=N_BOOTSTRAP,
+    confidence=CONFIDENCE_LEVEL,
+    seed=42,
+    block_elements=BOOTSTRAP_BLOCK_ELEMENTS,
+):
+    """
+    Intervalos de confianza bootstrap (percentil) de cada métrica.
+
+    Los remuestreos se generan como una matriz de índices (remuestreos x filas) y
+    se convierten en pesos por fila con un solo `bincount`; la matriz de
+    confusión y el AUC de todos los remuestreos salen de productos y sumas
+    acumuladas sobre esos pesos, con los scores ordenados una sola vez. Las matrices se
+    procesan por bloques de remuestreos para acotar la memoria.
+
+    Returns:
+        dict: {métrica: (límite inferior, límite superior)}
+    """
+    y_true = np.asarray(y_true).astype(bool)
+    y_pred = np.asarray(y_pred).astype(bool)
+    n = len(y_true)
+    rng = np.random.default_rng(seed)
+
+    if y_proba is not None:
+        # Remuestrear filas ya ordenadas por score es equivalente y evita reordenar los pesos
+        order, starts, positive = _score_groups(y_true, y_proba)
+        y_true, y_pred = y_true[order], y_pred[order]
+    cells = np.column_stack(
+        [~y_true & ~y_pred, ~y_true & y_pred, y_true & ~y_pred, y_true & y_pred]
+    )
+    cells = cells.astype(float)
+
+    samples = {name: [] for name in LABEL_METRICS + (["roc_auc"] if y_proba is not None else [])}
+    block = max(1, min(n_resamples, block_elements // max(n, 1)))
+    for start in range(0, n_resamples, block):
+        size = min(block, n_resamples - start)
+        indices = rng.integers(0, n, size=(size, n))
+        # Veces que aparece cada fila en cada remuestreo
+        offsets = (np.arange(size) * n)[:, None]
+        weights = (
+            np.bincount((indices + offsets).ravel(), minlength=size * n)
+            .reshape(size, n)
+            .astype(float)
+        )
+
+        tn, fp, fn, tp = (weights @ cells).T
+        for name, values in metrics_from_counts(tn, fp, fn, tp).items():
+            samples[name].append(values)
+
+        if y_proba is not None:
+            pos = np.add.reduceat(weights * positive, starts, axis=1)
+            neg = np.add.reduceat(weights * ~positive, starts, axis=1)
+            samples["roc_auc"].append(_auc_from_groups(pos, neg))
+
+    tail = (1 - confidence) / 2 * 100
+    intervals = {}
+    for name, values in samples.items():
+        low, high = np.nanpercentile(np.concatenate(values), [tail, 100 - tail])
+        intervals[name] = (float(low), float(high))
+    return intervals
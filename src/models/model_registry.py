@@ -5,17 +5,62 @@ from src.utils.logger import get_logger
 import joblib
 import os
 from mlflow import sklearn as mlflow_sklearn
+from src.deployment.bundle import build_serving_bundle
+from src.models.model_eval import THRESHOLD_SELECTION
+from src.models.model_utils import DEFAULT_THRESHOLD, save_model_metadata
 
 logger = get_logger(__name__)
 
 MLFLOW_TRACKING_URI = "file:./mlruns"
 EXPERIMENT_NAME = "membresias_premium_models"
+MODEL_NAME = "membresia_premium_best_model"
+
+
+def select_best_run(runs):
+    """
+    Mejor run por F1 de test, comparando solo runs evaluados de la misma forma:
+    si hay runs con umbral elegido out-of-fold (tag `threshold_selection`), se
+    comparan por `f1_score_tuned`; si no, todos por `f1_score` (umbral de entrenamiento).
+    """
+    tuned = [
+        run
+        for run in runs
+        if run.data.tags.get("threshold_selection") == THRESHOLD_SELECTION
+        and "f1_score_tuned" in run.data.metrics
+    ]
+    if tuned:
+        return max(tuned, key=lambda run: run.data.metrics["f1_score_tuned"])
+    return max(runs, key=lambda run: run.data.metrics.get("f1_score", float("-inf")))
+
+
+def run_decision_threshold(run):
+    """
+    Umbral de decisión de un run: el elegido en la evaluación o, si no hay, el del entrenamiento.
+    """
+    threshold = float(run.data.params.get("decision_threshold", DEFAULT_THRESHOLD))
+    return float(run.data.metrics.get("decision_threshold_tuned", threshold))
+
+
+def production_threshold(client=None, model_name=MODEL_NAME, stage="Production"):
+    """
+    Umbral de decisión de la versión del Model Registry en `stage`, leído de su
+    propio run (no de `models/local_best_model.meta.json`, que corresponde al
+    último modelo registrado y puede no ser el de Production).
+    """
+    client = client or MlflowClient()
+    versions = client.get_latest_versions(model_name, stages=[stage])
+    if not versions:
+        raise LookupError(f"No hay versión en {stage} para {model_name}.")
+    return run_decision_threshold(client.get_run(versions[0].run_id))
 
 
 def register_best_model():
     """
-    Registra el mejor modelo (por f1_score) en el MLflow Model Registry
-    y guarda una copia local del modelo real.
+    Registra el mejor modelo en el MLflow Model Registry y guarda una copia local
+    del modelo real.
+
+    El mejor modelo se elige con `select_best_run` y se guarda con su propio
+    umbral de decisión (`run_decision_threshold`).
     """
     logger.info("=== Iniciando registro del mejor modelo ===")
 
@@ -27,10 +72,10 @@ def register_best_model():
         raise ValueError(f"Experimento '{EXPERIMENT_NAME}' no encontrado.")
 
     runs = client.search_runs(experiment.experiment_id, order_by=["metrics.f1_score DESC"])
-    best_run = runs[0]
+    best_run = select_best_run(runs)
 
     model_uri = f"runs:/{best_run.info.run_id}/model"
-    model_name = "membresia_premium_best_model"
+    model_name = MODEL_NAME
 
     logger.info(f"Registrando modelo {model_name} con run_id {best_run.info.run_id}")
 
@@ -43,6 +88,19 @@ def register_best_model():
     joblib.dump(best_model, "models/local_best_model.pkl")
     logger.info("✅ Copia local del mejor modelo guardada en models/local_best_model.pkl")
 
+    # El umbral de decisión viaja con el modelo para que serving use el mismo que evaluación
+    threshold = run_decision_threshold(best_run)
+    save_model_metadata(
+        "models/local_best_model.pkl",
+        decision_threshold=threshold,
+        run_id=best_run.info.run_id,
+        run_name=best_run.data.tags.get("mlflow.runName"),
+    )
+    logger.info(f"Umbral de decisión del mejor modelo: {threshold}")
+
+    # Artefacto único para serving (se carga sin importar MLflow)
+    build_serving_bundle("models/local_best_model.pkl")
+
 
 if __name__ == "__main__":
     register_best_model()
@@ -1,38 +1,246 @@
+import json
+import os
+import time
 import numpy as np
-from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score, roc_auc_score
+from joblib import Parallel, delayed
+from src.models.model_metrics import classification_metrics
 from src.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Los imports de sklearn van dentro de cada función: serving solo usa `score_model`
+# y los helpers de metadata, y no debe pagar el import de sklearn.metrics al arrancar
+
+# Umbral de decisión por defecto (equivalente al implícito de model.predict)
+DEFAULT_THRESHOLD = 0.5
+DECISION_THRESHOLD = float(os.getenv("DECISION_THRESHOLD", DEFAULT_THRESHOLD))
+
+# Workers para entrenamiento y validación cruzada (-1 = todos los núcleos)
+N_JOBS = int(os.getenv("N_JOBS", "-1"))
+
+
 def calculate_metrics(y_true, y_pred, y_proba=None):
     """
     Calcula métricas estándar de clasificación.
+
+    Accuracy, precision, recall y F1 salen de una sola matriz de confusión y el
+    ROC AUC de un solo ordenamiento (ver src.models.model_metrics); coinciden
+    con las funciones de sklearn.
+    """
+    metrics = classification_metrics(y_true, y_pred, y_proba)
+
+    logger.debug(f"Métricas calculadas: {metrics}")
+    return metrics
+
+
+def score_model(model, X, threshold=DEFAULT_THRESHOLD):
+    """
+    Calcula las probabilidades una sola vez y deriva las etiquetas con el umbral.
+
+    Una fila es positiva si su probabilidad es estrictamente mayor que `threshold`,
+    por lo que con 0.5 se reproduce exactamente `model.predict`.
+
+    Args:
+        model: Clasificador binario ajustado.
+        X: Matriz de features.
+        threshold (float): Umbral de decisión sobre la probabilidad de la clase positiva.
+    Returns:
+        tuple: (y_pred, y_proba). `y_proba` es None si el modelo no tiene predict_proba.
+    """
+    if not hasattr(model, "predict_proba"):
+        return model.predict(X), None
+
+    y_proba = model.predict_proba(X)[:, 1]
+    y_pred = model.classes_.take((y_proba > threshold).astype(np.intp))
+    return y_pred, y_proba
+
+
+def get_metadata_path(model_path):
+    """Ruta de los metadatos del modelo (`models/x.pkl` -> `models/x.meta.json`)."""
+    return f"{os.path.splitext(model_path)[0]}.meta.json"
+
+
+def save_model_metadata(model_path, **metadata):
+    """
+    Guarda (o actualiza) los metadatos del modelo junto al archivo del modelo.
+    """
+    meta = load_model_metadata(model_path)
+    meta.update(metadata)
+    meta_path = get_metadata_path(model_path)
+    os.makedirs(os.path.dirname(meta_path) or ".", exist_ok=True)
+    with open(meta_path, "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+    return meta
+
+
+def load_model_metadata(model_path):
+    """
+    Carga los metadatos del modelo. Devuelve un dict vacío si no existen.
+    """
+    meta_path = get_metadata_path(model_path)
+    if not os.path.exists(meta_path):
+        return {}
+    with open(meta_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def load_model_threshold(model_path, default=DECISION_THRESHOLD):
+    """
+    Devuelve el umbral de decisión persistido junto al modelo (o `default`).
+    """
+    return float(load_model_metadata(model_path).get("decision_threshold", default))
+
+
+def bind_feature_columns(models, columns):
+    """
+    Pasa los nombres de columna a los modelos que los necesitan para entrenar con
+    matrices sin nombres (CSR), p. ej. el paso `OneHotToCategorical`.
+    """
+    for model in models.values():
+        for param in model.get_params():
+            if param == "feature_columns" or param.endswith("__feature_columns"):
+                model.set_params(**{param: list(columns)})
+    return models
+
+
+def bind_feature_categories(models, categories):
+    """
+    Pasa las categorías del OneHotEncoder ajustado ({variable: categorías}) a los
+    modelos que reconstruyen las variables categóricas, p. ej. `OneHotToCategorical`.
+    """
+    for model in models.values():
+        for param in model.get_params():
+            if param == "categories" or param.endswith("__categories"):
+                model.set_params(
+                    **{param: {name: list(values) for name, values in categories.items()}}
+                )
+    return models
+
+
+def _fit_model(name, model, X_train, y_train):
+    start_time = time.time()
+    model.fit(X_train, y_train)
+    return name, model, time.time() - start_time
+
+
+def fit_models_parallel(models, X_train, y_train, n_jobs=N_JOBS):
+    """
+    Ajusta varios modelos en paralelo (un proceso por modelo).
+
+    Args:
+        models (dict): {nombre: estimador sin ajustar}.
+        n_jobs (int): Número de workers (-1 = todos los núcleos).
+    Returns:
+        dict: {nombre: (modelo ajustado, tiempo de entrenamiento en segundos)}.
     """
-    metrics = {
-        "accuracy": accuracy_score(y_true, y_pred),
-        "precision": precision_score(y_true, y_pred, zero_division=0),
-        "recall": recall_score(y_true, y_pred, zero_division=0),
-        "f1_score": f1_score(y_true, y_pred, zero_division=0),
+    results = Parallel(n_jobs=n_jobs)(
+        delayed(_fit_model)(name, model, X_train, y_train) for name, model in models.items()
+    )
+    return {name: (model, train_time) for name, model, train_time in results}
+
+
+def _fit_and_predict_fold(name, model, X, y, train_idx, val_idx):
+    from sklearn.base import clone
+    from sklearn.metrics import f1_score
+
+    model = clone(model)
+    X_fit = X.iloc[train_idx] if hasattr(X, "iloc") else X[train_idx]
+    X_val = X.iloc[val_idx] if hasattr(X, "iloc") else X[val_idx]
+    y_arr = np.asarray(y)
+    model.fit(X_fit, y_arr[train_idx])
+    # Con el umbral por defecto, score_model reproduce model.predict
+    y_pred, y_proba = score_model(model, X_val)
+    return name, val_idx, y_proba, f1_score(y_arr[val_idx], y_pred, zero_division=0)
+
+
+def cross_val_predict_parallel(models, X, y, cv=5, n_jobs=N_JOBS):
+    """
+    Validación cruzada de todos los modelos, repartiendo cada par (modelo, fold)
+    en un mismo pool de workers. Usa los mismos folds que
+    `cross_val_score(..., cv=cv, scoring="f1")`.
+
+    Returns:
+        dict: {nombre: (probabilidades out-of-fold de cada fila de X o None si el
+        modelo no tiene predict_proba, lista con el F1 de cada fold)}.
+    """
+    from sklearn.model_selection import StratifiedKFold
+
+    folds = list(StratifiedKFold(n_splits=cv).split(X, y))
+    results = Parallel(n_jobs=n_jobs)(
+        delayed(_fit_and_predict_fold)(name, model, X, y, train_idx, val_idx)
+        for name, model in models.items()
+        for train_idx, val_idx in folds
+    )
+
+    predictions = {}
+    for name, val_idx, y_proba, score in results:
+        oof_proba, scores = predictions.setdefault(name, (np.full(X.shape[0], np.nan), []))
+        if y_proba is not None:
+            oof_proba[val_idx] = y_proba
+        scores.append(score)
+    return {
+        name: (None if np.isnan(oof_proba).any() else oof_proba, scores)
+        for name, (oof_proba, scores) in predictions.items()
     }
 
-    if y_proba is not None:
-        metrics["roc_auc"] = roc_auc_score(y_true, y_proba)
 
-    logger.info(f"Métricas calculadas: {metrics}")
-    return metrics
+def cross_val_f1_parallel(models, X, y, cv=5, n_jobs=N_JOBS):
+    """
+    Validación cruzada (F1) de todos los modelos (ver `cross_val_predict_parallel`).
+
+    Returns:
+        dict: {nombre: F1 promedio de los folds}.
+    """
+    predictions = cross_val_predict_parallel(models, X, y, cv=cv, n_jobs=n_jobs)
+    return {name: float(np.mean(scores)) for name, (_, scores) in predictions.items()}
 
 
-def get_model_dict():
+def get_model_dict(params=None):
     """
     Retorna un diccionario de modelos base para el entrenamiento.
+
+    Args:
+        params (dict): {nombre: hiperparámetros} que reemplazan la configuración
+            base (p. ej. los de `hyperparameter_search.load_best_params`).
     """
     from sklearn.linear_model import LogisticRegression
-    from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
+    from sklearn.ensemble import (
+        GradientBoostingClassifier,
+        HistGradientBoostingClassifier,
+        RandomForestClassifier,
+    )
+    from sklearn.pipeline import Pipeline
+    from src.models.estimators import OneHotToCategorical, WarmStartForestClassifier
 
+    # Los bosques no fijan n_jobs: fit_models_parallel ya entrena un modelo por proceso
+    # y los árboles en paralelo dentro de cada worker sobresuscribirían los núcleos
     models = {
         "logistic_regression": LogisticRegression(max_iter=500),
         "random_forest": RandomForestClassifier(n_estimators=200, random_state=42),
         "gradient_boosting": GradientBoostingClassifier(n_estimators=200, random_state=42),
+        # Splits categóricos nativos sobre los bloques one-hot colapsados a columnas
+        # 'category', binning por histogramas y early stopping
+        "hist_gradient_boosting": Pipeline(
+            steps=[
+                ("categorical", OneHotToCategorical()),
+                (
+                    "model",
+                    HistGradientBoostingClassifier(
+                        max_iter=500,
+                        early_stopping=True,
+                        categorical_features="from_dtype",
+                        random_state=42,
+                    ),
+                ),
+            ]
+        ),
+        # Crece de a 25 árboles hasta que el log loss out-of-bag deja de mejorar
+        "warm_start_forest": WarmStartForestClassifier(
+            max_estimators=500, step=25, random_state=42
+        ),
     }
+    for name, overrides in (params or {}).items():
+        if name in models:
+            models[name].set_params(**overrides)
 
     return models
@@ -1,9 +1,21 @@
 import os
-import pandas as pd
+import time
 import mlflow
 import mlflow.sklearn
-from src.models.model_utils import get_model_dict, calculate_metrics
+from src.features.feature_engineering import load_feature_categories
+from src.models.model_utils import (
+    DECISION_THRESHOLD,
+    N_JOBS,
+    bind_feature_categories,
+    bind_feature_columns,
+    calculate_metrics,
+    fit_models_parallel,
+    get_model_dict,
+    save_model_metadata,
+    score_model,
+)
 from src.utils.logger import get_logger
+from src.utils.storage import SPARSE_FEATURES, features_path, read_feature_columns, read_features
 import joblib
 
 logger = get_logger(__name__)
@@ -13,9 +25,22 @@ TEST_PATH = "data/processed/test_features.csv"
 MLFLOW_TRACKING_URI = "file:./mlruns"  # Puedes cambiar a servidor remoto
 
 
-def train_and_log_models():
+def train_and_log_models(
+    threshold=DECISION_THRESHOLD, n_jobs=N_JOBS, sparse=SPARSE_FEATURES, params=None
+):
     """
     Entrena varios modelos, registra métricas y artefactos en MLflow.
+
+    Args:
+        threshold (float): Umbral de decisión usado para derivar las etiquetas.
+            Se guarda junto a cada modelo para que evaluación y serving coincidan.
+        n_jobs (int): Workers para entrenar los modelos en paralelo (-1 = todos los núcleos).
+        sparse (bool): Si True, entrena con las matrices CSR guardadas en `.npz`.
+        params (dict): Hiperparámetros por modelo (ver `get_model_dict`); None usa los base.
+    Returns:
+        dict: {nombre: {"model", "metrics", "train_time_sec", "predict_time_sec",
+        "decision_threshold", "run_id"}}, para
+        que la evaluación reutilice los modelos ajustados sin volver a entrenarlos.
     """
     logger.info("=== Iniciando entrenamiento de modelos ===")
 
@@ -24,30 +49,44 @@ def train_and_log_models():
     mlflow.set_experiment("membresias_premium_models")
 
     # --- 2️⃣ Cargar datos ---
-    if not os.path.exists(TRAIN_PATH) or not os.path.exists(TEST_PATH):
+    train_path, test_path = features_path(TRAIN_PATH, sparse), features_path(TEST_PATH, sparse)
+    if not os.path.exists(train_path) or not os.path.exists(test_path):
         raise FileNotFoundError("Archivos de entrenamiento o prueba no encontrados.")
-    df_train = pd.read_csv(TRAIN_PATH)
-    df_test = pd.read_csv(TEST_PATH)
-
-    X_train, y_train = df_train.drop(columns=["target"]), df_train["target"]
-    X_test, y_test = df_test.drop(columns=["target"]), df_test["target"]
-
-    models = get_model_dict()
-
-    # --- 3️⃣ Entrenar y loggear modelos ---
-    for model_name, model in models.items():
-        with mlflow.start_run(run_name=model_name):
-            logger.info(f"Entrenando modelo: {model_name}")
-
-            model.fit(X_train, y_train)
-            y_pred = model.predict(X_test)
-            y_proba = model.predict_proba(X_test)[:, 1] if hasattr(model, "predict_proba") else None
+    X_train, y_train = read_features(train_path)
+    X_test, y_test = read_features(test_path)
+
+    models = get_model_dict(params)
+    if sparse:
+        bind_feature_columns(models, read_feature_columns(train_path))
+    # Bloques one-hot por las categorías del encoder ajustado (no por prefijos de nombre)
+    categories = load_feature_categories()
+    if categories:
+        bind_feature_categories(models, categories)
+
+    # --- 3️⃣ Entrenar modelos en paralelo ---
+    logger.info(f"Entrenando modelos en paralelo: {list(models)} (n_jobs={n_jobs})")
+    fitted = fit_models_parallel(models, X_train, y_train, n_jobs=n_jobs)
+    trained = {}
+
+    # --- 4️⃣ Evaluar y loggear en MLflow (desde el proceso principal) ---
+    for model_name, (model, train_time) in fitted.items():
+        with mlflow.start_run(run_name=model_name) as run:
+            logger.info(f"Modelo '{model_name}' entrenado en {train_time:.2f}s")
+
+            start_time = time.time()
+            y_pred, y_proba = score_model(model, X_test, threshold)
+            predict_time = time.time() - start_time
 
             metrics = calculate_metrics(y_test, y_pred, y_proba)
 
             # --- Log de métricas ---
             for k, v in metrics.items():
                 mlflow.log_metric(k, v)
+            mlflow.log_metric("train_time_sec", train_time)
+            mlflow.log_metric("predict_time_sec", predict_time)
+            mlflow.log_param("decision_threshold", threshold)
+            if params and model_name in params:
+                mlflow.log_params(params[model_name])
 
             # --- Guardar modelo ---
             mlflow.sklearn.log_model(model, artifact_path="model")
@@ -56,9 +95,27 @@ def train_and_log_models():
             os.makedirs("models", exist_ok=True)
             local_model_path = f"models/{model_name}.pkl"
             joblib.dump(model, local_model_path)
+            save_model_metadata(
+                local_model_path,
+                decision_threshold=threshold,
+                train_time_sec=train_time,
+                predict_time_sec=predict_time,
+                metrics=metrics,
+                run_id=run.info.run_id,
+            )
             logger.info(f"Modelo '{model_name}' guardado localmente en {local_model_path}")
 
+            trained[model_name] = {
+                "model": model,
+                "metrics": metrics,
+                "train_time_sec": train_time,
+                "predict_time_sec": predict_time,
+                "decision_threshold": threshold,
+                "run_id": run.info.run_id,
+            }
+
     logger.info("=== Entrenamiento completado ===")
+    return trained
 
 
 if __name__ == "__main__":
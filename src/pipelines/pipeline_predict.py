@@ -1,62 +1,249 @@
+import argparse
+import json
 import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 import pandas as pd
 import joblib
 from mlflow import sklearn as mlflow_sklearn
+from src.features.feature_engineering import load_serving_pipeline
+from src.models.model_utils import load_model_threshold, score_model
 from src.utils.logger import get_logger
+from src.utils.storage import ChunkedTableWriter
 
 logger = get_logger(__name__)
 
 MODEL_PATH = "models/feature_pipeline.pkl"
+COMPILED_PIPELINE_PATH = "models/feature_pipeline_compiled.pkl"
+LOCAL_MODEL_PATH = "models/local_best_model.pkl"
 DATA_PATH = "data/new_data.csv"          # archivo con nuevos clientes o registros
 OUTPUT_PATH = "data/predictions.csv"
 
+# Tamaño de bloque por defecto cuando se usan varios workers
+DEFAULT_PARALLEL_CHUNKSIZE = 50_000
 
-def run_prediction_pipeline():
-    """
-    Carga el modelo final y genera predicciones para nuevos datos.
-    """
-    logger.info("=== Iniciando pipeline de predicciones ===")
+# Artefactos cargados una sola vez por proceso worker (ver _init_worker)
+_worker_artifacts = None
 
-    if not os.path.exists(MODEL_PATH):
-        raise FileNotFoundError("No se encontró el pipeline de features.")
-    if not os.path.exists(DATA_PATH):
-        raise FileNotFoundError("No se encontró el archivo de nuevos datos.")
 
-    # --- 1️⃣ Cargar pipeline de features y modelo ---
+def load_prediction_artifacts():
+    """
+    Carga el pipeline de features, el modelo final y su umbral de decisión.
+    """
     logger.info("Cargando pipeline de features...")
-    feature_pipeline = joblib.load(MODEL_PATH)
+    feature_pipeline = load_serving_pipeline(MODEL_PATH, COMPILED_PIPELINE_PATH)
 
     logger.info("Cargando modelo de MLflow...")
     # Aquí podrías usar MLflow Registry directamente si estás conectado
     model_uri = "models:/membresia_premium_best_model/Production"
     try:
+        from src.models.model_registry import production_threshold
+
         model = mlflow_sklearn.load_model(model_uri)
+        # Umbral del run de la versión en Production (la metadata local puede ser de otro modelo)
+        threshold = production_threshold()
         logger.info("Modelo cargado desde MLflow Registry.")
     except Exception:
         logger.warning("No se encontró modelo en MLflow, cargando localmente.")
-        model = joblib.load("models/local_best_model.pkl")
+        model = joblib.load(LOCAL_MODEL_PATH)
+        threshold = load_model_threshold(LOCAL_MODEL_PATH)
 
-    # --- 2️⃣ Transformar nuevos datos ---
-    df_new = pd.read_csv(DATA_PATH)
-    df_transformed = feature_pipeline.transform(df_new)
+    return feature_pipeline, model, threshold
 
-    # --- 3️⃣ Generar predicciones ---
-    preds = model.predict(df_transformed)
-    preds_proba = (
-        model.predict_proba(df_transformed)[:, 1] if hasattr(model, "predict_proba") else None
-    )
 
-    df_new["prediccion"] = preds
+def predict_chunk(df_chunk, feature_pipeline, model, threshold):
+    """
+    Transforma y puntúa un bloque de datos; agrega las columnas de predicción.
+    """
+    if df_chunk.empty:
+        # Entrada solo con encabezado: los modelos no aceptan 0 filas, la salida sí
+        df_chunk["prediccion"] = pd.Series(dtype="int64")
+        if hasattr(model, "predict_proba"):
+            df_chunk["probabilidad"] = pd.Series(dtype="float64")
+        return df_chunk
+
+    df_transformed = feature_pipeline.transform(df_chunk)
+    preds, preds_proba = score_model(model, df_transformed, threshold)
+
+    df_chunk["prediccion"] = preds
     if preds_proba is not None:
-        df_new["probabilidad"] = preds_proba
+        df_chunk["probabilidad"] = preds_proba
+    return df_chunk
+
+
+def _init_worker():
+    global _worker_artifacts
+    _worker_artifacts = load_prediction_artifacts()
+
+
+def _predict_chunk_in_worker(df_chunk):
+    return predict_chunk(df_chunk, *_worker_artifacts)
+
+
+def _parallel_predict(reader, workers):
+    """
+    Puntúa los bloques en un pool de procesos y los devuelve en el orden de entrada.
+
+    Se mantienen como máximo `2 * workers` bloques en vuelo para acotar la memoria.
+    """
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+        pending = deque()
+        for df_chunk in reader:
+            pending.append(executor.submit(_predict_chunk_in_worker, df_chunk))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def _checkpoint_path(output_path):
+    return f"{output_path.rstrip('/')}.checkpoint.json"
+
+
+def _input_signature(data_path, chunksize):
+    stat = os.stat(data_path)
+    return {
+        "input": os.path.abspath(data_path),
+        "size": stat.st_size,
+        "mtime": stat.st_mtime,
+        "chunksize": chunksize,
+    }
 
-    # --- 4️⃣ Guardar resultados ---
-    os.makedirs(os.path.dirname(OUTPUT_PATH), exist_ok=True)
-    df_new.to_csv(OUTPUT_PATH, index=False)
-    logger.info(f"Predicciones guardadas en {OUTPUT_PATH}")
+
+def _load_checkpoint(output_path, signature):
+    path = _checkpoint_path(output_path)
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        checkpoint = json.load(f)
+    if checkpoint.get("signature") != signature:
+        logger.warning(
+            "El checkpoint no corresponde a la entrada o al tamaño de bloque. Se reinicia."
+        )
+        return None
+    return checkpoint
+
+
+def _save_checkpoint(output_path, checkpoint):
+    path = _checkpoint_path(output_path)
+    with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+        json.dump(checkpoint, f)
+    os.replace(f"{path}.tmp", path)
+
+
+def run_prediction_pipeline(
+    data_path=DATA_PATH,
+    output_path=OUTPUT_PATH,
+    chunksize=None,
+    output_format=None,
+    resume=False,
+    workers=1,
+):
+    """
+    Carga el modelo final y genera predicciones para nuevos datos.
+
+    Args:
+        data_path (str): CSV de entrada con nuevos clientes.
+        output_path (str): Archivo CSV o directorio Parquet de salida.
+        chunksize (int): Filas por bloque. Si es None se procesa todo el archivo de una vez;
+            si se indica, la entrada se lee y escribe por bloques (memoria acotada).
+        output_format (str): 'csv' o 'parquet'. Por defecto se deduce de `output_path`.
+        resume (bool): Reanuda desde el último bloque completo registrado en el checkpoint.
+        workers (int): Procesos para puntuar en paralelo. Cada worker carga el pipeline y
+            el modelo una sola vez; la salida conserva el orden de la entrada.
+    """
+    logger.info("=== Iniciando pipeline de predicciones ===")
+
+    if not os.path.exists(MODEL_PATH):
+        raise FileNotFoundError("No se encontró el pipeline de features.")
+    if not os.path.exists(data_path):
+        raise FileNotFoundError("No se encontró el archivo de nuevos datos.")
+
+    if workers > 1 and not chunksize:
+        chunksize = DEFAULT_PARALLEL_CHUNKSIZE
+
+    # --- 1️⃣ Cargar pipeline de features y modelo (en los workers si workers > 1) ---
+    if workers <= 1:
+        feature_pipeline, model, threshold = load_prediction_artifacts()
+
+    # --- 2️⃣ Preparar salida (y checkpoint si se reanuda) ---
+    writer = ChunkedTableWriter(output_path, output_format)
+    signature = _input_signature(data_path, chunksize)
+    checkpoint = _load_checkpoint(output_path, signature) if resume else None
+
+    if checkpoint:
+        writer.restore(checkpoint["state"])
+        logger.info(
+            f"Reanudando desde el bloque {checkpoint['state']['chunks_done']} "
+            f"({checkpoint['rows_done']} filas ya procesadas)"
+        )
+    else:
+        writer.reset()
+        checkpoint = {"signature": signature, "rows_done": 0, "state": {"chunks_done": 0}}
+
+    # --- 3️⃣ Transformar y puntuar por bloques ---
+    rows_done = checkpoint["rows_done"]
+    skiprows = range(1, rows_done + 1) if rows_done else None
+    if chunksize:
+        reader = pd.read_csv(data_path, chunksize=chunksize, skiprows=skiprows)
+    else:
+        reader = [pd.read_csv(data_path)]
+
+    if workers > 1:
+        logger.info(f"Puntuando en paralelo con {workers} workers (bloques de {chunksize} filas)")
+        scored_chunks = _parallel_predict(reader, workers)
+    else:
+        scored_chunks = (
+            predict_chunk(df_chunk, feature_pipeline, model, threshold) for df_chunk in reader
+        )
+
+    start_time = time.time()
+    rows_this_run = 0
+    for chunk_index, df_chunk in enumerate(scored_chunks, start=checkpoint["state"]["chunks_done"]):
+        # --- 4️⃣ Guardar resultados del bloque ---
+        state = writer.write(df_chunk, chunk_index)
+        rows_done += len(df_chunk)
+        rows_this_run += len(df_chunk)
+        _save_checkpoint(
+            output_path, {"signature": signature, "rows_done": rows_done, "state": state}
+        )
+
+        elapsed = time.time() - start_time
+        logger.info(
+            f"Bloque {chunk_index} completado: {rows_done} filas procesadas "
+            f"({rows_this_run / max(elapsed, 1e-9):.0f} filas/s)"
+        )
+
+    # Sin bloques (entrada solo con encabezado) no llega a escribirse el checkpoint
+    if os.path.exists(_checkpoint_path(output_path)):
+        os.remove(_checkpoint_path(output_path))
+    logger.info(f"Predicciones guardadas en {output_path}")
 
     logger.info("=== Pipeline de predicción completado ===")
 
 
 if __name__ == "__main__":
-    run_prediction_pipeline()
+    parser = argparse.ArgumentParser(description="Genera predicciones para nuevos clientes.")
+    parser.add_argument("--input", default=DATA_PATH, help="CSV de entrada.")
+    parser.add_argument("--output", default=OUTPUT_PATH, help="CSV o directorio Parquet de salida.")
+    parser.add_argument(
+        "--chunksize", type=int, default=None, help="Filas por bloque (modo streaming)."
+    )
+    parser.add_argument(
+        "--format", choices=["csv", "parquet"], default=None, help="Formato de salida."
+    )
+    parser.add_argument(
+        "--resume", action="store_true", help="Reanuda desde el último bloque completo."
+    )
+    parser.add_argument("--workers", type=int, default=1, help="Procesos para puntuar en paralelo.")
+    args = parser.parse_args()
+
+    run_prediction_pipeline(
+        data_path=args.input,
+        output_path=args.output,
+        chunksize=args.chunksize,
+        output_format=args.format,
+        resume=args.resume,
+        workers=args.workers,
+    )
@@ -1,50 +1,219 @@
+import argparse
 import os
-from src.data.preprocess_data import preprocess_data
-from src.features.feature_engineering import build_feature_pipeline
+from src.data import preprocess_data as preprocess_module
+from src.data.load_data import default_raw_path
+from src.deployment import bundle
+from src.deployment.bundle import BUNDLE_PATH
+from src.data.preprocess_data import PREPROCESS_CHUNKSIZE, preprocess_data
+from src.features import feature_engineering as features_module
+from src.features.feature_engineering import (
+    COMPILED_PIPELINE_PATH,
+    PIPELINE_PATH,
+    TEST_PATH,
+    TRAIN_PATH,
+    build_feature_pipeline,
+)
+from src.models import hyperparameter_search, model_eval, model_registry, train_model
 from src.models.train_model import train_and_log_models
-from src.models.model_eval import evaluate_models
+from src.models.hyperparameter_search import (
+    BEST_PARAMS_PATH,
+    SEARCH_ETA,
+    SEARCH_MAX_ROWS,
+    SEARCH_METRIC,
+    SEARCH_MIN_BUDGET,
+    SEARCH_N_CANDIDATES,
+    SEARCH_STRATEGY,
+    load_best_params,
+    search_hyperparameters,
+)
+from src.models.model_eval import CURVES_DIR, CV_FOLDS, THRESHOLDS_PATH, evaluate_models
+from src.models.model_metrics import (
+    FALSE_NEGATIVE_COST,
+    FALSE_POSITIVE_COST,
+    N_BOOTSTRAP,
+    THRESHOLD_OBJECTIVE,
+)
 from src.models.model_registry import register_best_model
+from src.models.model_utils import DECISION_THRESHOLD, N_JOBS, get_metadata_path, get_model_dict
+from src.pipelines.stage_cache import StageCache, code_dependencies
+from src.utils.storage import DATA_FORMAT, SPARSE_FEATURES, features_path, with_format
 from src.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
-def run_training_pipeline():
+PROCESSED_PATH = "data/processed/restaurantes_USA_clean.csv"
+EVALUATION_OUTPUTS = ["reports/model_evaluation.csv", "reports/model_summary.md"]
+BEST_MODEL_PATH = "models/local_best_model.pkl"
+# Búsqueda de hiperparámetros antes de entrenar (ver src/models/hyperparameter_search.py)
+RUN_SEARCH = os.getenv("RUN_SEARCH", "false").lower() in ("1", "true", "yes")
+
+
+def _model_outputs():
+    paths = [f"models/{name}.pkl" for name in get_model_dict()]
+    return paths + [get_metadata_path(path) for path in paths]
+
+
+def _feature_outputs(sparse, data_format):
+    outputs = [PIPELINE_PATH, COMPILED_PIPELINE_PATH]
+    for path in (TRAIN_PATH, TEST_PATH):
+        path = features_path(path, sparse, data_format)
+        outputs.append(path)
+        if sparse:
+            outputs.append(f"{os.path.splitext(path)[0]}.columns.json")
+    return outputs
+
+
+def run_training_pipeline(
+    n_jobs=N_JOBS, run_cv=True, sparse=SPARSE_FEATURES, force=False, cache=None, search=RUN_SEARCH
+):
     """
     Orquesta todo el flujo de entrenamiento de modelos ML:
     1. Carga de datos desde GCP
     2. Preprocesamiento
     3. Feature Engineering
-    4. Entrenamiento + Tracking
+    4. Búsqueda de hiperparámetros (opcional) + Entrenamiento + Tracking
     5. Evaluación + Registro del mejor modelo
+
+    Cada etapa declara sus entradas, parámetros y código (su módulo y todo lo que
+    importa de `src`); si nada cambió desde una ejecución anterior, sus salidas se
+    restauran desde la caché de etapas.
+
+    Args:
+        n_jobs (int): Workers para entrenamiento y validación cruzada (-1 = todos los núcleos).
+        run_cv (bool): Si True, la evaluación agrega el F1 de validación cruzada.
+        sparse (bool): Si True, el one-hot se mantiene disperso (CSR) de punta a punta.
+        force (bool): Si True, ejecuta todas las etapas ignorando la caché.
+        cache (StageCache): Caché de etapas (por defecto, la configurada por entorno).
+        search (bool): Si True, busca hiperparámetros (successive halving / Hyperband)
+            y entrena con los mejores encontrados.
     """
     logger.info("=== Iniciando pipeline completo de entrenamiento ===")
+    cache = cache or StageCache()
+    data_format = DATA_FORMAT
 
     # --- 1️⃣ Carga de datos ---
-    raw_path = "data/raw/base_datos_restaurantes_USA_v2.csv"
+    # RAW_DATA_PATH, el directorio Parquet extraído de BigQuery (ver src/data/load_data.py)
+    # o el CSV local
+    raw_path = default_raw_path()
     if not os.path.exists(raw_path):
         raise FileNotFoundError(f"No se encontró el dataset local en {raw_path}")
     logger.info(f"Usando dataset local desde {raw_path}")
 
     # --- 2️⃣ Preprocesamiento ---
     logger.info("Ejecutando preprocesamiento...")
-    preprocess_data(input_path=raw_path, output_path="data/processed/restaurantes_USA_clean.csv")
+    processed_path = with_format(PROCESSED_PATH, data_format)
+    cache.run(
+        "preprocess",
+        lambda: preprocess_data(
+            input_path=raw_path, output_path=PROCESSED_PATH, data_format=data_format
+        ),
+        outputs=[processed_path],
+        inputs=[raw_path],
+        params={"data_format": data_format, "chunksize": PREPROCESS_CHUNKSIZE},
+        code=code_dependencies(preprocess_module),
+        force=force,
+    )
 
     # --- 3️⃣ Feature Engineering ---
     logger.info("Ejecutando feature engineering...")
-    build_feature_pipeline()
+    feature_outputs = _feature_outputs(sparse, data_format)
+    cache.run(
+        "features",
+        lambda: build_feature_pipeline(data_format=data_format, sparse=sparse),
+        outputs=feature_outputs,
+        inputs=[processed_path],
+        params={"data_format": data_format, "sparse": sparse},
+        code=code_dependencies(features_module),
+        force=force,
+    )
+
+    # Las matrices de features y el pipeline ajustado (sus categorías definen los
+    # bloques categóricos de hist_gradient_boosting)
+    train_inputs = feature_outputs[2:] + [PIPELINE_PATH]
+
+    # --- 4️⃣ Búsqueda de hiperparámetros + Entrenamiento + MLflow ---
+    if search:
+        logger.info("Buscando hiperparámetros...")
+        # Si se interrumpe, la etapa se vuelve a ejecutar y retoma la bitácora de trials
+        cache.run(
+            "search",
+            lambda: search_hyperparameters(sparse=sparse, n_jobs=n_jobs),
+            outputs=[BEST_PARAMS_PATH],
+            inputs=train_inputs,
+            params={
+                "sparse": sparse,
+                "strategy": SEARCH_STRATEGY,
+                "eta": SEARCH_ETA,
+                "n_candidates": SEARCH_N_CANDIDATES,
+                "min_budget": SEARCH_MIN_BUDGET,
+                "max_rows": SEARCH_MAX_ROWS,
+                "metric": SEARCH_METRIC,
+            },
+            code=code_dependencies(hyperparameter_search),
+            force=force,
+        )
 
-    # --- 4️⃣ Entrenamiento + MLflow ---
     logger.info("Entrenando modelos y registrando en MLflow...")
-    train_and_log_models()
+    model_outputs = _model_outputs()
+    trained, _ = cache.run(
+        "train",
+        lambda: train_and_log_models(
+            n_jobs=n_jobs, sparse=sparse, params=load_best_params() if search else None
+        ),
+        outputs=model_outputs,
+        inputs=train_inputs + ([BEST_PARAMS_PATH] if search else []),
+        params={"sparse": sparse, "threshold": DECISION_THRESHOLD, "search": search},
+        code=code_dependencies(train_model),
+        force=force,
+    )
 
     # --- 5️⃣ Evaluación y Registro ---
     logger.info("Evaluando modelos...")
-    evaluate_models()
+    # Reutiliza los modelos ya ajustados (o los restaurados desde la caché): no se reentrena
+    evaluation_outputs = EVALUATION_OUTPUTS
+    if THRESHOLD_OBJECTIVE != "none":
+        evaluation_outputs = evaluation_outputs + [THRESHOLDS_PATH, CURVES_DIR]
+    cache.run(
+        "evaluate",
+        lambda: evaluate_models(trained=trained, run_cv=run_cv, n_jobs=n_jobs, sparse=sparse),
+        outputs=evaluation_outputs,
+        inputs=train_inputs + model_outputs,
+        params={
+            "run_cv": run_cv,
+            "sparse": sparse,
+            "n_bootstrap": N_BOOTSTRAP,
+            "threshold_objective": THRESHOLD_OBJECTIVE,
+            "costs": [FALSE_POSITIVE_COST, FALSE_NEGATIVE_COST],
+            "cv_folds": CV_FOLDS,
+        },
+        code=code_dependencies(model_eval),
+        force=force,
+    )
     logger.info("Registrando mejor modelo...")
-    register_best_model()
+    cache.run(
+        "register",
+        register_best_model,
+        outputs=[BEST_MODEL_PATH, get_metadata_path(BEST_MODEL_PATH), BUNDLE_PATH],
+        # El bundle de serving empaqueta también el pipeline de features
+        inputs=model_outputs + evaluation_outputs + [PIPELINE_PATH, COMPILED_PIPELINE_PATH],
+        code=code_dependencies(model_registry, bundle),
+        force=force,
+    )
 
     logger.info("=== Pipeline de entrenamiento completado exitosamente ===")
 
 
 if __name__ == "__main__":
-    run_training_pipeline()
+    parser = argparse.ArgumentParser(description="Pipeline de entrenamiento de membresías premium.")
+    parser.add_argument(
+        "--force", action="store_true", help="Ejecuta todas las etapas ignorando la caché."
+    )
+    parser.add_argument(
+        "--no-cv", action="store_true", help="Omite la validación cruzada en la evaluación."
+    )
+    parser.add_argument(
+        "--search", action="store_true", help="Busca hiperparámetros antes de entrenar."
+    )
+    args = parser.parse_args()
+
+    run_training_pipeline(run_cv=not args.no_cv, force=args.force, search=args.search or RUN_SEARCH)
@@ -1,7 +1,8 @@
 import os
 import sys
-import pandas as pd
+from src.data.load_data import default_raw_path
 from src.utils.logger import get_logger
+from src.utils.storage import read_table, with_format
 
 logger = get_logger(__name__)
 
@@ -11,9 +12,10 @@ def validate_environment():
     """
     logger.info("=== Iniciando validaciones del entorno ===")
 
+    processed_path = with_format("data/processed/restaurantes_USA_clean.csv")
     required_files = [
-        "data/raw/base_datos_restaurantes_USA_v2.csv",
-        "data/processed/restaurantes_USA_clean.csv",
+        default_raw_path(),
+        processed_path,
         "models/feature_pipeline.pkl"
     ]
 
@@ -25,7 +27,7 @@ def validate_environment():
         logger.info("✅ Todos los archivos requeridos existen.")
 
     # Validar columnas mínimas
-    df = pd.read_csv("data/processed/restaurantes_USA_clean.csv")
+    df = read_table(processed_path)
     expected_cols = [
         "edad", "frecuencia_visita", "promedio_gasto_comida",
         "ingresos_mensuales", "membresia_premium"
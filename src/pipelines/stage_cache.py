@@ -0,0 +1,251 @@
+import ast
+import hashlib
+import importlib.util
+import json
+import os
+import shutil
+import time
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+CACHE_DIR = os.getenv("STAGE_CACHE_DIR", ".cache/stages")
+CACHE_MAX_MB = float(os.getenv("STAGE_CACHE_MAX_MB", "2048"))
+CACHE_MAX_AGE_DAYS = float(os.getenv("STAGE_CACHE_MAX_AGE_DAYS", "30"))
+
+MANIFEST = "manifest.json"
+
+
+def hash_file(path, block_size=1 << 20):
+    """SHA-256 del contenido de un archivo (o de todos los archivos de un directorio)."""
+    digest = hashlib.sha256()
+    if os.path.isdir(path):
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for name in sorted(files):
+                file_path = os.path.join(root, name)
+                digest.update(f"{os.path.relpath(file_path, path)}:{hash_file(file_path)}".encode())
+        return digest.hexdigest()
+
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _copy(src, dst):
+    """Copia un archivo o un directorio (p. ej. Parquet particionado) reemplazando el destino."""
+    if os.path.isdir(dst):
+        shutil.rmtree(dst)
+    elif os.path.exists(dst):
+        os.remove(dst)
+
+    if os.path.isdir(src):
+        shutil.copytree(src, dst)
+    else:
+        shutil.copy2(src, dst)
+
+
+def _size(path):
+    if not os.path.isdir(path):
+        return os.path.getsize(path)
+    return sum(
+        os.path.getsize(os.path.join(root, name))
+        for root, _, files in os.walk(path)
+        for name in files
+    )
+
+
+def _module_file(name):
+    try:
+        spec = importlib.util.find_spec(name)
+    except (ImportError, ValueError):
+        return None
+    return spec.origin if spec and spec.origin and spec.origin.endswith(".py") else None
+
+
+def _imported_names(path, package):
+    """Módulos importados por un archivo (incluye imports dentro de funciones y relativos)."""
+    with open(path, "r", encoding="utf-8") as f:
+        tree = ast.parse(f.read(), filename=path)
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            yield from (alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            base = node.module or ""
+            if node.level:
+                parent = package.rsplit(".", node.level - 1)[0] if node.level > 1 else package
+                base = f"{parent}.{base}" if base else parent
+            yield base
+            # `from src.models import model_eval`: el nombre puede ser un submódulo
+            yield from (f"{base}.{alias.name}" for alias in node.names)
+
+
+def code_dependencies(*modules, root="src"):
+    """
+    Archivos fuente de `modules` y de todo lo que importan, transitivamente, dentro
+    del paquete `root`. Sirve como `code=` de una etapa: editar cualquier módulo
+    del que depende la etapa (p. ej. las listas de features) invalida su caché.
+
+    Args:
+        modules: Módulos (objetos o nombres) de los que parte el recorrido.
+    """
+    pending = [module if isinstance(module, str) else module.__name__ for module in modules]
+    seen, files = set(), set()
+    while pending:
+        name = pending.pop()
+        if name in seen or not (name == root or name.startswith(f"{root}.")):
+            continue
+        seen.add(name)
+        path = _module_file(name)
+        if path is None:
+            continue
+        files.add(path)
+        # Los paquetes (`__init__.py`) resuelven sus imports relativos contra sí mismos
+        package = name if path.endswith("__init__.py") else name.rpartition(".")[0]
+        pending.extend(_imported_names(path, package))
+        if "." in name:
+            pending.append(name.rpartition(".")[0])
+    return sorted(files)
+
+
+def hash_inputs(stage, inputs=(), params=None, code=()):
+    """
+    Clave de una etapa: hash de sus archivos de entrada, parámetros y código fuente.
+
+    Args:
+        stage (str): Nombre de la etapa.
+        inputs (list): Archivos de datos/artefactos que consume la etapa.
+        params (dict): Parámetros que afectan el resultado (serializables a JSON).
+        code (list): Archivos de código cuya modificación invalida la etapa.
+    """
+    digest = hashlib.sha256(stage.encode())
+    for kind, paths in (("input", inputs), ("code", code)):
+        for path in sorted(paths):
+            if not os.path.exists(path):
+                raise FileNotFoundError(f"Entrada de la etapa '{stage}' no encontrada: {path}")
+            digest.update(f"{kind}:{path}:{hash_file(path)}".encode())
+    digest.update(json.dumps(params or {}, sort_keys=True, default=str).encode())
+    return digest.hexdigest()
+
+
+class StageCache:
+    """
+    Caché direccionada por contenido de las salidas de cada etapa del pipeline.
+
+    Cada entrada vive en `<cache_dir>/<etapa>/<clave>/` con una copia de los
+    archivos de salida y un `manifest.json` que se escribe al final (una entrada
+    sin manifest se considera incompleta). La política de desalojo elimina
+    entradas sin uso por más de `max_age_days` y, si se supera `max_mb`, las
+    usadas hace más tiempo.
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR, max_mb=CACHE_MAX_MB, max_age_days=CACHE_MAX_AGE_DAYS):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_mb * 1024**2
+        self.max_age_sec = max_age_days * 24 * 3600
+
+    def _entry_dir(self, stage, key):
+        return os.path.join(self.cache_dir, stage, key)
+
+    def restore(self, stage, key, outputs):
+        """
+        Copia las salidas cacheadas a sus rutas. Devuelve False si no hay entrada válida.
+        """
+        entry_dir = self._entry_dir(stage, key)
+        manifest_path = os.path.join(entry_dir, MANIFEST)
+        if not os.path.exists(manifest_path):
+            return False
+
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        if sorted(manifest["outputs"]) != sorted(outputs):
+            return False
+
+        for i, path in enumerate(manifest["outputs"]):
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            _copy(os.path.join(entry_dir, str(i)), path)
+
+        # Marca de último uso para la política LRU
+        os.utime(manifest_path)
+        return True
+
+    def store(self, stage, key, outputs):
+        """
+        Guarda una copia de las salidas de la etapa bajo su clave.
+        """
+        entry_dir = self._entry_dir(stage, key)
+        tmp_dir = f"{entry_dir}.tmp"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+
+        for i, path in enumerate(outputs):
+            if not os.path.exists(path):
+                shutil.rmtree(tmp_dir)
+                raise FileNotFoundError(f"La etapa '{stage}' no generó la salida esperada: {path}")
+            _copy(path, os.path.join(tmp_dir, str(i)))
+
+        with open(os.path.join(tmp_dir, MANIFEST), "w", encoding="utf-8") as f:
+            json.dump(
+                {"stage": stage, "key": key, "outputs": list(outputs), "created": time.time()}, f
+            )
+
+        shutil.rmtree(entry_dir, ignore_errors=True)
+        os.replace(tmp_dir, entry_dir)
+
+    def _entries(self):
+        entries = []
+        if not os.path.isdir(self.cache_dir):
+            return entries
+        for stage in os.listdir(self.cache_dir):
+            stage_dir = os.path.join(self.cache_dir, stage)
+            if not os.path.isdir(stage_dir):
+                continue
+            for key in os.listdir(stage_dir):
+                entry_dir = os.path.join(stage_dir, key)
+                manifest_path = os.path.join(entry_dir, MANIFEST)
+                if not os.path.exists(manifest_path):
+                    continue
+                entries.append((os.path.getmtime(manifest_path), _size(entry_dir), entry_dir))
+        return entries
+
+    def evict(self):
+        """
+        Aplica la política de desalojo por antigüedad y luego por tamaño (LRU).
+        """
+        now = time.time()
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+
+        for last_used, size, entry_dir in entries:
+            if now - last_used > self.max_age_sec or total > self.max_bytes:
+                shutil.rmtree(entry_dir, ignore_errors=True)
+                total -= size
+                removed += 1
+
+        if removed:
+            logger.info(
+                f"Caché de etapas: {removed} entradas desalojadas ({total / 1024**2:.1f} MB en uso)"
+            )
+
+    def run(self, stage, fn, outputs, inputs=(), params=None, code=(), force=False):
+        """
+        Ejecuta `fn` solo si las entradas de la etapa cambiaron; si no, restaura sus salidas.
+
+        Returns:
+            tuple: (resultado de `fn` o None si se usó la caché, True si hubo acierto de caché).
+        """
+        key = hash_inputs(stage, inputs, params, code)
+
+        if not force and self.restore(stage, key, outputs):
+            logger.info(
+                f"Etapa '{stage}' sin cambios ({key[:12]}): salidas restauradas desde caché."
+            )
+            return None, True
+
+        result = fn()
+        self.store(stage, key, outputs)
+        self.evict()
+        logger.info(f"Etapa '{stage}' ejecutada y cacheada ({key[:12]}).")
+        return result, False
@@ -1,17 +1,184 @@
+import atexit
 import logging
+import multiprocessing
 import os
-from datetime import datetime
+import queue
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pythonjsonlogger import jsonlogger
 
+# Un solo archivo de log compartido por todos los módulos, rotado por tamaño
+LOG_DIR = os.getenv("LOG_DIR", "logs")
+LOG_FILE = os.getenv("LOG_FILE", "pipeline.log")
+LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", str(10 * 1024**2)))
+LOG_BACKUP_COUNT = int(os.getenv("LOG_BACKUP_COUNT", "5"))
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_JSON = os.getenv("LOG_JSON", "false").lower() in ("1", "true", "yes")
 
-def get_logger(name: str, to_file: bool = True, json_format: bool = False) -> logging.Logger:
+# Registros por segundo y por línea de código en los loggers con límite (p. ej. por solicitud)
+LOG_RATE_LIMIT = float(os.getenv("LOG_RATE_LIMIT", "5"))
+
+_handler = None
+_listener = None
+_owner_pid = None
+# Proceso que configuró el logging por primera vez; un fork lo hereda
+_main_pid = None
+_lock = threading.Lock()
+
+
+def _build_formatter(json_format):
+    if json_format:
+        return jsonlogger.JsonFormatter(
+            fmt="%(asctime)s %(name)s %(levelname)s %(message)s",
+            datefmt="%Y-%m-%d %H:%M:%S",
+        )
+    return logging.Formatter(
+        fmt="%(asctime)s | %(levelname)-8s | %(name)s | %(message)s",
+        datefmt="%Y-%m-%d %H:%M:%S",
+    )
+
+
+def _in_child_process():
+    """
+    True en workers de multiprocessing/loky (spawn o fork) y en forks directos.
+    """
+    return multiprocessing.parent_process() is not None or (
+        _main_pid is not None and os.getpid() != _main_pid
+    )
+
+
+class _ProcessQueueHandler(QueueHandler):
+    """
+    QueueHandler que vuelve a iniciar el listener en un proceso hijo: tras un
+    fork (workers de predicción, joblib) el hilo del listener no existe y los
+    registros quedarían en una cola que nadie consume. En el hijo el listener
+    solo escribe en consola (ver configure_logging).
+    """
+
+    def emit(self, record):
+        if os.getpid() != _owner_pid:
+            configure_logging(force=True)
+        super().emit(record)
+
+    def prepare(self, record):
+        # La cola no sale del proceso: basta con resolver el mensaje. El formato
+        # (fecha, nivel, traceback) lo aplica el hilo del listener, no quien loguea.
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+def configure_logging(to_file=True, json_format=LOG_JSON, level=LOG_LEVEL, force=False):
+    """
+    Configura el backend de logging compartido por todos los loggers.
+
+    Los módulos solo encolan registros (QueueHandler); un hilo en segundo plano
+    (QueueListener) los escribe en consola y en un único archivo rotativo
+    `LOG_DIR/LOG_FILE`. Así una llamada de log en la ruta de /predict no espera
+    por el disco. Si ya está configurado, no hace nada (salvo `force=True`).
+
+    Solo el proceso principal escribe el archivo: los procesos hijos (workers de
+    pipeline_predict, joblib/loky, forks) loguean únicamente en consola, porque
+    varios RotatingFileHandler sobre el mismo archivo pierden o pisan registros
+    al rotar.
+    """
+    global _handler, _listener, _owner_pid, _main_pid
+
+    with _lock:
+        if _listener is not None and not force:
+            return _handler
+        if _listener is not None and _owner_pid == os.getpid():
+            _listener.stop()
+        if _main_pid is None:
+            _main_pid = os.getpid()
+
+        formatter = _build_formatter(json_format)
+        handlers = [logging.StreamHandler()]
+        if to_file and not _in_child_process():
+            os.makedirs(LOG_DIR, exist_ok=True)
+            handlers.append(
+                RotatingFileHandler(
+                    os.path.join(LOG_DIR, LOG_FILE),
+                    maxBytes=LOG_MAX_BYTES,
+                    backupCount=LOG_BACKUP_COUNT,
+                    encoding="utf-8",
+                    delay=True,
+                )
+            )
+        for handler in handlers:
+            handler.setFormatter(formatter)
+
+        log_queue = queue.SimpleQueue()
+        if _handler is None:
+            _handler = _ProcessQueueHandler(log_queue)
+        else:
+            # Los loggers ya creados conservan el mismo handler; solo cambia su cola
+            _handler.queue = log_queue
+        _handler.setLevel(level)
+
+        _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+        _listener.start()
+        _owner_pid = os.getpid()
+        return _handler
+
+
+def shutdown_logging():
+    """Vacía la cola y detiene el listener (se llama automáticamente al salir)."""
+    global _listener
+    with _lock:
+        if _listener is not None and _owner_pid == os.getpid():
+            _listener.stop()
+        _listener = None
+
+
+atexit.register(shutdown_logging)
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Deja pasar como máximo `rate` registros por segundo por cada línea de código
+    (token bucket con ráfaga `burst`). Al reanudarse, el siguiente registro indica
+    cuántos se omitieron. Pensado para logs por solicitud o por lote.
+    """
+
+    def __init__(self, rate=LOG_RATE_LIMIT, burst=None):
+        super().__init__()
+        self.rate = rate
+        self.burst = burst or max(1.0, rate)
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        key = (record.pathname, record.lineno)
+        now = time.monotonic()
+        with self._lock:
+            tokens, last, suppressed = self._buckets.get(key, (self.burst, now, 0))
+            tokens = min(self.burst, tokens + (now - last) * self.rate)
+            if tokens < 1:
+                self._buckets[key] = (tokens, now, suppressed + 1)
+                return False
+            self._buckets[key] = (tokens - 1, now, 0)
+
+        if suppressed:
+            record.msg = f"{record.getMessage()} (+{suppressed} registros similares omitidos)"
+            record.args = None
+        return True
+
+
+def get_logger(
+    name: str, to_file: bool = True, json_format: bool = LOG_JSON, rate_limit=None
+) -> logging.Logger:
     """
     Configura y devuelve un logger con formato profesional.
 
     Args:
         name (str): Nombre del módulo que crea el logger (usualmente __name__).
-        to_file (bool): Si True, también escribe en un archivo rotativo.
+        to_file (bool): Si True, también escribe en el archivo rotativo compartido.
         json_format (bool): Si True, usa formato JSON (ideal para Jenkins/Docker logs).
+            `to_file` y `json_format` aplican al backend compartido: los fija el
+            primer logger creado (o `configure_logging`).
+        rate_limit (float): Registros por segundo por línea de código (ver RateLimitFilter).
     Returns:
         logging.Logger: Logger configurado.
     """
@@ -21,34 +188,9 @@ def get_logger(name: str, to_file: bool = True, json_format: bool = False) -> lo
     if logger.handlers:
         return logger
 
-    logger.setLevel(logging.INFO)
-
-    # === FORMATO ===
-    if json_format:
-        formatter = jsonlogger.JsonFormatter(
-            fmt="%(asctime)s %(name)s %(levelname)s %(message)s",
-            datefmt="%Y-%m-%d %H:%M:%S",
-        )
-    else:
-        formatter = logging.Formatter(
-            fmt="%(asctime)s | %(levelname)-8s | %(name)s | %(message)s",
-            datefmt="%Y-%m-%d %H:%M:%S",
-        )
-
-    # === CONSOLA ===
-    console_handler = logging.StreamHandler()
-    console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
-
-    # === ARCHIVO ===
-    if to_file:
-        log_dir = "logs"
-        os.makedirs(log_dir, exist_ok=True)
-        log_filename = os.path.join(
-            log_dir, f"run_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log"
-        )
-        file_handler = logging.FileHandler(log_filename)
-        file_handler.setFormatter(formatter)
-        logger.addHandler(file_handler)
+    logger.setLevel(LOG_LEVEL)
+    logger.addHandler(configure_logging(to_file=to_file, json_format=json_format))
+    if rate_limit:
+        logger.addFilter(RateLimitFilter(rate_limit))
 
     return logger
@@ -0,0 +1,259 @@
+import glob
+import json
+import os
+import numpy as np
+import pandas as pd
+
+# Formatos de tablas intermedias (Parquet/Feather conservan dtypes, incluidas categorías)
+TABLE_FORMATS = ("csv", "parquet", "feather")
+# Formatos que admiten escritura incremental por bloques
+SUPPORTED_FORMATS = ("csv", "parquet")
+
+# Formato de las etapas del pipeline (data/processed/*)
+DATA_FORMAT = os.getenv("DATA_FORMAT", "csv")
+
+# Matrices de features dispersas (one-hot sin densificar) en .npz
+SPARSE_FEATURES = os.getenv("SPARSE_FEATURES", "false").lower() in ("1", "true", "yes")
+
+
+def infer_format(path: str) -> str:
+    """
+    Deduce el formato a partir de la extensión de la ruta (por defecto 'csv').
+    """
+    ext = os.path.splitext(path.rstrip("/"))[1].lower().lstrip(".")
+    return ext if ext in TABLE_FORMATS else "csv"
+
+
+def with_format(path: str, fmt: str = None) -> str:
+    """
+    Devuelve `path` con la extensión del formato configurado.
+
+    Ejemplo: with_format("data/processed/train_features.csv", "parquet")
+    -> "data/processed/train_features.parquet".
+    """
+    fmt = fmt or DATA_FORMAT
+    if fmt not in TABLE_FORMATS:
+        raise ValueError(f"Formato no soportado: {fmt}. Opciones: {TABLE_FORMATS}")
+    return f"{os.path.splitext(path)[0]}.{fmt}"
+
+
+def write_table(df: pd.DataFrame, path: str, fmt: str = None) -> str:
+    """
+    Guarda un DataFrame en CSV, Parquet o Feather (según `fmt` o la extensión).
+    """
+    fmt = fmt or infer_format(path)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    if fmt == "csv":
+        df.to_csv(path, index=False)
+    elif fmt == "parquet":
+        df.to_parquet(path, index=False)
+    elif fmt == "feather":
+        # Feather no admite índices arbitrarios
+        df.reset_index(drop=True).to_feather(path)
+    else:
+        raise ValueError(f"Formato no soportado: {fmt}. Opciones: {TABLE_FORMATS}")
+    return path
+
+
+def read_table(path: str, fmt: str = None, columns=None) -> pd.DataFrame:
+    """
+    Lee una tabla en CSV, Parquet (archivo o directorio particionado) o Feather.
+    """
+    fmt = fmt or ("parquet" if os.path.isdir(path) else infer_format(path))
+
+    if fmt == "csv":
+        return pd.read_csv(path, usecols=columns)
+    if fmt == "parquet":
+        return pd.read_parquet(path, columns=columns)
+    if fmt == "feather":
+        return pd.read_feather(path, columns=columns)
+    raise ValueError(f"Formato no soportado: {fmt}. Opciones: {TABLE_FORMATS}")
+
+
+def table_columns(path: str, fmt: str = None) -> list:
+    """
+    Nombres de columna de una tabla leyendo solo el encabezado/esquema.
+    """
+    fmt = fmt or ("parquet" if os.path.isdir(path) else infer_format(path))
+
+    if fmt == "csv":
+        return pd.read_csv(path, nrows=0).columns.tolist()
+    if fmt == "parquet":
+        import pyarrow.dataset as ds
+
+        names = ds.dataset(path, format="parquet").schema.names
+        return [name for name in names if not name.startswith("__index_level_")]
+    if fmt == "feather":
+        import pyarrow.feather as feather
+
+        return feather.read_table(path, memory_map=True).schema.names
+    raise ValueError(f"Formato no soportado: {fmt}. Opciones: {TABLE_FORMATS}")
+
+
+def iter_table_chunks(path: str, chunksize: int, columns=None, dtype=None, fmt: str = None):
+    """
+    Recorre una tabla por bloques de hasta `chunksize` filas sin cargarla completa.
+
+    Args:
+        dtype (dict): Tipos por columna (solo CSV; Parquet/Feather conservan su esquema).
+    """
+    fmt = fmt or ("parquet" if os.path.isdir(path) else infer_format(path))
+
+    if fmt == "csv":
+        yield from pd.read_csv(path, chunksize=chunksize, usecols=columns, dtype=dtype)
+    elif fmt in ("parquet", "feather"):
+        import pyarrow.dataset as ds
+
+        for batch in ds.dataset(path, format=fmt).to_batches(columns=columns, batch_size=chunksize):
+            yield batch.to_pandas()
+    else:
+        raise ValueError(f"Formato no soportado: {fmt}. Opciones: {TABLE_FORMATS}")
+
+
+def features_path(path: str, sparse: bool = None, fmt: str = None) -> str:
+    """
+    Ruta de una matriz de features: `.npz` si es dispersa; si no, la del formato configurado.
+    """
+    sparse = SPARSE_FEATURES if sparse is None else sparse
+    return f"{os.path.splitext(path)[0]}.npz" if sparse else with_format(path, fmt)
+
+
+def _columns_path(path: str) -> str:
+    return f"{os.path.splitext(path)[0]}.columns.json"
+
+
+def write_sparse_features(X, y, columns, path: str) -> str:
+    """
+    Guarda una matriz dispersa de features en `.npz` (con el target como última columna)
+    y los nombres de columna en un archivo `.columns.json` al lado.
+    """
+    from scipy import sparse as sp
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    target = sp.csr_matrix(np.asarray(y, dtype=X.dtype).reshape(-1, 1))
+    sp.save_npz(path, sp.hstack([X, target], format="csr"))
+    with open(_columns_path(path), "w", encoding="utf-8") as f:
+        json.dump(list(columns) + ["target"], f)
+    return path
+
+
+def read_features(path: str):
+    """
+    Lee una matriz de features y separa el target.
+
+    Returns:
+        tuple: (X, y). X es un DataFrame para tablas densas o una matriz CSR para `.npz`.
+    """
+    if path.endswith(".npz"):
+        from scipy import sparse as sp
+
+        matrix = sp.load_npz(path).tocsc()
+        y = pd.Series(matrix[:, -1].toarray().ravel().astype(int), name="target")
+        return matrix[:, :-1].tocsr(), y
+
+    df = read_table(path)
+    return df.drop(columns=["target"]), df["target"]
+
+
+def read_feature_columns(path: str):
+    """Nombres de columna de una matriz de features dispersa (sin el target)."""
+    with open(_columns_path(path), "r", encoding="utf-8") as f:
+        return json.load(f)[:-1]
+
+
+def _chunk_schema(schema):
+    """
+    Esquema común de los bloques Parquet a partir del primero: los diccionarios
+    (columnas 'category') pasan a índices int32, porque pyarrow elige el índice más
+    chico para las categorías del primer bloque (int8 con menos de 128), y las
+    columnas de texto sin ningún valor en el primer bloque (tipo null) pasan a string.
+    """
+    import pyarrow as pa
+
+    fields = []
+    for field in schema:
+        if pa.types.is_null(field.type):
+            field = field.with_type(pa.string())
+        elif pa.types.is_dictionary(field.type):
+            field = field.with_type(pa.dictionary(pa.int32(), field.type.value_type))
+        fields.append(field)
+    return pa.schema(fields, metadata=schema.metadata)
+
+
+class ChunkedTableWriter:
+    """
+    Escribe un DataFrame bloque a bloque sin mantener el resultado completo en memoria.
+
+    - CSV: se agrega cada bloque al final del archivo (encabezado solo en el primero).
+    - Parquet: `path` es un directorio con un archivo `part-XXXXX.parquet` por bloque,
+      todos con el esquema del primer bloque (categorías con índices int32 y texto
+      todo nulo como string, así un bloque posterior puede traer más categorías o
+      valores donde el primero no tenía; ver `_chunk_schema`).
+
+    El estado devuelto por `write` permite reanudar desde el último bloque completo
+    con `restore`.
+    """
+
+    def __init__(self, path: str, fmt: str = None):
+        self.path = path
+        self.fmt = fmt or infer_format(path)
+        if self.fmt not in SUPPORTED_FORMATS:
+            raise ValueError(f"Formato no soportado: {self.fmt}. Opciones: {SUPPORTED_FORMATS}")
+        self._schema = None
+
+    def _part_path(self, chunk_index: int) -> str:
+        return os.path.join(self.path, f"part-{chunk_index:05d}.parquet")
+
+    def reset(self):
+        """Elimina cualquier salida previa."""
+        if self.fmt == "csv":
+            if os.path.exists(self.path):
+                os.remove(self.path)
+        else:
+            for part in glob.glob(os.path.join(self.path, "part-*.parquet")):
+                os.remove(part)
+        self._schema = None
+
+    def restore(self, state: dict):
+        """
+        Descarta lo escrito después del último bloque completo registrado en `state`.
+        """
+        chunks_done = state.get("chunks_done", 0)
+        if chunks_done == 0:
+            self.reset()
+            return
+
+        if self.fmt == "csv":
+            with open(self.path, "r+b") as f:
+                f.truncate(state["bytes"])
+        else:
+            import pyarrow.parquet as pq
+
+            for part in glob.glob(os.path.join(self.path, "part-*.parquet")):
+                if int(os.path.basename(part)[5:10]) >= chunks_done:
+                    os.remove(part)
+            self._schema = _chunk_schema(pq.read_schema(self._part_path(0)))
+
+    def write(self, df: pd.DataFrame, chunk_index: int) -> dict:
+        """
+        Escribe un bloque y devuelve el estado necesario para reanudar.
+        """
+        if self.fmt == "csv":
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            df.to_csv(self.path, mode="a", header=chunk_index == 0, index=False)
+            return {"chunks_done": chunk_index + 1, "bytes": os.path.getsize(self.path)}
+
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        os.makedirs(self.path, exist_ok=True)
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        if self._schema is None:
+            self._schema = _chunk_schema(table.schema)
+        table = table.cast(self._schema)
+        # Se escribe a un temporal y se renombra: un bloque nunca queda a medias
+        part_path = self._part_path(chunk_index)
+        pq.write_table(table, f"{part_path}.tmp")
+        os.replace(f"{part_path}.tmp", part_path)
+        return {"chunks_done": chunk_index + 1}
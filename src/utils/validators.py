@@ -0,0 +1,140 @@
+import json
+import pandas as pd
+
+# === Esquema de entrada del cliente (mismo orden que ClientData) ===
+NUMERIC_FEATURES = ["edad", "frecuencia_visita", "promedio_gasto_comida", "ingresos_mensuales"]
+CATEGORICAL_FEATURES = [
+    "genero",
+    "ciudad_residencia",
+    "estrato_socioeconomico",
+    "ocio",
+    "consume_licor",
+    "preferencias_alimenticias",
+    "tipo_de_pago_mas_usado",
+]
+CLIENT_FEATURES = NUMERIC_FEATURES + CATEGORICAL_FEATURES
+
+# Máximo de filas inválidas reportadas por columna
+MAX_REPORTED_ROWS = 10
+
+
+class PayloadValidationError(ValueError):
+    """
+    Error de validación de un payload de clientes. `errors` contiene el detalle por columna.
+    """
+
+    def __init__(self, errors):
+        self.errors = errors
+        super().__init__(f"Payload inválido: {errors}")
+
+
+def payload_to_frame(payload) -> pd.DataFrame:
+    """
+    Convierte un payload de clientes en DataFrame sin instanciar un modelo por fila.
+
+    Args:
+        payload: Lista de registros (`[{campo: valor}, ...]`) o formato columnar
+            (`{campo: [valores], ...}`, un arreglo por campo de ClientData).
+    Returns:
+        pd.DataFrame: Datos validados con las columnas de CLIENT_FEATURES.
+    """
+    if isinstance(payload, list):
+        if not all(isinstance(record, dict) for record in payload):
+            raise PayloadValidationError(
+                [{"loc": "body", "msg": "Todos los registros deben ser objetos."}]
+            )
+        df = (
+            pd.DataFrame.from_records(payload) if payload else pd.DataFrame(columns=CLIENT_FEATURES)
+        )
+    elif isinstance(payload, dict):
+        if not all(isinstance(values, list) for values in payload.values()):
+            raise PayloadValidationError(
+                [{"loc": "body", "msg": "Cada campo debe ser un arreglo."}]
+            )
+        lengths = {len(values) for values in payload.values()}
+        if len(lengths) > 1:
+            raise PayloadValidationError(
+                [{"loc": "body", "msg": "Todos los arreglos deben tener la misma longitud."}]
+            )
+        df = pd.DataFrame(payload)
+    else:
+        raise PayloadValidationError(
+            [{"loc": "body", "msg": "Se esperaba una lista de registros o un objeto columnar."}]
+        )
+
+    return validate_client_frame(df)
+
+
+def ndjson_to_frame(lines, offset=0) -> pd.DataFrame:
+    """
+    Convierte un bloque de líneas NDJSON (un registro por línea) en DataFrame validado.
+
+    Args:
+        lines (list): Líneas del bloque (bytes o str), sin líneas vacías.
+        offset (int): Índice de la primera línea dentro del cuerpo completo; las
+            filas de los errores se reportan respecto al cuerpo, no al bloque.
+    Returns:
+        pd.DataFrame: Datos validados con las columnas de CLIENT_FEATURES.
+    """
+    records = []
+    for index, line in enumerate(lines):
+        try:
+            records.append(json.loads(line))
+        except json.JSONDecodeError as e:
+            raise PayloadValidationError(
+                [{"loc": "body", "msg": f"JSON inválido: {e}", "rows": [offset + index]}]
+            )
+
+    try:
+        return payload_to_frame(records)
+    except PayloadValidationError as e:
+        errors = [
+            dict(error, rows=[offset + row for row in error["rows"]]) if "rows" in error else error
+            for error in e.errors
+        ]
+        raise PayloadValidationError(errors)
+
+
+def validate_client_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Valida y normaliza tipos de un DataFrame de clientes de forma vectorizada.
+    """
+    missing_cols = [col for col in CLIENT_FEATURES if col not in df.columns]
+    if missing_cols:
+        raise PayloadValidationError(
+            [{"loc": col, "msg": "Campo requerido."} for col in missing_cols]
+        )
+
+    errors = []
+    validated = {}
+
+    for col in NUMERIC_FEATURES:
+        values = pd.to_numeric(df[col], errors="coerce").astype("float64")
+        invalid = values.isna().to_numpy().nonzero()[0]
+        if len(invalid):
+            errors.append(
+                {
+                    "loc": col,
+                    "msg": "Se esperaba un número.",
+                    "rows": invalid[:MAX_REPORTED_ROWS].tolist(),
+                }
+            )
+        validated[col] = values
+
+    for col in CATEGORICAL_FEATURES:
+        values = df[col]
+        invalid = values.isna().to_numpy().nonzero()[0]
+        if len(invalid):
+            errors.append(
+                {
+                    "loc": col,
+                    "msg": "Se esperaba un texto.",
+                    "rows": invalid[:MAX_REPORTED_ROWS].tolist(),
+                }
+            )
+        validated[col] = values.astype(str)
+
+    if errors:
+        raise PayloadValidationError(errors)
+
+    return pd.DataFrame(validated, columns=CLIENT_FEATURES)
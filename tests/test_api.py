@@ -0,0 +1,99 @@
+import json
+from types import SimpleNamespace
+import numpy as np
+from fastapi.testclient import TestClient
+import src.deployment.api.app as api
+from tests.test_validators import RECORD
+
+
+def _fake_model_manager():
+    """Versión de modelo mínima: predice 1 con probabilidad 0.7 para cada fila."""
+    version = SimpleNamespace(
+        version="test",
+        feature_pipeline=None,
+        transform=lambda X: X,
+        score=lambda X: (np.ones(len(X)), np.full(len(X), 0.7)),
+    )
+    return SimpleNamespace(active=version)
+
+
+def _ndjson(records):
+    return "".join(json.dumps(record) + "\n" for record in records)
+
+
+def test_predict_batch_streams_ndjson_input_in_chunks(monkeypatch):
+    """
+    Verifica que /predict_batch acepte NDJSON por bloques y numere las filas del cuerpo completo.
+    """
+    monkeypatch.setattr(api, "model_manager", _fake_model_manager())
+    monkeypatch.setattr(api, "STREAM_CHUNK_SIZE", 2)
+    client = TestClient(api.app)
+
+    response = client.post(
+        "/predict_batch",
+        content=_ndjson([RECORD] * 5),
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+    assert response.status_code == 200, response.text
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["row"] for row in rows] == [0, 1, 2, 3, 4], "❌ Filas fuera de orden entre bloques."
+    assert rows[0] == {"row": 0, "prediction": 1, "probability": 0.7}
+
+    # El JSON clásico (lista de registros) sigue aceptado
+    response = client.post("/predict_batch", json=[RECORD] * 3)
+    assert len(response.text.splitlines()) == 3
+
+
+def test_predict_batch_rejects_invalid_and_oversized_bodies(monkeypatch):
+    """
+    Verifica 422 con la fila inválida del cuerpo completo y 413 si se supera el tamaño máximo.
+    """
+    monkeypatch.setattr(api, "model_manager", _fake_model_manager())
+    monkeypatch.setattr(api, "STREAM_CHUNK_SIZE", 2)
+    client = TestClient(api.app)
+    headers = {"Content-Type": "application/x-ndjson"}
+
+    body = _ndjson([RECORD, RECORD, RECORD, dict(RECORD, edad="abc")])
+    response = client.post("/predict_batch", content=body, headers=headers)
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["rows"] == [
+        3
+    ], "❌ La fila debe contarse sobre todo el cuerpo."
+
+    monkeypatch.setattr(api, "MAX_BATCH_BODY_BYTES", 100)
+    response = client.post("/predict_batch", content=_ndjson([RECORD] * 3), headers=headers)
+    assert response.status_code == 413, "❌ Un cuerpo NDJSON mayor al máximo debe rechazarse."
+    response = client.post("/predict_batch", json=[RECORD] * 3)
+    assert response.status_code == 413, "❌ Un cuerpo JSON mayor al máximo debe rechazarse."
+
+
+def test_predict_records_every_stage(monkeypatch):
+    """
+    Verifica que /predict mida validación, DataFrame, transformación e inferencia, y que
+    un cuerpo inválido siga respondiendo 422 con el formato de FastAPI.
+    """
+    from src.deployment.api import metrics
+    from src.deployment.api.prediction_cache import PredictionCache
+
+    async def submit(record):
+        return api.predict_records([record])[0]
+
+    monkeypatch.setattr(api, "model_manager", _fake_model_manager())
+    monkeypatch.setattr(api, "prediction_cache", PredictionCache(max_size=0))
+    monkeypatch.setattr(api.batcher, "submit", submit)
+    client = TestClient(api.app)
+
+    stages = ["validation", "dataframe", "transform", "predict"]
+    before = {stage: metrics.STAGE_LATENCY.get(stage=stage)["count"] for stage in stages}
+    response = client.post("/predict", json=RECORD)
+    assert response.json() == {"prediction": 1, "probability": 0.7}
+    for stage in stages:
+        count = metrics.STAGE_LATENCY.get(stage=stage)["count"]
+        assert count == before[stage] + 1, f"❌ /predict no midió la etapa '{stage}'"
+
+    response = client.post("/predict", json=dict(RECORD, edad="abc"))
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["loc"] == [
+        "body",
+        "edad",
+    ], "❌ Error de validación inesperado"
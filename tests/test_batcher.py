@@ -0,0 +1,47 @@
+import asyncio
+import pytest
+from src.deployment.api.batcher import MicroBatcher
+
+
+def _run_concurrent(batcher, records):
+    async def scenario():
+        await batcher.start()
+        try:
+            return await asyncio.gather(*(batcher.submit(r) for r in records))
+        finally:
+            await batcher.stop()
+
+    return asyncio.run(scenario())
+
+
+def test_concurrent_requests_are_coalesced():
+    """
+    Verifica que las solicitudes concurrentes se agrupen y cada una reciba su resultado.
+    """
+    batch_sizes = []
+
+    def predict_fn(records):
+        batch_sizes.append(len(records))
+        return [r["x"] * 2 for r in records]
+
+    batcher = MicroBatcher(predict_fn, max_batch_size=8, max_wait_ms=50)
+    results = _run_concurrent(batcher, [{"x": i} for i in range(20)])
+
+    assert results == [
+        i * 2 for i in range(20)
+    ], "❌ Los resultados no corresponden a cada solicitud."
+    assert max(batch_sizes) <= 8, "❌ Se superó el tamaño máximo de lote."
+    assert len(batch_sizes) < 20, "❌ Las solicitudes no se agruparon en lotes."
+
+
+def test_batch_errors_propagate_to_callers():
+    """
+    Verifica que un error en la inferencia se propague a todas las solicitudes del lote.
+    """
+
+    def predict_fn(records):
+        raise ValueError("fallo de inferencia")
+
+    batcher = MicroBatcher(predict_fn, max_batch_size=4, max_wait_ms=10)
+    with pytest.raises(ValueError):
+        _run_concurrent(batcher, [{"x": 1}, {"x": 2}])
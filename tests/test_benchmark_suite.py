@@ -0,0 +1,36 @@
+from benchmarks.suite import compare, run_suite
+
+
+def _run(results, rows=1000):
+    return {"meta": {"rows": rows}, "results": results}
+
+
+def test_compare_flags_regressions_beyond_threshold():
+    """Verifica que solo se reporten las mediciones más lentas que el umbral (y fuera del ruido)"""
+    baseline = _run({"preprocess": 1.0, "features": 2.0, "api.p50": 0.001})
+    current = _run({"preprocess": 1.3, "features": 2.1, "api.p50": 0.002, "nuevo": 5.0})
+
+    regressions = compare(current, baseline, threshold=0.2)
+    assert [name for name, *_ in regressions] == [
+        "preprocess"
+    ], f"❌ Regresiones inesperadas: {regressions}"
+
+    try:
+        compare(current, _run({}, rows=10), threshold=0.2)
+    except ValueError:
+        return
+    raise AssertionError("❌ No se deben comparar ejecuciones de distinto tamaño")
+
+
+def test_run_suite_records_selected_stages(tmp_path, monkeypatch):
+    """Verifica que la suite mida las etapas pedidas sobre datos sintéticos"""
+    monkeypatch.chdir(tmp_path)
+    suite = run_suite(2000, stages=["preprocess", "features"])
+
+    assert set(suite["results"]) == {
+        "preprocess.preprocess_data",
+        "features.build_feature_pipeline",
+    }
+    assert all(seconds > 0 for seconds in suite["results"].values())
+    assert suite["meta"]["rows"] == 2000
+    assert not (tmp_path / "data").exists(), "❌ La suite debe trabajar en un directorio temporal"
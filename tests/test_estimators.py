@@ -0,0 +1,114 @@
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.datasets import make_classification
+from src.models.estimators import OneHotToCategorical, WarmStartForestClassifier
+from src.models.model_utils import bind_feature_columns, get_model_dict
+
+
+def _one_hot_frame():
+    return pd.DataFrame(
+        {
+            "edad": [30.0, 41.0, 25.0],
+            "ocio_cine": [1.0, 0.0, 0.0],
+            "ocio_deporte": [0.0, 1.0, 0.0],
+            "genero_F": [0.0, 1.0, 1.0],
+            "genero_M": [1.0, 0.0, 0.0],
+        }
+    )
+
+
+def test_one_hot_blocks_collapse_to_codes():
+    """Verifica que cada bloque one-hot pase a un código (NaN si la categoría es desconocida)"""
+    df = _one_hot_frame()
+    step = OneHotToCategorical(categorical_features=["genero", "ocio"]).fit(df)
+    out = step.transform(df)
+
+    # Categóricas primero (en el orden de categorical_features) y luego numéricas
+    assert list(out.columns) == ["genero", "ocio", "edad"]
+    assert out["genero"].tolist() == ["M", "F", "F"]
+    assert out["ocio"].cat.categories.tolist() == ["cine", "deporte"]
+    assert out["ocio"].isna().tolist() == [
+        False,
+        False,
+        True,
+    ], "❌ La categoría desconocida debe quedar faltante"
+
+    # Serving entrega matrices sin nombres (densas o CSR): mismo resultado
+    pd.testing.assert_frame_equal(step.transform(df.to_numpy()), out)
+    pd.testing.assert_frame_equal(step.transform(sparse.csr_matrix(df.to_numpy())), out)
+
+
+def test_sparse_training_needs_bound_columns():
+    """Verifica que los modelos con splits categóricos entrenen con CSR si reciben las columnas"""
+    df = _one_hot_frame()
+    models = bind_feature_columns(get_model_dict(), df.columns)
+    step = models["hist_gradient_boosting"].named_steps["categorical"]
+    step.set_params(categorical_features=["genero", "ocio"]).fit(sparse.csr_matrix(df.to_numpy()))
+    assert [block[0] for block in step.category_blocks_] == ["genero", "ocio"]
+    assert list(step.numeric_columns_) == [0]
+
+
+def test_blocks_come_from_encoder_categories():
+    """
+    Verifica que con las categorías del encoder los bloques se ubiquen por nombre exacto,
+    aunque una variable sea prefijo de otra (`ocio` y `ocio_tipo`).
+    """
+    df = pd.DataFrame(
+        {
+            "edad": [30.0, 41.0],
+            "ocio_tipo_cine": [1.0, 0.0],
+            "ocio_tipo_museo": [0.0, 1.0],
+            "ocio_No": [0.0, 1.0],
+            "ocio_Sí": [1.0, 0.0],
+        }
+    )
+    categories = {"ocio": ["No", "Sí"], "ocio_tipo": ["cine", "museo"]}
+    step = OneHotToCategorical(["ocio", "ocio_tipo"], categories=categories).fit(df)
+    out = step.transform(df)
+    assert out["ocio"].tolist() == ["Sí", "No"], "❌ Bloque de 'ocio' mal asignado"
+    assert out["ocio_tipo"].tolist() == ["cine", "museo"]
+
+    # Sin nombres (CSR sin columnas vinculadas) los bloques se ubican por posición
+    unnamed = OneHotToCategorical(["ocio", "ocio_tipo"], categories=categories)
+    unnamed.fit(
+        sparse.csr_matrix(df[["edad", "ocio_No", "ocio_Sí", "ocio_tipo_cine", "ocio_tipo_museo"]])
+    )
+    assert [block[2] for block in unnamed.category_blocks_] == [["No", "Sí"], ["cine", "museo"]]
+
+
+def test_high_cardinality_blocks_stay_one_hot():
+    """Verifica que un bloque con más categorías de las que admite HGB quede one-hot y entrene"""
+    rng = np.random.default_rng(0)
+    cities = [f"c{i}" for i in range(300)]
+    codes = rng.integers(0, 300, 1000)
+    one_hot = pd.DataFrame(np.eye(300)[codes], columns=[f"ciudad_residencia_{c}" for c in cities])
+    df = pd.concat([pd.DataFrame({"edad": rng.normal(size=1000)}), one_hot], axis=1)
+    y = (codes % 2 == 0).astype(int)
+
+    model = get_model_dict()["hist_gradient_boosting"]
+    model.set_params(
+        categorical__categorical_features=["ciudad_residencia"],
+        categorical__categories={"ciudad_residencia": cities},
+        model__max_iter=5,
+    )
+    model.fit(df, y)
+    step = model.named_steps["categorical"]
+    assert step.one_hot_features_ == ["ciudad_residencia"], "❌ El bloque debería quedar one-hot"
+    assert step.transform(df).shape[1] == 301
+
+
+def test_warm_start_forest_stops_early():
+    """Verifica que el bosque deje de crecer cuando el log loss out-of-bag no mejora"""
+    X, y = make_classification(n_samples=800, n_features=6, random_state=0)
+    model = WarmStartForestClassifier(max_estimators=400, step=20, tol=1e-2, random_state=0).fit(
+        X, y
+    )
+
+    assert model.n_estimators_ < 400, "❌ El early stopping no detuvo el crecimiento del bosque"
+    # Se conserva el mejor paso, no los `n_iter_no_change` pasos sin mejora posteriores
+    steps = len(model.oob_loss_curve_) - model.n_iter_no_change
+    assert model.n_estimators_ == 20 * steps, "❌ El bosque debe recortarse al mejor paso"
+    assert len(model.forest_.estimators_) == model.n_estimators_
+    assert model.predict_proba(X).shape == (800, 2)
+    assert (model.predict(X) == y).mean() > 0.9
@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+from scipy import sparse as sp
+from src.features.compiled_transformer import CompiledFeatureTransformer
+from src.features.feature_engineering import make_preprocessor
+from src.utils.validators import CATEGORICAL_FEATURES, NUMERIC_FEATURES
+
+CATEGORIES = {
+    "genero": ["Femenino", "Masculino"],
+    "ciudad_residencia": ["Chicago", "NYC", "Miami", "Boston", "Denver"],
+    "estrato_socioeconomico": ["Bajo", "Medio", "Alto", "Muy Alto"],
+    "ocio": ["Sí", "No"],
+    "consume_licor": ["Sí", "No"],
+    "preferencias_alimenticias": ["Carnes", "Vegetariano", "Mariscos", "Vegano"],
+    "tipo_de_pago_mas_usado": ["Efectivo", "Tarjeta", "App"],
+}
+
+
+def _synthetic_clients(n_rows, seed):
+    rng = np.random.default_rng(seed)
+    data = {
+        "edad": rng.integers(18, 90, n_rows).astype(float),
+        "frecuencia_visita": rng.integers(0, 20, n_rows),
+        "promedio_gasto_comida": rng.uniform(0, 150, n_rows).round(2),
+        "ingresos_mensuales": rng.integers(800, 18000, n_rows),
+    }
+    for col, values in CATEGORIES.items():
+        data[col] = rng.choice(values, n_rows)
+    return pd.DataFrame(data)[NUMERIC_FEATURES + CATEGORICAL_FEATURES]
+
+
+def test_compiled_transformer_matches_sklearn():
+    """
+    Verifica que el transformador compilado produzca una salida idéntica al ColumnTransformer.
+    """
+    preprocessor = make_preprocessor().fit(_synthetic_clients(500, seed=0))
+    compiled = CompiledFeatureTransformer.from_column_transformer(preprocessor)
+
+    df_new = _synthetic_clients(200, seed=1)
+    # Categorías no vistas en entrenamiento: deben codificarse como ceros
+    df_new.loc[:9, "ciudad_residencia"] = "Seattle"
+    df_new.loc[10:19, "tipo_de_pago_mas_usado"] = "Criptomoneda"
+
+    expected = preprocessor.transform(df_new)
+
+    assert np.array_equal(
+        compiled.transform(df_new), expected
+    ), "❌ Difiere la salida con DataFrame."
+    assert np.array_equal(
+        compiled.transform(df_new.to_dict(orient="records")), expected
+    ), "❌ Difiere la salida con registros."
+    assert np.array_equal(compiled.transform(df_new.iloc[0].to_dict()), expected[:1])
+
+
+def test_compiled_transformer_accepts_category_dtype():
+    preprocessor = make_preprocessor().fit(_synthetic_clients(300, seed=2))
+    compiled = CompiledFeatureTransformer.from_column_transformer(preprocessor)
+
+    df_new = _synthetic_clients(50, seed=3)
+    df_cat = df_new.astype({col: "category" for col in CATEGORICAL_FEATURES})
+
+    assert np.array_equal(compiled.transform(df_cat), preprocessor.transform(df_new))
+
+
+def test_compiled_transformer_matches_sparse_sklearn():
+    """
+    Verifica la paridad del transformador compilado con salida dispersa (CSR).
+    """
+    preprocessor = make_preprocessor(sparse=True).fit(_synthetic_clients(500, seed=4))
+    compiled = CompiledFeatureTransformer.from_column_transformer(preprocessor)
+
+    df_new = _synthetic_clients(100, seed=5)
+    df_new.loc[:4, "genero"] = "Otro"
+    expected = preprocessor.transform(df_new)
+
+    for result in (
+        compiled.transform(df_new),
+        compiled.transform(df_new.to_dict(orient="records")),
+    ):
+        assert sp.issparse(result), "❌ La salida debería ser dispersa."
+        assert (result != expected).nnz == 0, "❌ Difiere la salida dispersa."
+        assert result.nnz == expected.nnz
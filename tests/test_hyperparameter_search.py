@@ -0,0 +1,134 @@
+import json
+import numpy as np
+import pandas as pd
+from sklearn.datasets import make_classification
+from src.models import hyperparameter_search
+from src.models.hyperparameter_search import hyperband_brackets, load_best_params, run_search
+from src.models.model_utils import get_model_dict
+
+
+def _data():
+    X, y = make_classification(n_samples=600, n_features=8, random_state=0)
+    return pd.DataFrame(X, columns=[f"f{i}" for i in range(8)]), pd.Series(y)
+
+
+def test_brackets_shrink_candidates_and_grow_budget():
+    """Verifica que cada ronda conserve 1/eta de los candidatos con eta veces más presupuesto"""
+    halving = hyperband_brackets(27, 1 / 27, 3, strategy="halving")
+    assert halving == [
+        [(27, 1 / 27), (9, 1 / 9), (3, 1 / 3), (1, 1.0)]
+    ], "❌ Rondas de successive halving incorrectas"
+
+    hyperband = hyperband_brackets(27, 1 / 27, 3, strategy="hyperband")
+    assert len(hyperband) == 4 and hyperband[-1] == [
+        (4, 1.0)
+    ], "❌ Brackets de Hyperband incorrectos"
+    assert all(
+        rungs[-1][1] == 1.0 for rungs in hyperband
+    ), "❌ Todo bracket debe terminar con el presupuesto máximo"
+
+
+def test_search_resumes_from_journal(tmp_path, monkeypatch):
+    """Verifica que la búsqueda guarde los mejores parámetros y no repita trials al reanudarse"""
+    monkeypatch.setattr(hyperparameter_search, "SEARCH_MAX_ESTIMATORS", 27)
+    X, y = _data()
+    journal, output = tmp_path / "journal.jsonl", tmp_path / "best.json"
+    kwargs = dict(
+        model_names=["random_forest"],
+        strategy="halving",
+        n_candidates=9,
+        eta=3,
+        min_budget=1 / 9,
+        n_jobs=1,
+        journal_path=str(journal),
+        output_path=str(output),
+        tracking_uri=f"file:{tmp_path / 'mlruns'}",
+    )
+
+    best = run_search(X, y, **kwargs)
+    n_records = len(journal.read_text().splitlines())
+    # 9 + 3 + 1 trials más el registro del run padre de MLflow
+    assert n_records == 14, f"❌ Trials registrados inesperados: {n_records}"
+    assert (
+        best["random_forest"]["params"]["n_estimators"] == 27
+    ), "❌ El mejor trial debe usar el presupuesto máximo"
+    assert json.loads(output.read_text()) == best
+
+    # Reanudar con la bitácora completa no vuelve a entrenar nada
+    assert run_search(X, y, **kwargs) == best
+    assert len(journal.read_text().splitlines()) == n_records, "❌ La reanudación repitió trials"
+
+    params = load_best_params(str(output))
+    model = get_model_dict(params)["random_forest"]
+    assert (
+        model.get_params()["n_estimators"] == 27
+    ), "❌ get_model_dict no aplicó los parámetros buscados"
+
+
+def test_search_by_rows_uses_growing_subsets(tmp_path):
+    """Verifica el presupuesto por filas (regresión logística) sin tracking de MLflow"""
+    X, y = _data()
+    run_search(
+        X,
+        y,
+        model_names=["logistic_regression"],
+        strategy="halving",
+        n_candidates=9,
+        eta=3,
+        min_budget=1 / 9,
+        n_jobs=1,
+        journal_path=str(tmp_path / "journal.jsonl"),
+        output_path=str(tmp_path / "best.json"),
+        tracking_uri=None,
+    )
+    records = [json.loads(line) for line in (tmp_path / "journal.jsonl").read_text().splitlines()]
+    resources = sorted({record["resource"] for record in records})
+    assert resources == [53, 160, 480], f"❌ Subconjuntos de filas inesperados: {resources}"
+    assert all(np.isfinite(record["score"]) for record in records)
+
+
+def test_row_subsets_keep_class_proportions():
+    """Verifica que todo prefijo del orden de filas conserve la proporción de clases"""
+    y = np.r_[np.ones(48), np.zeros(432)].astype(int)
+    order = hyperparameter_search._stratified_order(y, seed=0)
+    assert sorted(order) == list(range(len(y)))
+    for n in [2, 10, 53, 160, 480]:
+        positives = y[order[:n]].sum()
+        assert positives >= 1, f"❌ El subconjunto de {n} filas no tiene la clase minoritaria"
+        assert abs(positives - 0.1 * n) <= 1, f"❌ Proporción sesgada en {n} filas: {positives}"
+
+
+def test_search_opens_new_parent_run_when_needed(tmp_path):
+    """
+    Verifica que la reanudación no reutilice el run padre si cambiaron los datos o si
+    el run ya no existe (mlruns/ borrado), y que sí lo reutilice en el caso normal.
+    """
+    X, y = _data()
+    journal = tmp_path / "journal.jsonl"
+    kwargs = dict(
+        model_names=["logistic_regression"],
+        strategy="halving",
+        n_candidates=3,
+        eta=3,
+        min_budget=1 / 3,
+        n_jobs=1,
+        journal_path=str(journal),
+        output_path=str(tmp_path / "best.json"),
+        tracking_uri=f"file:{tmp_path / 'mlruns'}",
+    )
+
+    def parent_runs():
+        records = [json.loads(line) for line in journal.read_text().splitlines()]
+        return [record["run_id"] for record in records if record["type"] == "run"]
+
+    run_search(X, y, **kwargs)
+    run_search(X, y, **kwargs)
+    assert len(parent_runs()) == 1, "❌ La reanudación debe reutilizar el run padre"
+
+    run_search(X.iloc[:500], y.iloc[:500], **kwargs)
+    assert len(parent_runs()) == 2, "❌ Con otros datos se debe abrir un run padre nuevo"
+
+    # Un mlruns/ vacío (el store de MLflow queda en caché por URI, así que se usa otro directorio)
+    kwargs["tracking_uri"] = f"file:{tmp_path / 'mlruns_nuevo'}"
+    run_search(X.iloc[:500], y.iloc[:500], **kwargs)
+    assert len(parent_runs()) == 3, "❌ Sin el run padre en MLflow se debe abrir uno nuevo"
@@ -0,0 +1,106 @@
+import json
+import pyarrow as pa
+import pyarrow.compute as pc
+import pytest
+from src.data.load_data import (
+    RAW_CSV_PATH,
+    RAW_PARQUET_DIR,
+    default_raw_path,
+    extract_from_bigquery,
+    load_watermark,
+)
+from src.utils.storage import read_table
+
+
+class FakeBigQueryClient:
+    """
+    Cliente local que imita `client.query(...).result(page_size).to_arrow_iterable()`
+    y aplica el filtro de marca de agua como lo haría BigQuery.
+    """
+
+    def __init__(self, table):
+        self.table = table
+        self.queries = []
+
+    def query(self, query, job_config=None):
+        self.queries.append(query)
+        table = self.table
+        if job_config is not None:
+            parameter = job_config.query_parameters[0]
+            column = query.rsplit("WHERE ", 1)[1].split(" >")[0]
+            table = table.filter(pc.greater(table[column], parameter.value))
+        return FakeJob(table)
+
+
+class FakeJob:
+    def __init__(self, table):
+        self.table = table
+
+    def result(self, page_size=None):
+        return self
+
+    def to_arrow_iterable(self):
+        yield from self.table.to_batches(max_chunksize=3)
+
+
+def _config(tmp_path, **extra):
+    path = tmp_path / "config.json"
+    path.write_text(json.dumps({"project_id": "demo", "query": "SELECT * FROM t", **extra}))
+    return str(path)
+
+
+def _clients(start, stop):
+    ids = list(range(start, stop))
+    return pa.table({"id_persona": ids, "edad": [float(30 + i % 5) for i in ids]})
+
+
+def test_extract_writes_partitioned_parquet(tmp_path):
+    """Verifica que la extracción escriba varios archivos Parquet con todas las filas"""
+    output_dir = str(tmp_path / "raw")
+    summary = extract_from_bigquery(
+        _config(tmp_path),
+        output_dir=output_dir,
+        client=FakeBigQueryClient(_clients(0, 10)),
+        rows_per_file=4,
+    )
+
+    # Páginas de 3 filas, archivos de al menos 4: 6 + 4 filas
+    assert summary["rows"] == 10 and summary["files"] == 2, f"❌ Resumen inesperado: {summary}"
+    df = read_table(output_dir)
+    assert df["id_persona"].tolist() == list(range(10)), "❌ Las filas extraídas no coinciden"
+
+
+def test_incremental_extraction_only_pulls_new_rows(tmp_path):
+    """Verifica que la marca de agua evite volver a extraer filas ya descargadas"""
+    pytest.importorskip("google.cloud.bigquery")
+    config_path = _config(tmp_path, watermark_column="id_persona")
+    output_dir = str(tmp_path / "raw")
+
+    extract_from_bigquery(
+        config_path, output_dir=output_dir, client=FakeBigQueryClient(_clients(0, 5))
+    )
+    assert load_watermark(output_dir)["value"] == 4, "❌ La marca de agua no se guardó"
+
+    client = FakeBigQueryClient(_clients(0, 8))
+    summary = extract_from_bigquery(config_path, output_dir=output_dir, client=client)
+    assert "@watermark" in client.queries[0], "❌ La consulta incremental no usa la marca de agua"
+    assert summary["rows"] == 3, f"❌ Se esperaban 3 filas nuevas, se extrajeron {summary['rows']}"
+
+    df = read_table(output_dir).sort_values("id_persona")
+    assert df["id_persona"].tolist() == list(
+        range(8)
+    ), "❌ Filas faltantes o duplicadas tras la extracción incremental"
+    assert load_watermark(output_dir)["value"] == 7, "❌ La marca de agua no avanzó"
+
+
+def test_default_raw_path_prefers_extraction(tmp_path, monkeypatch):
+    """Verifica que entrenamiento y preprocesamiento usen la extracción Parquet si existe"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("RAW_DATA_PATH", raising=False)
+    assert default_raw_path() == RAW_CSV_PATH, "❌ Sin extracción se debe usar el CSV local"
+
+    extract_from_bigquery(_config(tmp_path), client=FakeBigQueryClient(_clients(0, 5)))
+    assert default_raw_path() == RAW_PARQUET_DIR, "❌ No se usó el directorio extraído"
+
+    monkeypatch.setenv("RAW_DATA_PATH", "otro/dataset.csv")
+    assert default_raw_path() == "otro/dataset.csv"
@@ -0,0 +1,80 @@
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+import src.utils.logger as logger_module
+from src.utils.logger import RateLimitFilter, get_logger
+
+
+def test_rate_limit_filter_summarizes_suppressed_records():
+    """Verifica que el límite por línea deje pasar la ráfaga e informe lo omitido"""
+    log_filter = RateLimitFilter(rate=0.001, burst=3)
+
+    def _record(msg):
+        return logging.LogRecord("api", logging.INFO, "app.py", 10, msg, None, None)
+
+    passed = [log_filter.filter(_record(f"solicitud {i}")) for i in range(10)]
+    assert passed == [True] * 3 + [False] * 7, "❌ Solo deberían pasar los 3 registros de la ráfaga"
+
+    # Otra línea de código tiene su propio límite
+    other = logging.LogRecord("api", logging.INFO, "app.py", 20, "otra", None, None)
+    assert log_filter.filter(other), "❌ Cada línea debe tener su propio límite"
+
+    log_filter.rate = 1e9  # se recargan los tokens
+    record = _record("solicitud 10")
+    assert log_filter.filter(record)
+    assert (
+        "+7 registros similares omitidos" in record.getMessage()
+    ), "❌ Falta el resumen de omitidos"
+
+
+def test_loggers_share_one_rotating_file(tmp_path, monkeypatch):
+    """Verifica que todos los loggers escriban (vía cola) en un único archivo rotativo"""
+    monkeypatch.setattr(logger_module, "LOG_DIR", str(tmp_path))
+    monkeypatch.setattr(logger_module, "LOG_MAX_BYTES", 4000)
+    try:
+        logger_module.configure_logging(force=True)
+        first, second = get_logger("test_logger.first"), get_logger("test_logger.second")
+        for i in range(100):
+            first.info(f"mensaje {i}")
+            second.warning(f"aviso {i}")
+        logger_module.shutdown_logging()  # vacía la cola
+
+        files = sorted(os.listdir(tmp_path))
+        assert files[0] == "pipeline.log" and len(files) > 1, f"❌ Se esperaba rotación: {files}"
+        content = "".join(open(tmp_path / f, encoding="utf-8").read() for f in files)
+        assert (
+            "test_logger.first | mensaje 99" in content
+            and "test_logger.second | aviso 99" in content
+        )
+    finally:
+        monkeypatch.undo()
+        logger_module.configure_logging(force=True)
+
+
+def _log_from_child(message):
+    get_logger("test_logger.child").info(message)
+    return [type(handler).__name__ for handler in logger_module._listener.handlers]
+
+
+def test_child_processes_log_to_console_only(tmp_path, monkeypatch):
+    """Verifica que solo el proceso principal escriba el archivo rotativo (fork y spawn)"""
+    monkeypatch.setattr(logger_module, "LOG_DIR", str(tmp_path))
+    try:
+        logger_module.configure_logging(force=True)
+        get_logger("test_logger.parent").info("desde el padre")
+
+        for method in ("fork", "spawn"):
+            context = multiprocessing.get_context(method)
+            with ProcessPoolExecutor(1, mp_context=context) as executor:
+                handlers = executor.submit(_log_from_child, f"desde hijo {method}").result()
+            assert handlers == [
+                "StreamHandler"
+            ], f"❌ El hijo ({method}) abrió el archivo: {handlers}"
+        logger_module.shutdown_logging()
+
+        content = (tmp_path / "pipeline.log").read_text(encoding="utf-8")
+        assert "desde el padre" in content and "desde hijo" not in content
+    finally:
+        monkeypatch.undo()
+        logger_module.configure_logging(force=True)
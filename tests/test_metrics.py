@@ -0,0 +1,39 @@
+from src.deployment.api.metrics import Counter, Gauge, Histogram, Registry
+
+
+def test_prometheus_text_format():
+    """Verifica el formato de texto de Prometheus de contadores, gauges e histogramas"""
+    registry = Registry()
+    requests = Counter("requests_total", "Solicitudes.", ["endpoint"], registry=registry)
+    in_flight = Gauge("in_flight", "En curso.", registry=registry)
+    latency = Histogram(
+        "latency_seconds", "Latencia.", ["stage"], buckets=(0.1, 1.0), registry=registry
+    )
+
+    requests.inc(endpoint="/predict")
+    requests.inc(2, endpoint="/predict")
+    with in_flight.track_inprogress():
+        assert in_flight.get() == 1.0, "❌ El gauge debería contar la solicitud en curso"
+    for value in (0.05, 0.1, 0.5, 3.0):
+        latency.observe(value, stage="transform")
+
+    text = registry.render()
+    assert '# TYPE requests_total counter' in text
+    assert 'requests_total{endpoint="/predict"} 3.0' in text, "❌ Conteo incorrecto"
+    assert "in_flight 0.0" in text, "❌ El gauge debería volver a 0"
+    # Los buckets son acumulados e incluyen el límite (le = "menor o igual")
+    assert 'latency_seconds_bucket{stage="transform",le="0.1"} 2' in text
+    assert 'latency_seconds_bucket{stage="transform",le="1.0"} 3' in text
+    assert 'latency_seconds_bucket{stage="transform",le="+Inf"} 4' in text
+    assert 'latency_seconds_count{stage="transform"} 4' in text
+    assert 'latency_seconds_sum{stage="transform"} 3.65' in text
+
+
+def test_labels_are_validated():
+    """Verifica que falte una etiqueta produzca un error claro"""
+    counter = Counter("errors_total", "Errores.", ["endpoint"], registry=None)
+    try:
+        counter.inc()
+    except ValueError:
+        return
+    raise AssertionError("❌ Debería fallar sin la etiqueta 'endpoint'")
@@ -0,0 +1,113 @@
+import threading
+import joblib
+from sklearn.linear_model import LogisticRegression
+from src.deployment.api.model_manager import ModelManager
+from src.features.feature_engineering import make_preprocessor
+from src.models.model_utils import save_model_metadata
+from tests.test_features import _synthetic_clients
+
+
+def _write_artifacts(tmp_path, run_id, threshold=0.5):
+    clients = _synthetic_clients(300, seed=0)
+    target = (clients["estrato_socioeconomico"] == "Alto").astype(int)
+    preprocessor = make_preprocessor().fit(clients)
+    model = LogisticRegression(max_iter=200).fit(preprocessor.transform(clients), target)
+
+    model_path = str(tmp_path / "local_best_model.pkl")
+    joblib.dump(preprocessor, tmp_path / "feature_pipeline.pkl")
+    joblib.dump(model, model_path)
+    save_model_metadata(
+        model_path, decision_threshold=threshold, run_id=run_id, run_name="LogisticRegression"
+    )
+    return model_path
+
+
+def _manager(tmp_path, **kwargs):
+    return ModelManager(
+        model_path=str(tmp_path / "local_best_model.pkl"),
+        pipeline_path=str(tmp_path / "feature_pipeline.pkl"),
+        compiled_path=str(tmp_path / "no_existe.pkl"),
+        bundle_path=str(tmp_path / "serving_bundle.joblib"),
+        use_mlflow=False,
+        poll_interval=0,
+        **kwargs,
+    )
+
+
+def test_hot_reload_swaps_without_failing_requests(tmp_path):
+    """Verifica que una nueva versión se cargue y active sin interrumpir predicciones en curso"""
+    _write_artifacts(tmp_path, run_id="aaaaaaaa1111")
+    manager = _manager(tmp_path)
+    manager.start()
+    assert manager.active.version == "LogisticRegression-aaaaaaaa", "❌ Versión inicial inesperada"
+    assert not manager.check_for_updates(), "❌ No debería recargar si nada cambió"
+
+    clients = _synthetic_clients(50, seed=1)
+    errors, stop = [], threading.Event()
+
+    def _predict_forever():
+        while not stop.is_set():
+            try:
+                manager.active.predict(clients)
+            except Exception as e:  # pragma: no cover - solo si la recarga rompe solicitudes
+                errors.append(e)
+
+    thread = threading.Thread(target=_predict_forever)
+    thread.start()
+    _write_artifacts(tmp_path, run_id="bbbbbbbb2222", threshold=0.7)
+    reloaded = manager.check_for_updates()
+    stop.set()
+    thread.join()
+
+    assert reloaded and not errors, f"❌ Recarga fallida o solicitudes con error: {errors[:1]}"
+    assert (
+        manager.active.version == "LogisticRegression-bbbbbbbb"
+    ), "❌ La nueva versión no quedó activa"
+    assert manager.active.threshold == 0.7, "❌ El umbral no se recargó con el modelo"
+
+    listed = {v["version"]: v for v in manager.list_versions()}
+    assert len(listed) == 2, "❌ Deberían quedar dos versiones en memoria"
+    assert listed["LogisticRegression-bbbbbbbb"]["active"], "❌ Versión activa mal reportada"
+    assert listed["LogisticRegression-aaaaaaaa"]["memory_bytes"] > 0, "❌ Falta el tamaño en memoria"
+
+    manager.activate("LogisticRegression-aaaaaaaa")
+    assert manager.active.threshold == 0.5, "❌ No se pudo volver a la versión anterior"
+
+
+def test_old_versions_are_evicted(tmp_path):
+    """Verifica que solo se mantengan `max_versions` versiones en memoria"""
+    manager = _manager(tmp_path, max_versions=2)
+    for run_id in ("11111111aaaa", "22222222bbbb", "33333333cccc"):
+        _write_artifacts(tmp_path, run_id=run_id)
+        manager.load_latest()
+
+    versions = [v["version"] for v in manager.list_versions()]
+    assert versions == [
+        "LogisticRegression-22222222",
+        "LogisticRegression-33333333",
+    ], f"❌ {versions}"
+
+
+def test_manager_prefers_serving_bundle(tmp_path):
+    """Verifica que se cargue el bundle de serving en lugar de los artefactos sueltos"""
+    from src.deployment.bundle import build_serving_bundle
+
+    model_path = _write_artifacts(tmp_path, run_id="cccccccc3333", threshold=0.6)
+    from_artifacts = _manager(tmp_path).load_latest()
+
+    build_serving_bundle(
+        model_path=model_path,
+        pipeline_path=str(tmp_path / "feature_pipeline.pkl"),
+        compiled_path=str(tmp_path / "no_existe.pkl"),
+        output_path=str(tmp_path / "serving_bundle.joblib"),
+    )
+    from_bundle = _manager(tmp_path).load_latest()
+
+    assert from_bundle.source.endswith("serving_bundle.joblib"), "❌ No se usó el bundle"
+    assert from_bundle.version == from_artifacts.version and from_bundle.threshold == 0.6
+    clients = _synthetic_clients(40, seed=2)
+    preds_bundle, probas_bundle = from_bundle.predict(clients)
+    preds_files, probas_files = from_artifacts.predict(clients)
+    assert (preds_bundle == preds_files).all() and (
+        probas_bundle == probas_files
+    ).all(), "❌ Predicciones distintas"
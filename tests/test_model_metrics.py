@@ -0,0 +1,77 @@
+import numpy as np
+from sklearn.metrics import accuracy_score, f1_score, precision_score, recall_score, roc_auc_score
+from src.models.model_metrics import (
+    best_threshold,
+    bootstrap_metrics,
+    classification_metrics,
+    threshold_sweep,
+)
+
+def _predictions(n, seed):
+    rng = np.random.default_rng(seed)
+    y_true = rng.integers(0, 2, n)
+    # Scores redondeados para forzar empates (el AUC debe contarlos como 0.5)
+    y_proba = np.round(np.clip(rng.normal(0.35 + 0.3 * y_true, 0.2), 0, 1), 2)
+    return y_true, (y_proba > 0.5).astype(int), y_proba
+
+
+def test_metrics_match_sklearn():
+    """Verifica que el motor de métricas coincida con sklearn (empates y división por cero)"""
+    y_true, y_pred, y_proba = _predictions(2000, seed=0)
+    metrics = classification_metrics(y_true, y_pred, y_proba)
+    expected = {
+        "accuracy": accuracy_score(y_true, y_pred),
+        "precision": precision_score(y_true, y_pred, zero_division=0),
+        "recall": recall_score(y_true, y_pred, zero_division=0),
+        "f1_score": f1_score(y_true, y_pred, zero_division=0),
+        "roc_auc": roc_auc_score(y_true, y_proba),
+    }
+    for name, value in expected.items():
+        assert abs(metrics[name] - value) < 1e-12, f"❌ {name}: {metrics[name]} != {value}"
+
+    # Sin predicciones positivas: precision y F1 valen 0 como en sklearn
+    no_positives = classification_metrics(y_true, np.zeros_like(y_pred))
+    assert no_positives["precision"] == 0 and no_positives["f1_score"] == 0
+
+
+def test_bootstrap_intervals_match_loop_reference():
+    """Verifica los IC bootstrap vectorizados contra un bucle de remuestreos con sklearn"""
+    y_true, y_pred, y_proba = _predictions(1500, seed=1)
+    intervals = bootstrap_metrics(y_true, y_pred, y_proba, n_resamples=400, block_elements=100_000)
+
+    rng = np.random.default_rng(7)
+    f1s, aucs = [], []
+    for _ in range(400):
+        idx = rng.integers(0, len(y_true), len(y_true))
+        f1s.append(f1_score(y_true[idx], y_pred[idx]))
+        aucs.append(roc_auc_score(y_true[idx], y_proba[idx]))
+
+    point = classification_metrics(y_true, y_pred, y_proba)
+    for name, reference in (("f1_score", f1s), ("roc_auc", aucs)):
+        low, high = intervals[name]
+        assert low < point[name] < high, f"❌ El IC de {name} no contiene la estimación puntual"
+        ref_low, ref_high = np.percentile(reference, [2.5, 97.5])
+        assert (
+            abs(low - ref_low) < 0.015 and abs(high - ref_high) < 0.015
+        ), f"❌ IC de {name} muy distinto"
+
+
+def test_threshold_sweep_matches_brute_force():
+    """Verifica el barrido de umbrales (proba > umbral) contra evaluar cada umbral por separado"""
+    y_true, _, y_proba = _predictions(800, seed=2)
+    sweep = threshold_sweep(y_true, y_proba, fp_cost=1.0, fn_cost=5.0)
+
+    assert len(sweep["threshold"]) == len(np.unique(y_proba)) + 1
+    for i, threshold in enumerate(sweep["threshold"]):
+        y_pred = (y_proba > threshold).astype(int)
+        assert abs(sweep["f1_score"][i] - f1_score(y_true, y_pred, zero_division=0)) < 1e-12
+        fp = int(((y_pred == 1) & (y_true == 0)).sum())
+        fn = int(((y_pred == 0) & (y_true == 1)).sum())
+        assert (
+            abs(sweep["cost"][i] - (fp + 5 * fn) / len(y_true)) < 1e-12
+        ), "❌ Curva de costo incorrecta"
+
+    # Con falsos negativos 5 veces más caros, el umbral de mínimo costo es menor que el de máximo F1
+    by_f1 = sweep["threshold"][best_threshold(sweep, "f1")]
+    by_cost = sweep["threshold"][best_threshold(sweep, "cost")]
+    assert by_cost <= by_f1, "❌ El umbral de costo debería favorecer el recall"
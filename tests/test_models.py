@@ -1,11 +1,37 @@
 import os
+import numpy as np
 import pandas as pd
 import joblib
-from src.models.model_utils import get_model_dict
+from sklearn.base import BaseEstimator, ClassifierMixin
+from sklearn.datasets import make_classification
+from src.models.model_utils import (
+    get_model_dict,
+    load_model_threshold,
+    save_model_metadata,
+    score_model,
+)
 
 TRAIN_PATH = "data/processed/train_features.csv"
 TEST_PATH = "data/processed/test_features.csv"
 
+
+class CountingClassifier(ClassifierMixin, BaseEstimator):
+    """Regresión logística que cuenta cuántas veces se ajustó esta instancia."""
+
+    def fit(self, X, y):
+        from sklearn.linear_model import LogisticRegression
+
+        self.fit_count_ = getattr(self, "fit_count_", 0) + 1
+        self.model_ = LogisticRegression(max_iter=500).fit(X, y)
+        self.classes_ = self.model_.classes_
+        return self
+
+    def predict_proba(self, X):
+        return self.model_.predict_proba(X)
+
+    def predict(self, X):
+        return self.model_.predict(X)
+
 def test_train_and_predict():
     df_train = pd.read_csv(TRAIN_PATH)
     df_test = pd.read_csv(TEST_PATH)
@@ -25,3 +51,141 @@ def test_best_model_exists():
 def test_best_model_can_predict():
     model = joblib.load("models/local_best_model.pkl")
     assert hasattr(model, "predict"), "❌ El modelo cargado no tiene método predict()."
+
+
+def test_score_model_matches_predict():
+    """
+    Verifica que con el umbral por defecto las etiquetas coincidan con model.predict().
+    """
+    X, y = make_classification(n_samples=300, n_features=8, random_state=0)
+    for name, model in get_model_dict().items():
+        model.fit(X, y)
+        y_pred, y_proba = score_model(model, X)
+        assert np.array_equal(
+            y_pred, model.predict(X)
+        ), f"❌ {name}: etiquetas distintas a predict()."
+        assert np.array_equal(y_proba, model.predict_proba(X)[:, 1])
+
+        y_pred_strict, _ = score_model(model, X, threshold=0.9)
+        assert np.array_equal(y_pred_strict, (y_proba > 0.9).astype(int))
+
+
+def test_threshold_is_persisted_with_model(tmp_path):
+    model_path = str(tmp_path / "modelo.pkl")
+    assert load_model_threshold(model_path, default=0.5) == 0.5
+
+    save_model_metadata(model_path, decision_threshold=0.35)
+    assert load_model_threshold(model_path) == 0.35, "❌ No se recuperó el umbral persistido."
+
+
+def test_parallel_cv_matches_cross_val_score():
+    """
+    Verifica que la CV paralela use los mismos folds y obtenga el mismo F1 que sklearn.
+    """
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.model_selection import cross_val_score
+    from src.models.model_utils import cross_val_f1_parallel, fit_models_parallel
+
+    X, y = make_classification(n_samples=300, n_features=8, random_state=0)
+    models = {"logistic_regression": LogisticRegression(max_iter=500)}
+
+    scores = cross_val_f1_parallel(models, X, y, cv=5, n_jobs=2)
+    expected = cross_val_score(LogisticRegression(max_iter=500), X, y, cv=5, scoring="f1").mean()
+    assert np.isclose(
+        scores["logistic_regression"], expected
+    ), "❌ La CV paralela difiere de sklearn."
+
+    fitted = fit_models_parallel(models, X, y, n_jobs=2)
+    model, train_time = fitted["logistic_regression"]
+    assert train_time >= 0 and hasattr(model, "coef_"), "❌ El modelo no quedó ajustado."
+
+
+def test_registry_compares_runs_scored_the_same_way():
+    """
+    Verifica que el registro no mezcle F1 con umbral out-of-fold y F1 de runs sin umbral elegido,
+    y que el umbral venga del run seleccionado.
+    """
+    from types import SimpleNamespace
+    from src.models.model_registry import run_decision_threshold, select_best_run
+
+    def run(run_id, metrics, tags=None):
+        return SimpleNamespace(
+            info=SimpleNamespace(run_id=run_id),
+            data=SimpleNamespace(
+                metrics=metrics, params={"decision_threshold": "0.5"}, tags=tags or {}
+            ),
+        )
+
+    old = run("old", {"f1_score": 0.95})
+    tuned_on_test = run(
+        "test", {"f1_score": 0.80, "f1_score_tuned": 0.99, "decision_threshold_tuned": 0.2}
+    )
+    oof_tag = {"threshold_selection": "oof_cv"}
+    oof = [
+        run(
+            "a",
+            {"f1_score": 0.80, "f1_score_tuned": 0.84, "decision_threshold_tuned": 0.41},
+            oof_tag,
+        ),
+        run(
+            "b",
+            {"f1_score": 0.82, "f1_score_tuned": 0.83, "decision_threshold_tuned": 0.6},
+            oof_tag,
+        ),
+    ]
+
+    best = select_best_run([old, tuned_on_test] + oof)
+    assert best.info.run_id == "a", f"❌ Se eligió {best.info.run_id}"
+    assert run_decision_threshold(best) == 0.41, "❌ El umbral debe ser el del run elegido"
+
+    # Sin runs con umbral out-of-fold se compara el F1 del umbral de entrenamiento
+    assert select_best_run([old, tuned_on_test]).info.run_id == "old"
+    assert run_decision_threshold(old) == 0.5
+
+
+def test_evaluation_reuses_trained_models(tmp_path, monkeypatch):
+    """
+    Verifica que train → evaluate ajuste cada modelo una sola vez, tanto con los modelos
+    en memoria (`trained=`) como con los cargados de disco (`load_trained_models`).
+    """
+    from src.models import model_eval, train_model
+    from src.utils.storage import features_path, write_table
+
+    monkeypatch.chdir(tmp_path)
+    X, y = make_classification(n_samples=200, n_features=6, random_state=0)
+    frame = pd.DataFrame(X, columns=[f"f{i}" for i in range(X.shape[1])]).assign(target=y)
+    write_table(frame.iloc[:150], features_path(TRAIN_PATH, sparse=False))
+    write_table(frame.iloc[150:], features_path(TEST_PATH, sparse=False))
+
+    def model_dict(params=None):
+        return {"contador_a": CountingClassifier(), "contador_b": CountingClassifier()}
+
+    monkeypatch.setattr(train_model, "get_model_dict", model_dict)
+    monkeypatch.setattr(model_eval, "get_model_dict", model_dict)
+    monkeypatch.setattr(train_model, "MLFLOW_TRACKING_URI", f"file:{tmp_path / 'mlruns'}")
+    monkeypatch.setattr(model_eval, "MLFLOW_TRACKING_URI", f"file:{tmp_path / 'mlruns'}")
+
+    trained = train_model.train_and_log_models(threshold=0.5, n_jobs=1, sparse=False)
+    report = model_eval.evaluate_models(
+        trained=trained, run_cv=True, n_jobs=1, sparse=False, n_bootstrap=20, cv_folds=2
+    )
+    for name, result in trained.items():
+        assert (
+            result["model"].fit_count_ == 1
+        ), f"❌ {name} se ajustó {result['model'].fit_count_} veces."
+
+    expected = ["decision_threshold", "train_time_sec", "predict_time_sec", "cross_val_f1"]
+    expected += ["f1_score_ci_low", "f1_score_ci_high"]
+    assert set(report["modelo"]) == {"contador_a", "contador_b"}
+    assert set(expected) <= set(
+        report.columns
+    ), f"❌ Faltan columnas: {set(expected) - set(report.columns)}"
+
+    loaded = model_eval.load_trained_models()
+    assert {name: result["model"].fit_count_ for name, result in loaded.items()} == {
+        "contador_a": 1,
+        "contador_b": 1,
+    }, "❌ Los modelos de disco no son los ajustados en el entrenamiento."
+    assert all(result["run_id"] == trained[name]["run_id"] for name, result in loaded.items())
+    report = model_eval.evaluate_models(run_cv=False, n_jobs=1, sparse=False, n_bootstrap=0)
+    assert report["train_time_sec"].notna().all(), "❌ Se perdieron los tiempos de entrenamiento."
@@ -0,0 +1,80 @@
+import asyncio
+import pandas as pd
+import httpx
+from fastapi import FastAPI
+from src.data.synthetic import CLIENT_DOMAINS, client_payloads
+from src.deployment.monitor import PayloadGenerator, run_load_test
+from src.utils.validators import payload_to_frame
+
+
+def _fake_api():
+    app = FastAPI()
+    seen = []
+
+    @app.post("/predict")
+    async def predict(payload: dict):
+        seen.append(payload)
+        return {"prediction": 1, "probability": 0.9}
+
+    return app, seen
+
+
+def test_payloads_are_valid_and_repeatable():
+    """Verifica que los payloads sintéticos pasen la validación y que se repitan clientes"""
+    generator = PayloadGenerator(seed=0, repeat_ratio=0.5, pool_size=1000)
+    payloads = [generator() for _ in range(400)]
+
+    frame = payload_to_frame(payloads)
+    assert len(frame) == 400, "❌ Todos los payloads deberían ser válidos"
+    unique = {tuple(sorted(p.items())) for p in payloads}
+    assert (
+        150 < len(unique) < 300
+    ), f"❌ Se esperaba ~50% de clientes repetidos ({len(unique)} únicos)"
+
+
+def test_payloads_only_repeat_through_repeat_ratio():
+    """Verifica que pasado el tamaño del pool se generen clientes nuevos en lugar de repetirlos"""
+    generator = PayloadGenerator(seed=0, pool_size=50)
+    payloads = [generator() for _ in range(300)]
+    unique = {tuple(sorted(p.items())) for p in payloads}
+    assert len(unique) == 300, f"❌ Sin repeat_ratio no debe haber repetidos ({len(unique)} únicos)"
+
+    again = PayloadGenerator(seed=0, pool_size=50)
+    assert [again() for _ in range(300)] == payloads, "❌ La secuencia debe ser reproducible"
+
+
+def test_synthetic_clients_stay_in_valid_domains():
+    """Verifica que los clientes sintéticos no traigan edades ni frecuencias fuera de rango"""
+    frame = client_payloads(5000, seed=0)
+    for col, (low, high) in CLIENT_DOMAINS.items():
+        assert frame[col].between(low, high).all(), f"❌ '{col}' fuera de [{low}, {high}]"
+    assert frame["frecuencia_visita"].nunique() == 11, "❌ Las frecuencias no cubren todo el rango"
+
+
+def test_load_test_reports_and_appends(tmp_path):
+    """Verifica el resumen de la prueba de carga y que el CSV se agregue sin reescribirse"""
+    app, seen = _fake_api()
+    report = tmp_path / "monitoring_log.csv"
+
+    async def _run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await run_load_test(
+                "http://test/predict",
+                n_requests=60,
+                concurrency=8,
+                generator=PayloadGenerator(seed=1, pool_size=100),
+                report_path=str(report),
+                client=client,
+            )
+
+    summary = asyncio.run(_run())
+    assert (
+        summary["requests"] == 60 and len(seen) == 60
+    ), "❌ Deberían enviarse exactamente 60 solicitudes"
+    assert summary["p50_ms"] <= summary["p95_ms"] <= summary["p99_ms"], "❌ Percentiles no ordenados"
+
+    asyncio.run(_run())
+    log = pd.read_csv(report)
+    assert len(log) == 120, "❌ La segunda prueba debería agregar filas al CSV existente"
+    assert set(log["status"]) <= {"OK", "FAIL"}
@@ -6,3 +6,32 @@ def test_pipeline_runs_successfully():
     assert os.path.exists("data/processed/train_features.csv"), "❌ No se generó train_features.csv"
     assert os.path.exists("models/local_best_model.pkl"), "❌ No se generó el modelo local."
     assert os.path.exists("reports/model_evaluation.csv"), "❌ No se generó el reporte de evaluación."
+
+
+def test_prediction_pipeline_handles_header_only_input(tmp_path, monkeypatch):
+    """
+    Verifica que una entrada sin filas genere una salida vacía con las columnas de predicción.
+    """
+    from types import SimpleNamespace
+    import pandas as pd
+    from sklearn.linear_model import LogisticRegression
+    from src.pipelines import pipeline_predict
+
+    model = LogisticRegression().fit([[0.0], [1.0]], [0, 1])
+    feature_pipeline = SimpleNamespace(transform=lambda df: df[["x"]].to_numpy())
+    monkeypatch.setattr(
+        pipeline_predict, "load_prediction_artifacts", lambda: (feature_pipeline, model, 0.5)
+    )
+    monkeypatch.setattr(pipeline_predict, "MODEL_PATH", str(tmp_path / "pipeline.pkl"))
+    (tmp_path / "pipeline.pkl").write_bytes(b"")
+    data_path = tmp_path / "nuevos.csv"
+    data_path.write_text("x,c\n", encoding="utf-8")
+
+    for output_format in ("csv", "parquet"):
+        output = str(tmp_path / f"predicciones.{output_format}")
+        pipeline_predict.run_prediction_pipeline(
+            str(data_path), output, chunksize=10, output_format=output_format
+        )
+        reader = pd.read_csv if output_format == "csv" else pd.read_parquet
+        result = reader(output)
+        assert result.empty and "prediccion" in result.columns, "❌ Salida vacía inesperada"
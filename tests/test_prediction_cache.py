@@ -0,0 +1,46 @@
+from src.deployment.api.prediction_cache import PredictionCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+CLIENT = {"edad": 40, "genero": "Femenino", "ingresos_mensuales": 5000.0}
+
+
+def test_key_is_canonical():
+    """Verifica que el orden de los campos y 40 vs 40.0 no cambien la clave"""
+    reordered = {"ingresos_mensuales": 5000, "genero": "Femenino", "edad": 40.0}
+    assert PredictionCache.make_key(CLIENT, "v1") == PredictionCache.make_key(reordered, "v1")
+    assert PredictionCache.make_key(CLIENT, "v1") != PredictionCache.make_key(CLIENT, "v2")
+
+
+def test_lru_ttl_and_model_swap():
+    """Verifica desalojo LRU, expiración por TTL e invalidación al cambiar de modelo"""
+    clock = FakeClock()
+    cache = PredictionCache(max_size=2, ttl_sec=10, clock=clock)
+    keys = [PredictionCache.make_key(dict(CLIENT, edad=age), "v1") for age in (20, 30, 40)]
+
+    assert cache.get(keys[0], "v1") is None
+    cache.put(keys[0], {"prediction": 0}, "v1")
+    cache.put(keys[1], {"prediction": 1}, "v1")
+    assert cache.get(keys[0], "v1") == {"prediction": 0}, "❌ Debería ser un acierto"
+
+    # keys[1] es la menos usada recientemente y sale al superar max_size
+    cache.put(keys[2], {"prediction": 1}, "v1")
+    assert cache.get(keys[1], "v1") is None, "❌ Falló el desalojo LRU"
+
+    clock.now = 11
+    assert cache.get(keys[0], "v1") is None, "❌ La entrada debería haber expirado"
+
+    cache.put(keys[2], {"prediction": 1}, "v1")
+    assert cache.get(keys[2], "v2") is None, "❌ Un cambio de modelo debe invalidar la caché"
+    cache.put(keys[2], {"prediction": 1}, "v1")
+    assert cache.stats()["size"] == 0, "❌ No se deben guardar predicciones de un modelo anterior"
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["evictions"], stats["expirations"]) == (1, 1, 1), f"❌ {stats}"
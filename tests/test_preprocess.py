@@ -48,3 +48,138 @@ def test_non_empty_dataset(df):
     """
     assert df.shape[0] > 0, "❌ El dataset está vacío después del preprocesamiento."
     print(f"✅ Dataset con {df.shape[0]} filas y {df.shape[1]} columnas cargado correctamente.")
+
+
+def test_outlier_rules_are_combined_in_one_mask():
+    """
+    Verifica que todas las reglas de outliers se apliquen y que los nulos no cuenten como outliers.
+    """
+    from src.data.preprocess_data import outlier_mask
+
+    frame = pd.DataFrame(
+        {"edad": [25, -1, 300, 40, None], "frecuencia_visita": [3, 5, 2, 25, 4]}
+    )
+    keep, counts = outlier_mask(frame)
+    assert keep.tolist() == [True, False, False, False, True], f"❌ Máscara inesperada: {keep}"
+    assert counts == {
+        "edad": 2,
+        "frecuencia_visita": 1,
+    }, f"❌ Conteos por regla inesperados: {counts}"
+
+
+def test_preprocess_data_imputes_and_filters(tmp_path):
+    """
+    Verifica el preprocesamiento completo sobre un CSV raw sintético.
+    """
+    from src.data.preprocess_data import preprocess_data
+
+    raw = pd.DataFrame(
+        {
+            "id_persona": range(6),
+            "nombre": ["a"] * 6,
+            "edad": [20, None, 40, 150, 30, 50],
+            "frecuencia_visita": [1, 2, 3, 4, -2, 5],
+            "promedio_gasto_comida": [10.0, 20.0, None, 40.0, 50.0, 60.0],
+            "preferencias_alimenticias": ["Vegano", "Carnes", None, "Vegano", "Carnes", "Otro"],
+            "membresia_premium": ["Sí", "No", "No", "Sí", "No", "No"],
+        }
+    )
+    raw_path = tmp_path / "raw.csv"
+    raw.to_csv(raw_path, index=False)
+
+    df = preprocess_data(input_path=str(raw_path), output_path=str(tmp_path / "clean.csv"))
+
+    assert (
+        "id_persona" not in df.columns and "nombre" not in df.columns
+    ), "❌ No se eliminaron columnas"
+    assert df.isna().sum().sum() == 0, "❌ Quedaron valores nulos"
+    assert len(df) == 4, f"❌ Se esperaban 4 filas tras eliminar outliers, hay {len(df)}"
+    # Mediana de edad = 40, mediana de gasto = 40, moda con empate -> menor valor ("Carnes")
+    assert df["edad"].tolist() == [20, 40, 40, 50], "❌ Imputación de 'edad' incorrecta"
+    assert df["promedio_gasto_comida"].tolist() == [
+        10.0,
+        20.0,
+        40.0,
+        60.0,
+    ], "❌ Imputación de gasto incorrecta"
+    assert (
+        df["preferencias_alimenticias"].tolist()[2] == "Carnes"
+    ), "❌ Imputación por moda incorrecta"
+
+
+def test_value_sketch_matches_pandas():
+    """
+    Verifica que el resumen por bloques reproduzca mediana y moda de pandas
+    (y que las aproxime al comprimir).
+    """
+    import numpy as np
+    from src.data.sketches import ValueSketch
+
+    rng = np.random.default_rng(0)
+    values = pd.Series(rng.gamma(2, 20, 10_001).round(1))
+    values[rng.random(len(values)) < 0.05] = np.nan
+
+    sketch = ValueSketch()
+    for start in range(0, len(values), 997):
+        sketch.merge(ValueSketch().update(values[start:start + 997]))
+    assert (
+        sketch.exact and sketch.median() == values.median()
+    ), "❌ La mediana por bloques no coincide"
+
+    labels = pd.Series(["b", "a", "c", "b", "a", None], dtype="category")
+    assert (
+        ValueSketch().update(labels).mode() == "a"
+    ), "❌ El empate de la moda debe resolverse con el menor valor"
+
+    compressed = ValueSketch(max_bins=500)
+    for start in range(0, len(values), 997):
+        compressed.update(values[start:start + 997])
+    assert not compressed.exact, "❌ El resumen debería haberse comprimido"
+    assert (
+        abs(compressed.median() - values.median()) < 1
+    ), "❌ Mediana aproximada fuera de tolerancia"
+
+
+def test_chunked_preprocess_matches_in_memory(tmp_path):
+    """
+    Verifica que el modo out-of-core produzca el mismo archivo que el modo en memoria.
+    """
+    from benchmarks.synthetic import generate_raw_data
+    from src.data.preprocess_data import preprocess_data
+
+    raw_path = str(tmp_path / "raw.csv")
+    generate_raw_data(20_000, seed=1).to_csv(raw_path, index=False)
+
+    preprocess_data(raw_path, str(tmp_path / "memoria.csv"))
+    preprocess_data(raw_path, str(tmp_path / "bloques.csv"), chunksize=1_234)
+
+    in_memory = (tmp_path / "memoria.csv").read_text(encoding="utf-8")
+    chunked = (tmp_path / "bloques.csv").read_text(encoding="utf-8")
+    assert chunked == in_memory, "❌ El modo por bloques no coincide con el modo en memoria"
+
+
+def test_chunked_parquet_accepts_new_categories_per_chunk(tmp_path):
+    """
+    Verifica que el modo out-of-core escriba Parquet cuando un bloque posterior trae
+    más de 127 categorías (el primer bloque fijaría índices int8 en el diccionario).
+    """
+    from benchmarks.synthetic import generate_raw_data
+    from src.data.preprocess_data import preprocess_data
+    from src.utils.storage import read_table
+
+    raw = generate_raw_data(1_000, seed=2)
+    # Primer bloque con pocas ciudades; el resto con 300 ciudades distintas
+    raw.loc[200:, "ciudad_residencia"] = [f"Ciudad {i % 300}" for i in range(len(raw) - 200)]
+    raw_path = str(tmp_path / "raw.csv")
+    raw.to_csv(raw_path, index=False)
+
+    output = str(tmp_path / "limpio.parquet")
+    preprocess_data(raw_path, output, data_format="parquet", chunksize=200)
+    expected = preprocess_data(raw_path, str(tmp_path / "memoria.parquet"), data_format="parquet")
+
+    result = read_table(output)
+    assert result["ciudad_residencia"].nunique() > 127, "❌ Se perdieron categorías"
+    assert (
+        result["ciudad_residencia"].astype(str).tolist()
+        == expected["ciudad_residencia"].astype(str).tolist()
+    ), "❌ El modo por bloques no coincide con el modo en memoria"
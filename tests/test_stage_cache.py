@@ -0,0 +1,84 @@
+import os
+import time
+from src.pipelines.stage_cache import StageCache, code_dependencies
+
+
+def _write(path, text):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+def test_stage_is_skipped_when_inputs_unchanged(tmp_path):
+    """Verifica que una etapa sin cambios restaura sus salidas sin volver a ejecutarse"""
+    cache = StageCache(cache_dir=str(tmp_path / "cache"))
+    input_path, output_path = str(tmp_path / "in.csv"), str(tmp_path / "out.csv")
+    _write(input_path, "a,b\n1,2\n")
+    calls = []
+
+    def stage():
+        calls.append(1)
+        _write(output_path, open(input_path).read().upper())
+        return "ok"
+
+    result, hit = cache.run(
+        "demo", stage, outputs=[output_path], inputs=[input_path], params={"p": 1}
+    )
+    assert (result, hit) == ("ok", False), "❌ La primera ejecución debería correr la etapa"
+
+    os.remove(output_path)
+    _, hit = cache.run("demo", stage, outputs=[output_path], inputs=[input_path], params={"p": 1})
+    assert hit and len(calls) == 1, "❌ La segunda ejecución debería usar la caché"
+    assert open(output_path).read() == "A,B\n1,2\n", "❌ La salida restaurada no coincide"
+
+    # Cambiar parámetros, entradas o forzar invalida la caché
+    cache.run("demo", stage, outputs=[output_path], inputs=[input_path], params={"p": 2})
+    _write(input_path, "a,b\n3,4\n")
+    cache.run("demo", stage, outputs=[output_path], inputs=[input_path], params={"p": 2})
+    cache.run(
+        "demo", stage, outputs=[output_path], inputs=[input_path], params={"p": 2}, force=True
+    )
+    assert (
+        len(calls) == 4
+    ), "❌ Cambios en entradas/parámetros o --force deberían re-ejecutar la etapa"
+
+
+def test_eviction_by_age_and_size(tmp_path):
+    """Verifica el desalojo de entradas antiguas y de las menos usadas al superar el tamaño"""
+    cache = StageCache(cache_dir=str(tmp_path / "cache"), max_mb=1, max_age_days=1)
+    output_path = str(tmp_path / "out.bin")
+
+    for key in ("old", "a", "b"):
+        with open(output_path, "wb") as f:
+            f.write(os.urandom(600 * 1024))
+        cache.store("demo", key, [output_path])
+
+    old_manifest = tmp_path / "cache" / "demo" / "old" / "manifest.json"
+    two_days_ago = time.time() - 2 * 24 * 3600
+    os.utime(old_manifest, (two_days_ago, two_days_ago))
+    # "b" es la más reciente; "a" se usó antes y debe salir por tamaño
+    os.utime(tmp_path / "cache" / "demo" / "a" / "manifest.json", (time.time() - 60,) * 2)
+
+    cache.evict()
+    remaining = sorted(os.listdir(tmp_path / "cache" / "demo"))
+    assert remaining == ["b"], f"❌ Entradas restantes inesperadas: {remaining}"
+
+
+def test_code_dependencies_follow_src_imports():
+    """Verifica que el código de una etapa incluya los módulos de src que importa, aun indirectos"""
+    from src.features import feature_engineering
+    from src.models import train_model
+
+    features_code = [os.path.basename(path) for path in code_dependencies(feature_engineering)]
+    assert (
+        "compiled_transformer.py" in features_code
+    ), "❌ Falta el transformador compilado en la clave de features"
+    assert (
+        "validators.py" in features_code
+    ), "❌ Faltan las listas de features en la clave de features"
+
+    # estimators.py solo se importa dentro de get_model_dict (import perezoso de model_utils)
+    train_code = [os.path.basename(path) for path in code_dependencies(train_model)]
+    assert "estimators.py" in train_code and "model_utils.py" in train_code
+    assert all(
+        "site-packages" not in path for path in code_dependencies(train_model)
+    ), "❌ Solo código de src"
@@ -0,0 +1,75 @@
+import pandas as pd
+import pytest
+from src.utils.storage import ChunkedTableWriter
+
+
+def _chunks():
+    return [
+        pd.DataFrame({"id": range(i * 3, i * 3 + 3), "valor": [0.5, 1.5, 2.5]}) for i in range(4)
+    ]
+
+
+@pytest.mark.parametrize("name", ["salida.csv", "salida.parquet"])
+def test_chunked_writer_resumes_from_last_complete_chunk(tmp_path, name):
+    """
+    Verifica que al reanudar se descarte lo escrito después del último bloque completo.
+    """
+    path = str(tmp_path / name)
+    chunks = _chunks()
+
+    writer = ChunkedTableWriter(path)
+    writer.reset()
+    state = None
+    for i, chunk in enumerate(chunks[:2]):
+        state = writer.write(chunk, i)
+    # Bloque 2 escrito pero nunca registrado en el checkpoint (simula una caída)
+    writer.write(chunks[2], 2)
+
+    resumed = ChunkedTableWriter(path)
+    resumed.restore(state)
+    for i, chunk in enumerate(chunks[2:], start=2):
+        resumed.write(chunk, i)
+
+    reader = pd.read_csv if writer.fmt == "csv" else pd.read_parquet
+    result = reader(path).sort_values("id").reset_index(drop=True)
+    expected = pd.concat(chunks, ignore_index=True)
+    assert result.equals(expected), "❌ La salida reanudada no coincide con la esperada."
+
+
+@pytest.mark.parametrize("fmt", ["parquet", "feather"])
+def test_columnar_formats_preserve_dtypes(tmp_path, fmt):
+    """
+    Verifica que Parquet y Feather conserven los dtypes (incluidas las categorías).
+    """
+    from src.utils.storage import read_table, with_format, write_table
+
+    df = pd.DataFrame(
+        {"edad": [30.0, 45.0, 51.0], "genero": ["Femenino", "Masculino", "Femenino"]},
+        index=[3, 7, 9],
+    ).astype({"genero": "category"})
+
+    path = with_format(str(tmp_path / "tabla.csv"), fmt)
+    assert path.endswith(f".{fmt}")
+    write_table(df, path)
+    result = read_table(path)
+
+    assert result["genero"].dtype == "category", "❌ Se perdió el dtype category."
+    assert result.equals(df.reset_index(drop=True))
+
+
+def test_parquet_chunks_accept_values_after_all_null_first_chunk(tmp_path):
+    """
+    Verifica que una columna de texto vacía en el primer bloque acepte valores en los siguientes.
+    """
+    path = str(tmp_path / "salida.parquet")
+    chunks = [
+        pd.DataFrame({"id": [0, 1], "c": [None, None]}),
+        pd.DataFrame({"id": [2, 3], "c": ["a", None]}),
+    ]
+    writer = ChunkedTableWriter(path)
+    writer.reset()
+    for i, chunk in enumerate(chunks):
+        writer.write(chunk, i)
+
+    result = pd.read_parquet(path).sort_values("id")
+    assert result["c"].tolist() == [None, None, "a", None], "❌ Se perdieron los valores de texto."
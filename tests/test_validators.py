@@ -0,0 +1,72 @@
+import json
+import pytest
+from src.utils.validators import (
+    CLIENT_FEATURES,
+    PayloadValidationError,
+    ndjson_to_frame,
+    payload_to_frame,
+)
+
+RECORD = {
+    "edad": 40,
+    "frecuencia_visita": 3,
+    "promedio_gasto_comida": 30.5,
+    "ingresos_mensuales": 5000,
+    "genero": "Femenino",
+    "ciudad_residencia": "Miami",
+    "estrato_socioeconomico": "Alto",
+    "ocio": "Sí",
+    "consume_licor": "No",
+    "preferencias_alimenticias": "Carnes",
+    "tipo_de_pago_mas_usado": "App",
+}
+
+
+def test_records_and_columnar_payloads_match():
+    """
+    Verifica que el formato por registros y el columnar produzcan el mismo DataFrame.
+    """
+    records = [RECORD, dict(RECORD, edad="55", genero="Masculino")]
+    columnar = {col: [r[col] for r in records] for col in RECORD}
+
+    df_records = payload_to_frame(records)
+    df_columnar = payload_to_frame(columnar)
+
+    assert list(df_records.columns) == CLIENT_FEATURES
+    assert df_records.equals(df_columnar), "❌ Los formatos de payload no son equivalentes."
+    assert df_records["edad"].tolist() == [40.0, 55.0]
+
+
+def test_invalid_rows_are_reported():
+    """
+    Verifica que los errores se reporten por columna con las filas inválidas.
+    """
+    with pytest.raises(PayloadValidationError) as exc:
+        payload_to_frame([RECORD, dict(RECORD, edad="abc"), dict(RECORD, genero=None)])
+
+    errors = {e["loc"]: e["rows"] for e in exc.value.errors}
+    assert errors == {"edad": [1], "genero": [2]}
+
+
+def test_missing_fields_are_rejected():
+    with pytest.raises(PayloadValidationError):
+        payload_to_frame({"edad": [1, 2]})
+
+
+def test_ndjson_errors_report_rows_of_the_whole_body():
+    """
+    Verifica que un bloque NDJSON se valide igual que la lista de registros y que
+    las filas inválidas se reporten respecto al cuerpo completo (offset del bloque).
+    """
+    lines = [json.dumps(RECORD).encode(), json.dumps(dict(RECORD, edad="55"))]
+    assert ndjson_to_frame(lines).equals(payload_to_frame([RECORD, dict(RECORD, edad="55")]))
+
+    with pytest.raises(PayloadValidationError) as exc:
+        ndjson_to_frame([json.dumps(RECORD), json.dumps(dict(RECORD, edad="abc"))], offset=100)
+    assert exc.value.errors[0]["rows"] == [
+        101
+    ], "❌ La fila inválida debe incluir el offset del bloque."
+
+    with pytest.raises(PayloadValidationError) as exc:
+        ndjson_to_frame([json.dumps(RECORD), "{no es json"], offset=10)
+    assert exc.value.errors[0]["rows"] == [11]